@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ...database import get_db
-from ...schemas.analysis_result import AnalysisResultResponse
+from ...schemas.analysis_result import AnalysisRuleRunResponse
 from ...crud import analysis_result as result_crud, analysis_rule as rule_crud
 from ...core.security import get_current_active_user
 from ...schemas.user import UserResponse
@@ -10,24 +10,53 @@ from ...schemas.user import UserResponse
 router = APIRouter()
 
 
-@router.get("/", response_model=List[AnalysisResultResponse])
+@router.get("/", response_model=List[AnalysisRuleRunResponse])
 async def read_analysis_results(
     skip: int = 0,
     limit: int = 100,
     current_user: UserResponse = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    results = result_crud.get_analysis_results_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
-    return results
+    """当前用户所有规则的运行结果（每条规则每次运行一条，旧的逐行结果已压缩进来），最新的在前"""
+    return result_crud.get_rule_runs_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
 
 
-@router.get("/{result_id}", response_model=AnalysisResultResponse)
+@router.get("/latest", response_model=List[AnalysisRuleRunResponse])
+async def read_latest_rule_runs(
+    rule_id: Optional[int] = None,
+    stock_id: Optional[int] = None,
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """当前用户每条规则最近一次运行结果；指定 stock_id 时只返回命中该股票的规则"""
+    if stock_id is not None:
+        runs = result_crud.get_latest_matches_by_stock(db, stock_id=stock_id, user_id=current_user.id)
+        return [run for run in runs if rule_id is None or run.rule_id == rule_id]
+    return result_crud.get_latest_rule_runs(db, user_id=current_user.id, rule_id=rule_id)
+
+
+@router.get("/runs", response_model=List[AnalysisRuleRunResponse])
+async def read_rule_runs(
+    rule_id: int,
+    skip: int = 0,
+    limit: int = 20,
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """规则的历史运行结果，最新的在前"""
+    rule = rule_crud.get_analysis_rule(db, rule_id=rule_id)
+    if rule is None or rule.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Analysis rule not found")
+    return result_crud.get_rule_runs(db, rule_id=rule_id, skip=skip, limit=limit)
+
+
+@router.get("/{result_id}", response_model=AnalysisRuleRunResponse)
 async def read_analysis_result(
     result_id: int,
     current_user: UserResponse = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    result = result_crud.get_analysis_result(db, result_id=result_id)
+    result = result_crud.get_rule_run(db, run_id=result_id)
     if result is None:
         raise HTTPException(status_code=404, detail="Analysis result not found")
     rule = rule_crud.get_analysis_rule(db, rule_id=result.rule_id)
@@ -42,13 +71,13 @@ async def delete_analysis_result(
     current_user: UserResponse = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    result = result_crud.get_analysis_result(db, result_id=result_id)
+    result = result_crud.get_rule_run(db, run_id=result_id)
     if result is None:
         raise HTTPException(status_code=404, detail="Analysis result not found")
     rule = rule_crud.get_analysis_rule(db, rule_id=result.rule_id)
     if rule is None or rule.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Analysis result not found")
-    success = result_crud.delete_analysis_result(db=db, result_id=result_id)
+    success = result_crud.delete_rule_run(db=db, run_id=result_id)
     if not success:
         raise HTTPException(status_code=404, detail="Analysis result not found")
     return {"message": "Analysis result deleted successfully"}
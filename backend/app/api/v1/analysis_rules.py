@@ -2,10 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 from ...database import get_db
-from ...schemas.analysis_rule import AnalysisRuleResponse, AnalysisRuleCreate, AnalysisRuleUpdate
-from ...crud import analysis_rule as rule_crud
+from ...schemas.analysis_rule import (
+    AnalysisRuleResponse, AnalysisRuleCreate, AnalysisRuleUpdate, RuleMatchResponse, RuleMatchTransitionResponse
+)
+from ...crud import analysis_rule as rule_crud, rule_evaluation as evaluation_crud
 from ...core.security import get_current_active_user
 from ...schemas.user import UserResponse
+from ...services.rule_engine_service import validate_conditions
 
 router = APIRouter()
 
@@ -16,6 +19,10 @@ async def create_analysis_rule(
     current_user: UserResponse = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
+    try:
+        validate_conditions(rule.conditions)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return rule_crud.create_analysis_rule(db=db, rule=rule, user_id=current_user.id)
 
 
@@ -42,6 +49,36 @@ async def read_analysis_rule(
     return rule
 
 
+@router.get("/{rule_id}/matches", response_model=List[RuleMatchResponse])
+async def read_analysis_rule_matches(
+    rule_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """规则当前命中的股票（增量评估维护）"""
+    rule = rule_crud.get_analysis_rule(db, rule_id=rule_id)
+    if rule is None or rule.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Analysis rule not found")
+    return evaluation_crud.get_rule_matches(db, rule_id=rule_id, skip=skip, limit=limit)
+
+
+@router.get("/{rule_id}/transitions", response_model=List[RuleMatchTransitionResponse])
+async def read_analysis_rule_transitions(
+    rule_id: int,
+    since_id: int = 0,
+    limit: int = 100,
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """规则命中状态变化（新命中 / 不再命中），按 ID 递增，since_id 用于续读"""
+    rule = rule_crud.get_analysis_rule(db, rule_id=rule_id)
+    if rule is None or rule.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Analysis rule not found")
+    return evaluation_crud.get_rule_transitions(db, rule_id=rule_id, since_id=since_id, limit=limit)
+
+
 @router.put("/{rule_id}", response_model=AnalysisRuleResponse)
 async def update_analysis_rule(
     rule_id: int,
@@ -52,6 +89,11 @@ async def update_analysis_rule(
     db_rule = rule_crud.get_analysis_rule(db, rule_id=rule_id)
     if db_rule is None or db_rule.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Analysis rule not found")
+    if rule.conditions is not None:
+        try:
+            validate_conditions(rule.conditions)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     return rule_crud.update_analysis_rule(db=db, rule_id=rule_id, rule=rule)
 
 
@@ -5,6 +5,11 @@ import asyncio
 
 from ...database import get_db
 from ...services.analysis_task_service import AnalysisTaskService, scheduler
+from ...services.job_queue import enqueue_analysis_task
+from ...crud.ai_script_cache import invalidate_script_cache
+from ...core.config import settings
+from ...core.security import get_current_active_user
+from ...schemas.user import UserResponse
 from ...schemas.analysis_result import AnalysisTaskCreate, AnalysisTaskResponse, AnalysisTaskExecuteResponse
 
 router = APIRouter()
@@ -36,8 +41,11 @@ async def execute_analysis_task(
 ):
     """执行分析任务"""
     try:
-        # 调度任务
-        await scheduler.schedule_task(db, task_id)
+        if settings.JOB_QUEUE_ENABLED:
+            # 入队，由工作进程执行
+            enqueue_analysis_task(db, task_id)
+        else:
+            await scheduler.schedule_task(db, task_id)
         return AnalysisTaskExecuteResponse(
             task_id=task_id,
             status="scheduled",
@@ -47,6 +55,17 @@ async def execute_analysis_task(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.delete("/script-cache")
+async def clear_script_cache(
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """清除当前用户缓存的 AI 分析脚本，下次执行重新调用 LLM 生成"""
+    deleted = invalidate_script_cache(db, user_id=current_user.id)
+    db.commit()
+    return {"message": "Script cache cleared", "deleted": deleted}
+
+
 @router.get("/{task_id}", response_model=AnalysisTaskResponse)
 async def get_analysis_task(
     task_id: int,
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+from ...database import get_db
+from ...schemas.backfill import BackfillJobCreate, BackfillJobResponse, BackfillShardResponse
+from ...crud.backfill import get_backfill_job, get_backfill_jobs, get_backfill_shards
+from ...services.backfill_service import BackfillOrchestrator, launch_backfill_job, is_backfill_running
+from ...core.security import get_current_active_user
+from ...schemas.user import UserResponse
+
+router = APIRouter()
+
+
+@router.post("/jobs", response_model=BackfillJobResponse)
+async def create_backfill_job(
+    job: BackfillJobCreate,
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    try:
+        db_job = BackfillOrchestrator(db).create_job(job.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    launch_backfill_job(db_job.id)
+    return db_job
+
+
+@router.get("/jobs", response_model=List[BackfillJobResponse])
+async def list_backfill_jobs(
+    status: str = None,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    return get_backfill_jobs(db, skip=skip, limit=limit, status=status)
+
+
+@router.get("/jobs/{job_id}", response_model=BackfillJobResponse)
+async def get_backfill_job_detail(
+    job_id: int,
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    job = get_backfill_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Backfill job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/shards", response_model=List[BackfillShardResponse])
+async def list_backfill_shards(
+    job_id: int,
+    status: str = None,
+    skip: int = 0,
+    limit: int = 1000,
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    return get_backfill_shards(db, job_id=job_id, status=status, skip=skip, limit=limit)
+
+
+@router.post("/jobs/{job_id}/resume")
+async def resume_backfill_job(
+    job_id: int,
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    job = get_backfill_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Backfill job not found")
+    if job.status == "completed":
+        return {"message": f"Backfill job {job_id} already completed"}
+    if is_backfill_running(job_id) or not launch_backfill_job(job_id):
+        raise HTTPException(status_code=409, detail="Backfill job is already running")
+    return {"message": f"Backfill job {job_id} resumed"}
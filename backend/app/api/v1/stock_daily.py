@@ -3,14 +3,22 @@ from sqlalchemy.orm import Session
 from typing import List
 from ...database import get_db
 from ...schemas.stock_daily import StockDailyResponse
-from ...crud.stock_daily import get_stock_daily_by_ts_code, get_latest_stock_daily, get_stock_daily_by_date_range, count_stock_daily
+from ...crud.stock_daily import get_stock_daily_by_ts_code, get_latest_stock_daily, get_stock_daily_by_date_range
 from ...core.security import get_current_active_user
 from ...schemas.user import UserResponse
-from ...services.data_sync_service import DataSyncService
+from ...services.kline_loader import kline_loader
 
 router = APIRouter()
 
 
+async def ensure_kline_loaded(db: Session, ts_code: str) -> None:
+    """首次访问时等待加载，已有数据时直接返回（过期数据在后台刷新）"""
+    try:
+        await kline_loader.ensure_loaded(db, ts_code)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取K线数据失败: {str(e)}")
+
+
 @router.get("/{ts_code}", response_model=List[StockDailyResponse])
 async def get_stock_daily(
     ts_code: str,
@@ -19,14 +27,7 @@ async def get_stock_daily(
     current_user: UserResponse = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    data_count = count_stock_daily(db, ts_code=ts_code)
-
-    if data_count == 0:
-        sync_service = DataSyncService(db)
-        try:
-            sync_service.sync_stock_trading_data(ts_code)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"获取K线数据失败: {str(e)}")
+    await ensure_kline_loaded(db, ts_code)
 
     daily_data = get_stock_daily_by_ts_code(db, ts_code=ts_code, skip=skip, limit=limit)
     return daily_data
@@ -38,14 +39,7 @@ async def get_latest_stock_daily_data(
     current_user: UserResponse = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    data_count = count_stock_daily(db, ts_code=ts_code)
-
-    if data_count == 0:
-        sync_service = DataSyncService(db)
-        try:
-            sync_service.sync_stock_trading_data(ts_code)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"获取K线数据失败: {str(e)}")
+    await ensure_kline_loaded(db, ts_code)
 
     daily_data = get_latest_stock_daily(db, ts_code=ts_code)
     if daily_data is None:
@@ -61,14 +55,7 @@ async def get_stock_daily_by_range(
     current_user: UserResponse = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    data_count = count_stock_daily(db, ts_code=ts_code)
-
-    if data_count == 0:
-        sync_service = DataSyncService(db)
-        try:
-            sync_service.sync_stock_trading_data(ts_code)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"获取K线数据失败: {str(e)}")
+    await ensure_kline_loaded(db, ts_code)
 
     daily_data = get_stock_daily_by_date_range(db, ts_code=ts_code, start_date=start_date, end_date=end_date)
     return daily_data
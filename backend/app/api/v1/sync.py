@@ -1,34 +1,35 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from typing import List
 from ...database import get_db
-from ...schemas.sync import SyncRequest, SyncResult, SyncStatus
-from ...services.data_sync_service import DataSyncService
+from ...schemas.sync import SyncRequest, SyncJobResponse, SyncStatus
+from ...crud.sync_job import get_sync_job, get_sync_jobs
+from ...services.sync_job_service import submit_sync_job, describe_sync_job, get_sync_status as build_sync_status
 from ...core.security import get_current_active_user
 from ...schemas.user import UserResponse
 
 router = APIRouter()
 
 
-@router.post("/stocks", response_model=SyncResult)
+@router.post("/stocks", response_model=SyncJobResponse, status_code=202)
 async def sync_stock_data(
     sync_request: SyncRequest,
     current_user: UserResponse = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    sync_service = DataSyncService(db)
-    result = sync_service.sync_stock_data(sync_request.dict())
-    return result
+    job = submit_sync_job(db, "stocks", sync_request.dict(), created_by=current_user.id)
+    return describe_sync_job(job)
 
 
-@router.post("/financials", response_model=SyncResult)
+@router.post("/financials", response_model=SyncJobResponse, status_code=202)
 async def sync_financial_data(
     sync_request: SyncRequest,
     current_user: UserResponse = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    sync_service = DataSyncService(db)
-    result = sync_service.sync_stock_data({"stock_codes": sync_request.stock_codes, "sync_type": "financial"})
-    return result
+    stock_codes = list(dict.fromkeys(sync_request.stock_codes)) if sync_request.stock_codes else None
+    job = submit_sync_job(db, "financials", {"stock_codes": stock_codes}, created_by=current_user.id)
+    return describe_sync_job(job)
 
 
 @router.get("/status", response_model=SyncStatus)
@@ -36,18 +37,38 @@ async def get_sync_status(
     current_user: UserResponse = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    sync_service = DataSyncService(db)
-    status = sync_service.get_sync_status()
-    return status
+    return build_sync_status(db)
 
 
-@router.post("/all-stocks", response_model=SyncResult)
+@router.get("/jobs", response_model=List[SyncJobResponse])
+async def list_sync_jobs(
+    status: str = None,
+    skip: int = 0,
+    limit: int = 20,
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    return [describe_sync_job(job) for job in get_sync_jobs(db, skip=skip, limit=limit, status=status)]
+
+
+@router.get("/jobs/{job_id}", response_model=SyncJobResponse)
+async def get_sync_job_detail(
+    job_id: int,
+    current_user: UserResponse = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    job = get_sync_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return describe_sync_job(job)
+
+
+@router.post("/all-stocks", response_model=SyncJobResponse, status_code=202)
 async def sync_all_stocks(
     list_status: str = "L",
     market: str = None,
     current_user: UserResponse = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    sync_service = DataSyncService(db)
-    result = sync_service.sync_all_chinese_stocks(list_status=list_status, market=market)
-    return result
+    job = submit_sync_job(db, "all_stocks", {"list_status": list_status, "market": market}, created_by=current_user.id)
+    return describe_sync_job(job)
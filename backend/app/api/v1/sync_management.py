@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 from typing import List
 from ...database import get_db, SessionLocal
@@ -9,7 +10,8 @@ from ...schemas.sync_management import (
     SyncTaskCreate,
     SyncTaskUpdate,
     SyncTaskResponse,
-    SyncExecutionLogResponse
+    SyncExecutionLogResponse,
+    DataChangeLogResponse
 )
 from ...crud.sync_management import (
     get_sync_interface,
@@ -21,39 +23,28 @@ from ...crud.sync_management import (
     get_sync_tasks,
     get_sync_execution_logs
 )
+from ...crud.data_change_log import get_data_changes
 from ...services.sync_task_manager import SyncTaskManager
-from ...services.dynamic_scheduler import DynamicScheduler
+from ...services.scheduler_runtime import get_scheduler_runtime, start_scheduler_runtime, stop_scheduler_runtime
 
 router = APIRouter()
 
-scheduler_instance = None
-
 
 @router.on_event("startup")
 async def startup_event():
-    global scheduler_instance
     from ...core.config import settings
-    scheduler_instance = DynamicScheduler(settings.DATABASE_URL)
-    scheduler_instance.start()
-
-    db = SessionLocal()
-    try:
-        from ...services.sync_task_manager import SyncTaskManager
-        manager = SyncTaskManager(db, scheduler_instance)
-        await manager.load_and_schedule_all_tasks()
-    finally:
-        db.close()
+    # standalone 模式下由独立调度进程触发，API 工作进程只维护任务定义
+    await start_scheduler_runtime(participate=settings.SCHEDULER_MODE != "standalone")
 
 
 @router.on_event("shutdown")
 async def shutdown_event():
-    global scheduler_instance
-    if scheduler_instance:
-        scheduler_instance.shutdown()
+    await stop_scheduler_runtime()
 
 
 def get_scheduler():
-    return scheduler_instance
+    runtime = get_scheduler_runtime()
+    return runtime.scheduler if runtime else None
 
 
 @router.post("/interfaces", response_model=SyncInterfaceResponse)
@@ -218,3 +209,179 @@ async def sync_index_basic(
         return {"success": True, "message": f"成功同步 {len(data) if isinstance(data, list) else 1} 条指数数据"}
     except Exception as e:
         return {"success": False, "message": f"同步失败: {str(e)}"}
+
+
+@router.get("/cache/stats")
+async def get_response_cache_stats():
+    """查看数据源原始响应缓存状态"""
+    from ...services.data_sources import get_response_cache
+
+    cache = get_response_cache()
+    if cache is None:
+        return {"mode": "off"}
+    return cache.stats()
+
+
+@router.delete("/cache")
+async def clear_response_cache(source: str = None):
+    """清空数据源原始响应缓存（可按数据源: tushare, alpha_vantage）"""
+    from ...services.data_sources import get_response_cache
+
+    cache = get_response_cache()
+    if cache is None:
+        return {"message": "Response cache is disabled", "removed": 0}
+    removed = cache.clear(source)
+    return {"message": f"Removed {removed} cached responses", "removed": removed}
+
+
+@router.get("/changes", response_model=List[DataChangeLogResponse])
+async def list_data_changes(
+    since_id: int = 0,
+    table_name: str = None,
+    ts_code: str = None,
+    limit: int = 1000,
+    db: Session = Depends(get_db)
+):
+    """读取 since_id 之后入库产生的数据变更（按 ID 递增）"""
+    return get_data_changes(db, since_id=since_id, table_name=table_name, ts_code=ts_code, limit=min(limit, 10000))
+
+
+@router.get("/telemetry")
+async def get_sync_telemetry(
+    interface_name: str = None,
+    days: int = 7,
+    db: Session = Depends(get_db)
+):
+    """按接口汇总同步吞吐、API 延迟和各阶段耗时的百分位（p50/p95/p99）"""
+    from ...services.sync_telemetry import aggregate_sync_telemetry
+
+    return aggregate_sync_telemetry(db, interface_name=interface_name, days=days)
+
+
+@router.get("/request-queue")
+async def get_request_queue_stats():
+    """上游请求队列状态：各优先级在途/排队数、合并次数"""
+    from ...services.request_queue import request_queue
+
+    return request_queue.stats()
+
+
+@router.get("/job-queue")
+async def get_job_queue_status(db: Session = Depends(get_db)):
+    """作业队列状态：各队列按状态统计的作业数、持有作业的工作进程"""
+    from ...crud.job_queue import get_job_queue_stats
+    from ...core.config import settings
+
+    return {"enabled": settings.JOB_QUEUE_ENABLED, **get_job_queue_stats(db)}
+
+
+@router.get("/scheduler")
+async def get_scheduler_status():
+    """调度运行时状态：当前 leader、本进程是否为 leader、各作业下次执行时间"""
+    runtime = get_scheduler_runtime()
+    if not runtime:
+        raise HTTPException(status_code=503, detail="Scheduler runtime not started")
+    return runtime.status()
+
+
+@router.get("/scheduler/metrics")
+async def get_scheduler_metrics(
+    hours: int = 24,
+    job_id: str = None,
+    db: Session = Depends(get_db)
+):
+    """调度作业健康度：各作业触发延迟、执行器排队时间、运行耗时的百分位（毫秒），错过/重叠/合并次数，以及执行器实时排队数"""
+    from ...services.scheduler_metrics import aggregate_scheduler_metrics
+
+    runtime = get_scheduler_runtime()
+    metrics = aggregate_scheduler_metrics(db, hours=hours, job_id=job_id)
+    metrics["executor"] = runtime.scheduler.metrics.snapshot() if runtime else None
+    return metrics
+
+
+@router.get("/scheduler/metrics/prometheus", response_class=PlainTextResponse)
+async def get_scheduler_metrics_prometheus(hours: int = 1, db: Session = Depends(get_db)):
+    """Prometheus 文本格式的调度指标"""
+    from ...services.scheduler_metrics import aggregate_scheduler_metrics, render_prometheus
+
+    runtime = get_scheduler_runtime()
+    live = {**runtime.scheduler.metrics.snapshot(), "is_leader": runtime.is_leader} if runtime else None
+    return render_prometheus(aggregate_scheduler_metrics(db, hours=hours), live)
+
+
+def _resolve_gap_codes(db: Session, interface_name: str, ts_codes: str = None) -> List[str]:
+    from ...models.stock import Stock
+    from ...models.index_basic import IndexBasic
+
+    if ts_codes:
+        return [code.strip() for code in ts_codes.split(",") if code.strip()]
+    if interface_name == "index_daily":
+        return [row.ts_code for row in db.query(IndexBasic.ts_code).filter(IndexBasic.category == "综合指数") if row.ts_code]
+    return [row.ts_code for row in db.query(Stock.ts_code).filter(Stock.list_status == "L") if row.ts_code]
+
+
+@router.get("/gaps")
+async def get_data_gaps(
+    interface_name: str = "daily",
+    lookback_days: int = 10,
+    ts_codes: str = None,
+    db: Session = Depends(get_db)
+):
+    """按交易日历检测最近 lookback_days 个交易日缺失的 (代码, 日期)，以及补齐所需的接口调用；已确认上游无数据的不算缺失"""
+    from datetime import datetime, timedelta
+    from ...services.gap_detector import GAP_TARGETS, DATE_GAP_TARGETS, find_gaps, find_missing_dates, plan_fetches
+    from ...services.trading_calendar import trading_calendar
+
+    if interface_name not in GAP_TARGETS and interface_name not in DATE_GAP_TARGETS:
+        raise HTTPException(status_code=400, detail=f"接口 {interface_name} 不支持缺口检测")
+
+    manager = SyncTaskManager(db, get_scheduler())
+    today = datetime.now().date()
+    await trading_calendar.ensure(db, today - timedelta(days=lookback_days * 2 + 14), today, manager.tushare_registry)
+    trading_days = trading_calendar.recent_trading_days(lookback_days)
+
+    if interface_name in DATE_GAP_TARGETS:
+        missing_dates = find_missing_dates(db, DATE_GAP_TARGETS[interface_name], trading_days, interface_name=interface_name)
+        return {
+            "interface_name": interface_name,
+            "trading_days": [day.strftime("%Y%m%d") for day in trading_days],
+            "missing_count": len(missing_dates),
+            "gaps": {"*": [day.strftime("%Y%m%d") for day in missing_dates]},
+            "planned_calls": [{"trade_date": day.strftime("%Y%m%d")} for day in missing_dates],
+        }
+
+    model, by_date, multi_code = GAP_TARGETS[interface_name]
+    gaps = find_gaps(db, model, _resolve_gap_codes(db, interface_name, ts_codes), trading_days, interface_name=interface_name)
+    plans = plan_fetches(gaps, trading_days, by_date=by_date, multi_code=multi_code)
+    return {
+        "interface_name": interface_name,
+        "trading_days": [day.strftime("%Y%m%d") for day in trading_days],
+        "missing_count": sum(len(days) for days in gaps.values()),
+        "gaps": {ts_code: [day.strftime("%Y%m%d") for day in days] for ts_code, days in gaps.items()},
+        "planned_calls": plans,
+    }
+
+
+@router.post("/gaps/fill")
+async def fill_data_gaps(
+    interface_name: str = "daily",
+    lookback_days: int = 10,
+    ts_codes: str = None,
+    db: Session = Depends(get_db)
+):
+    """只拉取缺失的 (代码, 日期) 并入库"""
+    from ...services.gap_detector import GAP_TARGETS, DATE_GAP_TARGETS
+
+    if interface_name not in GAP_TARGETS and interface_name not in DATE_GAP_TARGETS:
+        raise HTTPException(status_code=400, detail=f"接口 {interface_name} 不支持缺口检测")
+
+    manager = SyncTaskManager(db, get_scheduler())
+    codes = [] if interface_name in DATE_GAP_TARGETS else _resolve_gap_codes(db, interface_name, ts_codes)
+    data = await manager._fetch_missing(db, interface_name, codes, {}, lookback_days)
+    result = manager._save_synced_data(db, interface_name, data) if data else None
+    return {
+        "interface_name": interface_name,
+        "fetched": len(data),
+        "inserted": len(result.inserted) if result else 0,
+        "updated": len(result.updated) if result else 0,
+    }
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Optional, Dict
 
 
 class Settings(BaseSettings):
@@ -15,6 +15,9 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
     ALPHA_VANTAGE_API_KEY: str = "your-alpha-vantage-api-key"
+    ALPHA_VANTAGE_CALLS_PER_MINUTE: int = 5
+    ALPHA_VANTAGE_DAILY_QUOTA: int = 500
+    ALPHA_VANTAGE_CONCURRENCY: int = 3
     FINNHUB_API_KEY: str = "your-finnhub-api-key"
     TUSHARE_API_TOKEN: str = "your-tushare-api-token"
     
@@ -26,6 +29,66 @@ class Settings(BaseSettings):
     PORT: int = 8000
     
     SYNC_INTERVAL: int = 60
+    TUSHARE_CALLS_PER_MINUTE: int = 200
+    BACKFILL_WINDOW_DAYS: int = 365
+    BACKFILL_CONCURRENCY: int = 4
+    # 回填分片心跳间隔；running 分片超过超时未心跳视为执行进程已退出，恢复任务时重新执行（秒）
+    BACKFILL_HEARTBEAT_INTERVAL: int = 15
+    BACKFILL_SHARD_TIMEOUT: int = 120
+    # 未指定日期的日线同步按交易日历检测最近 N 个交易日的缺口
+    SYNC_GAP_LOOKBACK_DAYS: int = 10
+    # 同时在途的上游请求数上限，以及其中只留给交互请求（手动同步、按需加载）的槽位数
+    SYNC_MAX_CONCURRENT_REQUESTS: int = 4
+    SYNC_INTERACTIVE_RESERVED_SLOTS: int = 1
+    # /sync 接口提交的后台同步作业的工作线程数
+    SYNC_JOB_WORKERS: int = 2
+    # 同步作业心跳间隔；未完成作业超过超时未心跳视为执行进程已退出，标记为失败（秒）
+    SYNC_JOB_HEARTBEAT_INTERVAL: int = 15
+    SYNC_JOB_TIMEOUT: int = 120
+    # 调度运行时: embedded 由 API 工作进程选主后触发, standalone 只由 script/run_scheduler.py 进程触发
+    SCHEDULER_MODE: str = "embedded"
+    # leader 租约有效期与续约间隔（秒），leader 失联后最多 TTL 秒由其他进程接管
+    SCHEDULER_LEASE_TTL: int = 30
+    SCHEDULER_LEASE_RENEW_INTERVAL: int = 10
+    # 调度作业运行记录（延迟/耗时/错过）保留天数
+    SCHEDULER_METRICS_RETENTION_DAYS: int = 14
+    # 作业队列: 开启后定时同步任务及其重试、分析任务入队，由 script/run_worker.py 工作进程执行
+    JOB_QUEUE_ENABLED: bool = False
+    # 各队列在所有工作进程上同时执行的作业数上限
+    JOB_QUEUE_CONCURRENCY: Dict[str, int] = {"sync": 4, "analysis": 2}
+    # 单个工作进程同时执行的作业数、空闲时轮询间隔（秒）
+    JOB_WORKER_CONCURRENCY: int = 4
+    JOB_QUEUE_POLL_INTERVAL: float = 2.0
+    # 心跳间隔；超过可见性超时未心跳的作业重新入队（秒）
+    JOB_QUEUE_HEARTBEAT_INTERVAL: int = 15
+    JOB_QUEUE_VISIBILITY_TIMEOUT: int = 120
+    JOB_QUEUE_MAX_ATTEMPTS: int = 3
+    # 分析结果（每次规则运行一行）保留天数，每条规则最近一次运行始终保留
+    ANALYSIS_RESULT_RETENTION_DAYS: int = 90
+    # 数据变更日志保留天数；落后超过保留期的订阅方需从最新变更 ID 重新同步
+    DATA_CHANGE_LOG_RETENTION_DAYS: int = 30
+    # 分析任务复用规则集未变化时 AI 生成的脚本，跳过 LLM 调用
+    AI_SCRIPT_CACHE_ENABLED: bool = True
+
+    # 数据源原始响应缓存: off 关闭, on 读写缓存, replay 仅从缓存回放（离线/基准测试）
+    DATA_CACHE_MODE: str = "off"
+    DATA_CACHE_DIR: str = "./data_cache"
+    DATA_CACHE_MAX_BYTES: int = 1073741824
+    DATA_CACHE_DEFAULT_TTL: int = 21600
+    # 不限定已结束日期的请求（如不带 trade_date 的 daily、stock_basic）的缓存有效期，0 表示不缓存
+    DATA_CACHE_OPEN_ENDED_TTL: int = 0
+    DATA_CACHE_TTLS: Dict[str, int] = {}
+
+    # 数据源: tushare 真实接口, fake 本地模拟数据（开发/基准测试）
+    DATA_SOURCE: str = "tushare"
+    FAKE_SOURCE_SYMBOLS: int = 100
+    FAKE_SOURCE_SEED: int = 42
+    FAKE_SOURCE_LATENCY_MS: float = 0
+    FAKE_SOURCE_CALLS_PER_MINUTE: Optional[int] = None
+
+    # 按需 K 线加载：数据水位缓存秒数、同一代码两次刷新（含无数据代码的首次加载）的最小间隔秒数
+    KLINE_WATERMARK_TTL: int = 60
+    KLINE_REFRESH_INTERVAL: int = 600
     
     MINIO_ENDPOINT: str = "localhost:9000"
     MINIO_ACCESS_KEY: str = "YOUR_ACCESS_KEY"
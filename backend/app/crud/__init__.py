@@ -9,3 +9,12 @@ from .user import *
 from .sync_management import *
 from .index_daily import *
 from .index_basic import *
+from .backfill import *
+from .data_change_log import *
+from .sync_watermark import *
+from .sync_empty_fetch import *
+from .sync_job import *
+from .market_flow import *
+from .job_queue import *
+from .rule_evaluation import *
+from .ai_script_cache import *
@@ -0,0 +1,42 @@
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional
+from ..models.ai_script_cache import AIScriptCache
+
+
+def get_cached_script(db: Session, fingerprint: str) -> Optional[AIScriptCache]:
+    return db.query(AIScriptCache).filter(AIScriptCache.fingerprint == fingerprint).first()
+
+
+def save_cached_script(db: Session, fingerprint: str, user_id: int, provider: str, model: Optional[str],
+                       rule_ids: List[int], script: str, reasoning: Optional[str]) -> AIScriptCache:
+    """写入或覆盖指纹对应的脚本"""
+    entry = get_cached_script(db, fingerprint)
+    if entry is None:
+        entry = AIScriptCache(fingerprint=fingerprint, hit_count=0)
+        db.add(entry)
+    entry.user_id = user_id
+    entry.provider = provider
+    entry.model = model
+    entry.rule_ids = rule_ids
+    entry.script = script
+    entry.reasoning = reasoning
+    db.commit()
+    db.refresh(entry)
+    return entry
+
+
+def record_script_cache_hit(db: Session, entry: AIScriptCache) -> None:
+    entry.hit_count = (entry.hit_count or 0) + 1
+    entry.last_used_at = datetime.now()
+    db.commit()
+
+
+def invalidate_script_cache(db: Session, user_id: Optional[int] = None, fingerprint: Optional[str] = None) -> int:
+    """删除缓存的脚本（可按用户或指纹），不提交事务；返回删除条数"""
+    query = db.query(AIScriptCache)
+    if user_id is not None:
+        query = query.filter(AIScriptCache.user_id == user_id)
+    if fingerprint is not None:
+        query = query.filter(AIScriptCache.fingerprint == fingerprint)
+    return query.delete(synchronize_session=False)
@@ -1,39 +1,157 @@
+from sqlalchemy import and_, func
 from sqlalchemy.orm import Session
-from ..models.analysis_result import AnalysisResult
-from ..schemas.analysis_result import AnalysisResult
-from typing import Optional
+from ..models.analysis_result import AnalysisResult, AnalysisRuleRun
+from ..models.analysis_rule import AnalysisRule
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional
 
+# 压缩旧结果时每批处理（读取、合并、删除并提交）的行数
+LEGACY_COMPACT_CHUNK = 5000
 
-def get_analysis_result(db: Session, result_id: int) -> Optional[AnalysisResult]:
-    return db.query(AnalysisResult).filter(AnalysisResult.id == result_id).first()
 
+def get_rule_run(db: Session, run_id: int) -> Optional[AnalysisRuleRun]:
+    return db.query(AnalysisRuleRun).filter(AnalysisRuleRun.id == run_id).first()
 
-def get_analysis_results_by_rule(db: Session, rule_id: int, skip: int = 0, limit: int = 100):
-    return db.query(AnalysisResult).filter(AnalysisResult.rule_id == rule_id).offset(skip).limit(limit).all()
 
+def get_rule_runs_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[AnalysisRuleRun]:
+    """用户所有规则的运行结果，最新的在前"""
+    return db.query(AnalysisRuleRun).join(AnalysisRule, AnalysisRule.id == AnalysisRuleRun.rule_id).filter(
+        AnalysisRule.user_id == user_id
+    ).order_by(AnalysisRuleRun.run_at.desc(), AnalysisRuleRun.id.desc()).offset(skip).limit(limit).all()
 
-def get_analysis_results_by_stock(db: Session, stock_id: int, skip: int = 0, limit: int = 100):
-    return db.query(AnalysisResult).filter(AnalysisResult.stock_id == stock_id).offset(skip).limit(limit).all()
 
+def delete_rule_run(db: Session, run_id: int) -> bool:
+    db_run = get_rule_run(db, run_id)
+    if db_run:
+        db.delete(db_run)
+        db.commit()
+        return True
+    return False
+
+
+def save_rule_runs(
+    db: Session,
+    matches: Dict[int, Iterable[int]],
+    source: str = "task",
+    task_id: Optional[int] = None,
+    run_at: Optional[datetime] = None
+) -> int:
+    """每条规则一行批量写入本次运行命中的股票，不提交事务；返回写入行数"""
+    run_at = run_at or datetime.now()
+    records = []
+    for rule_id, stock_ids in matches.items():
+        packed = AnalysisRuleRun.pack(stock_ids)
+        records.append({
+            "rule_id": rule_id,
+            "task_id": task_id,
+            "source": source,
+            "run_at": run_at,
+            "matched_count": len(packed) // 4,
+            "matched_stock_ids": packed,
+        })
+    db.bulk_insert_mappings(AnalysisRuleRun, records)
+    return len(records)
+
+
+def get_rule_runs(db: Session, rule_id: int, skip: int = 0, limit: int = 20) -> List[AnalysisRuleRun]:
+    """规则的运行结果，最新的在前"""
+    return db.query(AnalysisRuleRun).filter(
+        AnalysisRuleRun.rule_id == rule_id
+    ).order_by(AnalysisRuleRun.run_at.desc(), AnalysisRuleRun.id.desc()).offset(skip).limit(limit).all()
+
+
+def get_latest_rule_runs(db: Session, user_id: Optional[int] = None, rule_id: Optional[int] = None) -> List[AnalysisRuleRun]:
+    """每条规则最近一次运行结果（按运行时间，压缩的旧结果 ID 可能更大）"""
+    latest = db.query(
+        AnalysisRuleRun.rule_id.label("rule_id"), func.max(AnalysisRuleRun.run_at).label("run_at")
+    ).group_by(AnalysisRuleRun.rule_id)
+    if rule_id is not None:
+        latest = latest.filter(AnalysisRuleRun.rule_id == rule_id)
+    latest = latest.subquery()
+    query = db.query(AnalysisRuleRun).join(
+        latest, and_(AnalysisRuleRun.rule_id == latest.c.rule_id, AnalysisRuleRun.run_at == latest.c.run_at)
+    )
+    if user_id is not None:
+        query = query.join(AnalysisRule, AnalysisRule.id == AnalysisRuleRun.rule_id).filter(AnalysisRule.user_id == user_id)
+    # 同一时间多次运行时取最后写入的一次
+    runs = {run.rule_id: run for run in query.order_by(AnalysisRuleRun.rule_id, AnalysisRuleRun.id).all()}
+    return list(runs.values())
 
-def get_analysis_results_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(AnalysisResult).join(AnalysisResult.rule).filter(
-        AnalysisResult.user_id == user_id
-    ).offset(skip).limit(limit).all()
 
+def get_latest_matches_by_stock(db: Session, stock_id: int, user_id: Optional[int] = None) -> List[AnalysisRuleRun]:
+    """最近一次运行命中了该股票的规则"""
+    return [run for run in get_latest_rule_runs(db, user_id=user_id) if run.contains(stock_id)]
 
-def create_analysis_result(db: Session, result_data: dict) -> AnalysisResult:
-    db_result = AnalysisResult(**result_data)
-    db.add(db_result)
-    db.commit()
-    db.refresh(db_result)
-    return db_result
 
+def compact_legacy_analysis_results(db: Session, batch_size: int = LEGACY_COMPACT_CHUNK) -> Dict[str, int]:
+    """把逐行保存的旧结果按 (规则, 分析任务, 日期) 合并为规则运行结果并删除原行，按 ID 分批、每批提交一次
 
-def delete_analysis_result(db: Session, result_id: int) -> bool:
-    db_result = get_analysis_result(db, result_id)
-    if db_result:
-        db.delete(db_result)
+    同一组跨批时并入之前批次已生成的运行结果，中途失败后重新执行也不会产生重复的运行结果。
+    """
+    legacy_rows = 0
+    runs = 0
+    while True:
+        rows = db.query(
+            AnalysisResult.id, AnalysisResult.rule_id, AnalysisResult.stock_id,
+            AnalysisResult.timestamp, AnalysisResult.data, AnalysisResult.matched
+        ).order_by(AnalysisResult.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        groups: Dict[tuple, Dict[str, Any]] = {}
+        for row in rows:
+            timestamp = row.timestamp or datetime.now()
+            task_id = row.data.get("task_id") if isinstance(row.data, dict) else None
+            group = groups.setdefault((row.rule_id, task_id, timestamp.date()), {"run_at": timestamp, "stock_ids": set()})
+            group["run_at"] = max(group["run_at"], timestamp)
+            if row.matched:
+                group["stock_ids"].add(row.stock_id)
+
+        days = [day for _, _, day in groups]
+        existing = {
+            (run.rule_id, run.task_id, run.run_at.date()): run
+            for run in db.query(AnalysisRuleRun).filter(
+                AnalysisRuleRun.source == "legacy",
+                AnalysisRuleRun.rule_id.in_({rule_id for rule_id, _, _ in groups}),
+                AnalysisRuleRun.run_at >= datetime.combine(min(days), time.min),
+                AnalysisRuleRun.run_at < datetime.combine(max(days) + timedelta(days=1), time.min)
+            ).all()
+        }
+
+        records = []
+        for key, group in groups.items():
+            run = existing.get(key)
+            if run is not None:
+                packed = AnalysisRuleRun.pack(set(run.stock_ids) | group["stock_ids"])
+                run.matched_stock_ids = packed
+                run.matched_count = len(packed) // 4
+                run.run_at = max(run.run_at, group["run_at"])
+                continue
+            packed = AnalysisRuleRun.pack(group["stock_ids"])
+            records.append({
+                "rule_id": key[0],
+                "task_id": key[1],
+                "source": "legacy",
+                "run_at": group["run_at"],
+                "matched_count": len(packed) // 4,
+                "matched_stock_ids": packed,
+            })
+        db.bulk_insert_mappings(AnalysisRuleRun, records)
+        # 本批是 ID 最小的连续若干行，按 ID 区间删除
+        legacy_rows += db.query(AnalysisResult).filter(
+            AnalysisResult.id >= rows[0].id, AnalysisResult.id <= rows[-1].id
+        ).delete(synchronize_session=False)
+        runs += len(records)
         db.commit()
-        return True
-    return False
+
+    return {"legacy_rows": legacy_rows, "runs": runs}
+
+
+def purge_analysis_rule_runs(db: Session, retention_days: int) -> int:
+    """删除超过保留期的运行结果（每条规则最近一次运行除外），不提交事务"""
+    cutoff = datetime.now() - timedelta(days=retention_days)
+    keep = [run.id for run in get_latest_rule_runs(db)]
+    return db.query(AnalysisRuleRun).filter(
+        AnalysisRuleRun.run_at < cutoff,
+        ~AnalysisRuleRun.id.in_(keep)
+    ).delete(synchronize_session=False)
@@ -1,7 +1,10 @@
 from sqlalchemy.orm import Session
 from ..models.analysis_rule import AnalysisRule
+from ..models.analysis_result import AnalysisResult, AnalysisRuleRun
+from ..models.rule_evaluation_state import RuleEvaluationState, RuleMatchState, RuleMatchTransition
 from ..schemas.analysis_rule import AnalysisRuleCreate, AnalysisRuleUpdate
 from typing import Optional
+from .ai_script_cache import invalidate_script_cache
 
 
 def get_analysis_rule(db: Session, rule_id: int) -> Optional[AnalysisRule]:
@@ -22,6 +25,8 @@ def get_enabled_analysis_rules_by_user(db: Session, user_id: int, skip: int = 0,
 def create_analysis_rule(db: Session, rule: AnalysisRuleCreate, user_id: int) -> AnalysisRule:
     db_rule = AnalysisRule(**rule.model_dump(), user_id=user_id)
     db.add(db_rule)
+    # 规则集变化后缓存的 AI 分析脚本失效
+    invalidate_script_cache(db, user_id=user_id)
     db.commit()
     db.refresh(db_rule)
     return db_rule
@@ -33,6 +38,7 @@ def update_analysis_rule(db: Session, rule_id: int, rule: AnalysisRuleUpdate) ->
         update_data = rule.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_rule, key, value)
+        invalidate_script_cache(db, user_id=db_rule.user_id)
         db.commit()
         db.refresh(db_rule)
     return db_rule
@@ -41,6 +47,10 @@ def update_analysis_rule(db: Session, rule_id: int, rule: AnalysisRuleUpdate) ->
 def delete_analysis_rule(db: Session, rule_id: int) -> bool:
     db_rule = get_analysis_rule(db, rule_id)
     if db_rule:
+        # 规则的运行结果及增量评估状态随规则一起删除
+        for model in (AnalysisResult, AnalysisRuleRun, RuleMatchState, RuleMatchTransition, RuleEvaluationState):
+            db.query(model).filter(model.rule_id == rule_id).delete(synchronize_session=False)
+        invalidate_script_cache(db, user_id=db_rule.user_id)
         db.delete(db_rule)
         db.commit()
         return True
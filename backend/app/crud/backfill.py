@@ -0,0 +1,77 @@
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional, Dict, Any
+from ..models.backfill_job import BackfillJob, BackfillShard
+
+
+def get_backfill_job(db: Session, job_id: int) -> Optional[BackfillJob]:
+    return db.query(BackfillJob).filter(BackfillJob.id == job_id).first()
+
+
+def get_backfill_jobs(db: Session, skip: int = 0, limit: int = 100, status: Optional[str] = None) -> List[BackfillJob]:
+    query = db.query(BackfillJob)
+    if status:
+        query = query.filter(BackfillJob.status == status)
+    return query.order_by(BackfillJob.created_at.desc()).offset(skip).limit(limit).all()
+
+
+def create_backfill_job(db: Session, job_data: Dict[str, Any], shards: List[Dict[str, Any]]) -> BackfillJob:
+    db_job = BackfillJob(**job_data, total_shards=len(shards))
+    db.add(db_job)
+    db.flush()
+    db.bulk_insert_mappings(BackfillShard, [{**shard, "job_id": db_job.id} for shard in shards])
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+
+def get_backfill_shards(db: Session, job_id: int, status: Optional[str] = None, skip: int = 0, limit: int = 1000) -> List[BackfillShard]:
+    query = db.query(BackfillShard).filter(BackfillShard.job_id == job_id)
+    if status:
+        query = query.filter(BackfillShard.status == status)
+    return query.order_by(BackfillShard.id).offset(skip).limit(limit).all()
+
+
+def get_unfinished_shards(db: Session, job_id: int) -> List[BackfillShard]:
+    """待执行的分片（pending/failed），其他进程正在执行的 running 分片不包含在内"""
+    return db.query(BackfillShard).filter(
+        BackfillShard.job_id == job_id,
+        BackfillShard.status.in_(("pending", "failed"))
+    ).order_by(BackfillShard.id).all()
+
+
+def claim_backfill_shard(db: Session, shard_id: int, owner: str) -> bool:
+    """条件更新认领分片，已被其他进程认领时返回 False"""
+    claimed = db.query(BackfillShard).filter(
+        BackfillShard.id == shard_id,
+        BackfillShard.status.in_(("pending", "failed"))
+    ).update({
+        "status": "running",
+        "owner": owner,
+        "heartbeat_at": datetime.utcnow(),
+        "attempts": BackfillShard.attempts + 1,
+    }, synchronize_session=False)
+    db.commit()
+    return claimed == 1
+
+
+def heartbeat_backfill_shards(db: Session, job_id: int, owner: str) -> int:
+    count = db.query(BackfillShard).filter(
+        BackfillShard.job_id == job_id,
+        BackfillShard.owner == owner,
+        BackfillShard.status == "running"
+    ).update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    return count
+
+
+def reset_interrupted_shards(db: Session, job_id: int, stale_before: datetime) -> int:
+    """将心跳超时（执行进程已退出）的 running 分片重置为 pending，仍有心跳的分片不动"""
+    count = db.query(BackfillShard).filter(
+        BackfillShard.job_id == job_id,
+        BackfillShard.status == "running",
+        or_(BackfillShard.heartbeat_at == None, BackfillShard.heartbeat_at < stale_before)
+    ).update({"status": "pending", "owner": None}, synchronize_session=False)
+    db.commit()
+    return count
@@ -0,0 +1,71 @@
+from sqlalchemy.orm import Session
+from typing import Any, List, Tuple
+import pandas as pd
+from ..services.data_transform import ModelMapping, frame_to_records
+
+
+class BulkWriteResult:
+    """批量写入结果，记录新增和更新的业务键"""
+
+    def __init__(self):
+        self.inserted: List[Tuple[Any, ...]] = []
+        self.updated: List[Tuple[Any, ...]] = []
+
+    def __repr__(self):
+        return f"<BulkWriteResult(inserted={len(self.inserted)}, updated={len(self.updated)})>"
+
+
+def _fetch_existing(db: Session, mapping: ModelMapping, frame: pd.DataFrame, lookup_chunk: int) -> pd.DataFrame:
+    """集合查询已存在的业务键：首个键列 IN 分块，其余键列按取值范围过滤"""
+    model = mapping.model
+    first_key, other_keys = mapping.key_columns[0], mapping.key_columns[1:]
+    select_columns = list(dict.fromkeys(mapping.key_columns + mapping.primary_keys))
+    bounds = [
+        getattr(model, key).between(frame[key].min(), frame[key].max())
+        for key in other_keys
+    ]
+
+    rows = []
+    values = frame[first_key].unique().tolist()
+    for start in range(0, len(values), lookup_chunk):
+        query = db.query(*[getattr(model, column) for column in select_columns]).filter(
+            getattr(model, first_key).in_(values[start:start + lookup_chunk]),
+            *bounds
+        )
+        rows.extend(query.all())
+    return pd.DataFrame.from_records(rows, columns=select_columns)
+
+
+def bulk_upsert(db: Session, mapping: ModelMapping, frame: pd.DataFrame, chunk_size: int = 5000, lookup_chunk: int = 500) -> BulkWriteResult:
+    """按业务键批量插入或更新，不提交事务
+
+    先一次性查出已存在的键，再用 DataFrame 合并区分新增/更新，
+    分别以 executemany 批量写入，避免逐行查询和逐个构造 ORM 对象。
+    """
+    result = BulkWriteResult()
+    if frame.empty:
+        return result
+
+    keys = mapping.key_columns
+    existing = _fetch_existing(db, mapping, frame, lookup_chunk)
+    merged = frame.merge(existing, on=keys, how="left", indicator=True, suffixes=("", "_existing"))
+    new_rows = merged[merged["_merge"] == "left_only"].drop(columns=["_merge"])
+    update_rows = merged[merged["_merge"] == "both"].drop(columns=["_merge"])
+
+    # 代理主键只在更新时需要
+    surrogate_keys = [column for column in mapping.primary_keys if column not in keys]
+    new_rows = new_rows.drop(columns=[column for column in surrogate_keys if column in new_rows.columns])
+    for column in surrogate_keys:
+        update_rows[column] = update_rows[column].astype("int64")
+
+    insert_records = frame_to_records(new_rows)
+    for start in range(0, len(insert_records), chunk_size):
+        db.bulk_insert_mappings(mapping.model, insert_records[start:start + chunk_size])
+
+    update_records = frame_to_records(update_rows)
+    for start in range(0, len(update_records), chunk_size):
+        db.bulk_update_mappings(mapping.model, update_records[start:start + chunk_size])
+
+    result.inserted = list(new_rows[keys].itertuples(index=False, name=None))
+    result.updated = list(update_rows[keys].itertuples(index=False, name=None))
+    return result
@@ -0,0 +1,46 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import List, Optional
+from ..models.data_change_log import DataChangeLog
+
+# 清理过期变更日志时每批删除的 ID 跨度
+PURGE_CHUNK = 10000
+
+
+def get_data_changes(
+    db: Session,
+    since_id: int = 0,
+    table_name: Optional[str] = None,
+    ts_code: Optional[str] = None,
+    limit: int = 1000
+) -> List[DataChangeLog]:
+    """按 ID 递增读取 since_id 之后的变更，供订阅方断点续读"""
+    query = db.query(DataChangeLog).filter(DataChangeLog.id > since_id)
+    if table_name:
+        query = query.filter(DataChangeLog.table_name == table_name)
+    if ts_code:
+        query = query.filter(DataChangeLog.ts_code == ts_code)
+    return query.order_by(DataChangeLog.id).limit(limit).all()
+
+
+def get_latest_change_id(db: Session) -> int:
+    latest = db.query(DataChangeLog.id).order_by(DataChangeLog.id.desc()).first()
+    return latest.id if latest else 0
+
+
+def purge_data_changes(db: Session, retention_days: int, chunk_size: int = PURGE_CHUNK) -> int:
+    """删除超过保留期的变更日志，按 ID 分批删除、每批提交；返回删除条数"""
+    cutoff = datetime.now() - timedelta(days=retention_days)
+    # ID 随写入时间递增，删除截止时间之前最大 ID 及以前的全部行
+    max_id = db.query(func.max(DataChangeLog.id)).filter(DataChangeLog.created_at < cutoff).scalar()
+    min_id = db.query(func.min(DataChangeLog.id)).scalar()
+    if not max_id or not min_id:
+        return 0
+    deleted = 0
+    for start in range(min_id, max_id + 1, chunk_size):
+        deleted += db.query(DataChangeLog).filter(
+            DataChangeLog.id >= start, DataChangeLog.id <= min(start + chunk_size - 1, max_id)
+        ).delete(synchronize_session=False)
+        db.commit()
+    return deleted
@@ -0,0 +1,192 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from ..models.queue_job import QueueJob
+
+ACTIVE_QUEUE_JOB_STATUSES = ("queued", "running")
+
+# 支持 SELECT ... FOR UPDATE SKIP LOCKED 的数据库
+SKIP_LOCKED_DIALECTS = ("postgresql", "mysql", "mariadb", "oracle")
+
+
+def get_queue_job(db: Session, job_id: int) -> Optional[QueueJob]:
+    return db.query(QueueJob).filter(QueueJob.id == job_id).first()
+
+
+def get_queue_jobs(db: Session, queue: Optional[str] = None, status: Optional[str] = None,
+                   skip: int = 0, limit: int = 50) -> List[QueueJob]:
+    query = db.query(QueueJob)
+    if queue:
+        query = query.filter(QueueJob.queue == queue)
+    if status:
+        query = query.filter(QueueJob.status == status)
+    return query.order_by(QueueJob.id.desc()).offset(skip).limit(limit).all()
+
+
+def enqueue_job(db: Session, queue: str, job_type: str, payload: Dict[str, Any], priority: int = 1,
+                delay_seconds: float = 0, dedupe_key: Optional[str] = None, max_attempts: int = 3) -> QueueJob:
+    """入队；指定 dedupe_key 且相同键的作业仍在排队或执行时直接返回该作业"""
+    if dedupe_key:
+        existing = db.query(QueueJob).filter(
+            QueueJob.dedupe_key == dedupe_key,
+            QueueJob.status.in_(ACTIVE_QUEUE_JOB_STATUSES)
+        ).first()
+        if existing:
+            return existing
+
+    db_job = QueueJob(
+        queue=queue,
+        job_type=job_type,
+        payload=payload,
+        dedupe_key=dedupe_key,
+        status="queued",
+        priority=priority,
+        max_attempts=max_attempts,
+        available_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+
+def claim_jobs(db: Session, queue: str, worker_id: str, limit: int, max_running: Optional[int] = None) -> List[QueueJob]:
+    """认领队列中已到期的作业（按优先级、到期时间），返回认领成功的作业
+
+    PostgreSQL/MySQL 使用 FOR UPDATE SKIP LOCKED，多个工作进程并发认领互不阻塞；
+    SQLite 没有行锁，逐个以 status='queued' 为条件更新，更新成功才算认领。
+    max_running 为该队列在所有工作进程上同时执行的上限（认领前按当前执行数扣减）。
+    """
+    if max_running is not None:
+        running = db.query(func.count(QueueJob.id)).filter(
+            QueueJob.queue == queue, QueueJob.status == "running"
+        ).scalar()
+        limit = min(limit, max_running - running)
+    if limit <= 0:
+        db.rollback()
+        return []
+
+    now = datetime.utcnow()
+    claim_values = {
+        "status": "running",
+        "locked_by": worker_id,
+        "locked_at": now,
+        "heartbeat_at": now,
+        "attempts": QueueJob.attempts + 1,
+    }
+    candidates = db.query(QueueJob.id).filter(
+        QueueJob.queue == queue,
+        QueueJob.status == "queued",
+        QueueJob.available_at <= now
+    ).order_by(QueueJob.priority, QueueJob.available_at, QueueJob.id)
+
+    if db.get_bind().dialect.name in SKIP_LOCKED_DIALECTS:
+        claimed = [job_id for job_id, in candidates.limit(limit).with_for_update(skip_locked=True).all()]
+        if claimed:
+            db.query(QueueJob).filter(QueueJob.id.in_(claimed)).update(claim_values, synchronize_session=False)
+    else:
+        # 多取一些候选，被其他进程抢先认领的跳过
+        claimed = []
+        for job_id, in candidates.limit(limit * 2).all():
+            updated = db.query(QueueJob).filter(
+                QueueJob.id == job_id, QueueJob.status == "queued"
+            ).update(claim_values, synchronize_session=False)
+            if updated:
+                claimed.append(job_id)
+                if len(claimed) >= limit:
+                    break
+    db.commit()
+
+    if not claimed:
+        return []
+    return db.query(QueueJob).filter(QueueJob.id.in_(claimed)).order_by(QueueJob.priority, QueueJob.id).all()
+
+
+def heartbeat_jobs(db: Session, worker_id: str, job_ids: List[int]) -> int:
+    """刷新工作进程仍持有的作业心跳，返回刷新成功的作业数（少于 job_ids 说明部分作业已被重新分配）"""
+    if not job_ids:
+        return 0
+    updated = db.query(QueueJob).filter(
+        QueueJob.id.in_(job_ids),
+        QueueJob.locked_by == worker_id,
+        QueueJob.status == "running"
+    ).update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    return updated
+
+
+def complete_job(db: Session, job_id: int, worker_id: str, result: Any = None, message: Optional[str] = None) -> bool:
+    """标记作业完成；作业已被重新分配给其他工作进程时返回 False"""
+    updated = db.query(QueueJob).filter(
+        QueueJob.id == job_id,
+        QueueJob.locked_by == worker_id,
+        QueueJob.status == "running"
+    ).update({
+        "status": "completed",
+        "result": result,
+        "message": message,
+        "finished_at": datetime.utcnow(),
+    }, synchronize_session=False)
+    db.commit()
+    return bool(updated)
+
+
+def fail_job(db: Session, job_id: int, worker_id: str, message: str, retry_delay: float = 0) -> Optional[str]:
+    """作业执行失败：认领次数未用完时延迟重新入队，否则标记失败；返回新状态"""
+    job = db.query(QueueJob).filter(
+        QueueJob.id == job_id,
+        QueueJob.locked_by == worker_id,
+        QueueJob.status == "running"
+    ).first()
+    if not job:
+        db.rollback()
+        return None
+
+    now = datetime.utcnow()
+    job.message = message
+    job.locked_by = None
+    if job.attempts < job.max_attempts:
+        job.status = "queued"
+        job.available_at = now + timedelta(seconds=retry_delay)
+    else:
+        job.status = "failed"
+        job.finished_at = now
+    db.commit()
+    return job.status
+
+
+def requeue_expired_jobs(db: Session, visibility_timeout: int) -> int:
+    """超过可见性超时未心跳的执行中作业视为工作进程失联：重新入队，认领次数用完的标记失败"""
+    now = datetime.utcnow()
+    expired = db.query(QueueJob).filter(
+        QueueJob.status == "running",
+        QueueJob.heartbeat_at < now - timedelta(seconds=visibility_timeout)
+    )
+    failed = expired.filter(QueueJob.attempts >= QueueJob.max_attempts).update({
+        "status": "failed",
+        "locked_by": None,
+        "message": "工作进程失联，重试次数已用完",
+        "finished_at": now,
+    }, synchronize_session=False)
+    requeued = expired.filter(QueueJob.attempts < QueueJob.max_attempts).update({
+        "status": "queued",
+        "locked_by": None,
+        "available_at": now,
+        "message": "工作进程失联，重新入队",
+    }, synchronize_session=False)
+    db.commit()
+    return failed + requeued
+
+
+def get_job_queue_stats(db: Session) -> Dict[str, Any]:
+    """各队列按状态统计的作业数，以及当前持有作业的工作进程"""
+    queues: Dict[str, Dict[str, int]] = {}
+    for queue, status, count in db.query(QueueJob.queue, QueueJob.status, func.count(QueueJob.id)).group_by(
+        QueueJob.queue, QueueJob.status
+    ):
+        queues.setdefault(queue, {})[status] = count
+    workers = [worker for worker, in db.query(QueueJob.locked_by).filter(
+        QueueJob.status == "running", QueueJob.locked_by.isnot(None)
+    ).distinct()]
+    return {"queues": queues, "workers": workers}
@@ -0,0 +1,29 @@
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import List, Optional
+from ..models.moneyflow_hsgt import MoneyflowHsgt
+from ..models.top_list import TopList
+
+
+def get_moneyflow_hsgt(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[MoneyflowHsgt]:
+    query = db.query(MoneyflowHsgt)
+    if start_date:
+        query = query.filter(MoneyflowHsgt.trade_date >= start_date)
+    if end_date:
+        query = query.filter(MoneyflowHsgt.trade_date <= end_date)
+    return query.order_by(MoneyflowHsgt.trade_date).all()
+
+
+def get_top_list_by_date(db: Session, trade_date: date) -> List[TopList]:
+    """某个交易日的完整龙虎榜，按净买入额降序"""
+    return db.query(TopList).filter(TopList.trade_date == trade_date).order_by(TopList.net_amount.desc()).all()
+
+
+def get_top_list_by_stock(db: Session, ts_code: str, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[TopList]:
+    """某只股票在区间内的上榜记录"""
+    query = db.query(TopList).filter(TopList.ts_code == ts_code)
+    if start_date:
+        query = query.filter(TopList.trade_date >= start_date)
+    if end_date:
+        query = query.filter(TopList.trade_date <= end_date)
+    return query.order_by(TopList.trade_date).all()
@@ -0,0 +1,30 @@
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ..models.rule_evaluation_state import RuleEvaluationState, RuleMatchState, RuleMatchTransition
+
+
+def get_rule_evaluation_state(db: Session, rule_id: int) -> Optional[RuleEvaluationState]:
+    return db.query(RuleEvaluationState).filter(RuleEvaluationState.rule_id == rule_id).first()
+
+
+def get_rule_matches(db: Session, rule_id: int, skip: int = 0, limit: int = 100) -> List[RuleMatchState]:
+    """规则当前命中的股票"""
+    return db.query(RuleMatchState).filter(
+        RuleMatchState.rule_id == rule_id
+    ).order_by(RuleMatchState.stock_id).offset(skip).limit(limit).all()
+
+
+def get_rule_transitions(
+    db: Session,
+    rule_id: Optional[int] = None,
+    stock_id: Optional[int] = None,
+    since_id: int = 0,
+    limit: int = 100
+) -> List[RuleMatchTransition]:
+    """按 ID 递增读取 since_id 之后的命中状态变化，供通知等订阅方断点续读"""
+    query = db.query(RuleMatchTransition).filter(RuleMatchTransition.id > since_id)
+    if rule_id is not None:
+        query = query.filter(RuleMatchTransition.rule_id == rule_id)
+    if stock_id is not None:
+        query = query.filter(RuleMatchTransition.stock_id == stock_id)
+    return query.order_by(RuleMatchTransition.id).limit(limit).all()
@@ -0,0 +1,30 @@
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import Iterable, Set, Tuple
+from ..models.sync_empty_fetch import SyncEmptyFetch
+
+# 市场级接口（按交易日整表拉取）记录时使用的证券代码
+MARKET_TS_CODE = "*"
+
+
+def get_empty_fetches(db: Session, interface_name: str, start_date: date, end_date: date) -> Set[Tuple[str, date]]:
+    """区间内上游确认无数据的 (证券代码, 交易日)"""
+    rows = db.query(SyncEmptyFetch.ts_code, SyncEmptyFetch.trade_date).filter(
+        SyncEmptyFetch.interface_name == interface_name,
+        SyncEmptyFetch.trade_date.between(start_date, end_date)
+    ).all()
+    return {(ts_code, trade_date) for ts_code, trade_date in rows}
+
+
+def record_empty_fetches(db: Session, interface_name: str, pairs: Iterable[Tuple[str, date]]) -> int:
+    """记录拉取成功但上游没有数据的 (证券代码, 交易日)，已记录的跳过，不提交事务；返回新增条数"""
+    pairs = set(pairs)
+    if not pairs:
+        return 0
+    days = [trade_date for _, trade_date in pairs]
+    pairs -= get_empty_fetches(db, interface_name, min(days), max(days))
+    db.bulk_insert_mappings(SyncEmptyFetch, [
+        {"interface_name": interface_name, "ts_code": ts_code, "trade_date": trade_date}
+        for ts_code, trade_date in pairs
+    ])
+    return len(pairs)
@@ -0,0 +1,68 @@
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from ..models.sync_job import SyncJob
+
+ACTIVE_SYNC_JOB_STATUSES = ("queued", "running")
+
+
+def get_sync_job(db: Session, job_id: int) -> Optional[SyncJob]:
+    return db.query(SyncJob).filter(SyncJob.id == job_id).first()
+
+
+def get_sync_jobs(db: Session, skip: int = 0, limit: int = 20, status: Optional[str] = None) -> List[SyncJob]:
+    query = db.query(SyncJob)
+    if status:
+        query = query.filter(SyncJob.status == status)
+    return query.order_by(SyncJob.id.desc()).offset(skip).limit(limit).all()
+
+
+def get_active_sync_jobs(db: Session) -> List[SyncJob]:
+    return db.query(SyncJob).filter(SyncJob.status.in_(ACTIVE_SYNC_JOB_STATUSES)).order_by(SyncJob.id).all()
+
+
+def find_active_sync_job(db: Session, job_type: str, params: Dict[str, Any]) -> Optional[SyncJob]:
+    """查找参数相同、仍在排队或执行中的作业"""
+    for job in db.query(SyncJob).filter(SyncJob.job_type == job_type, SyncJob.status.in_(ACTIVE_SYNC_JOB_STATUSES)):
+        if (job.params or {}) == params:
+            return job
+    return None
+
+
+def get_last_finished_sync_job(db: Session) -> Optional[SyncJob]:
+    return db.query(SyncJob).filter(SyncJob.finished_at.isnot(None)).order_by(SyncJob.finished_at.desc()).first()
+
+
+def create_sync_job(db: Session, job_type: str, params: Dict[str, Any], created_by: Optional[int] = None,
+                    owner: Optional[str] = None) -> SyncJob:
+    db_job = SyncJob(
+        job_type=job_type, params=params, status="queued", created_by=created_by,
+        owner=owner, heartbeat_at=datetime.utcnow()
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+
+def heartbeat_sync_jobs(db: Session, owner: str) -> int:
+    count = db.query(SyncJob).filter(
+        SyncJob.owner == owner,
+        SyncJob.status.in_(ACTIVE_SYNC_JOB_STATUSES)
+    ).update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    return count
+
+
+def fail_interrupted_sync_jobs(db: Session, stale_before: datetime) -> int:
+    """把心跳超时（执行进程已退出）的未完成作业标记为失败，其他进程仍在执行的作业不动"""
+    count = db.query(SyncJob).filter(
+        SyncJob.status.in_(ACTIVE_SYNC_JOB_STATUSES),
+        or_(SyncJob.heartbeat_at == None, SyncJob.heartbeat_at < stale_before)
+    ).update(
+        {"status": "failed", "message": "执行进程已退出，作业中断", "finished_at": datetime.now()},
+        synchronize_session=False
+    )
+    db.commit()
+    return count
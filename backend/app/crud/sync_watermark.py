@@ -0,0 +1,64 @@
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Mapping, Optional
+import pandas as pd
+from ..models.sync_watermark import SyncWatermark
+
+
+def get_sync_watermarks(db: Session, interface_name: str, ts_codes: Optional[Iterable[str]] = None,
+                        lookup_chunk: int = 500) -> Dict[str, date]:
+    """读取接口下各证券代码的水位线，未指定代码时返回该接口的全部水位线"""
+    query = db.query(SyncWatermark.ts_code, SyncWatermark.last_trade_date).filter(
+        SyncWatermark.interface_name == interface_name
+    )
+    if ts_codes is None:
+        return {ts_code: last_trade_date for ts_code, last_trade_date in query.all()}
+
+    codes = list(dict.fromkeys(ts_codes))
+    watermarks = {}
+    for start in range(0, len(codes), lookup_chunk):
+        rows = query.filter(SyncWatermark.ts_code.in_(codes[start:start + lookup_chunk])).all()
+        watermarks.update({ts_code: last_trade_date for ts_code, last_trade_date in rows})
+    return watermarks
+
+
+def frame_watermarks(frame: pd.DataFrame) -> Dict[str, date]:
+    """从转换后的 DataFrame 中求出每个代码本次写入的最新交易日"""
+    if frame.empty or "ts_code" not in frame.columns or "trade_date" not in frame.columns:
+        return {}
+    valid = frame[frame["ts_code"].notna() & frame["trade_date"].notna()]
+    return valid.groupby("ts_code")["trade_date"].max().to_dict()
+
+
+def advance_sync_watermarks(db: Session, interface_name: str, latest: Mapping[str, date]) -> int:
+    """把水位线推进到本次写入的最新交易日（只前进不后退），不提交事务
+
+    只能用于每个代码从水位线下一天（没有水位线时从全部历史）起连续拉取的数据：
+    按交易日全市场拉取或补缺口的数据会让水位线越过尚未入库的历史。
+    与数据写入放在同一事务中，保证水位线不会领先于已提交的数据。
+    返回实际推进的代码数。
+    """
+    if not latest:
+        return 0
+    existing = get_sync_watermarks(db, interface_name, latest.keys())
+    now = datetime.now()
+    inserts, updates = [], []
+    for ts_code, trade_date in latest.items():
+        current = existing.get(ts_code)
+        if current is None:
+            inserts.append({"interface_name": interface_name, "ts_code": ts_code, "last_trade_date": trade_date, "updated_at": now})
+        elif trade_date > current:
+            updates.append({"interface_name": interface_name, "ts_code": ts_code, "last_trade_date": trade_date, "updated_at": now})
+
+    if inserts:
+        db.bulk_insert_mappings(SyncWatermark, inserts)
+    if updates:
+        db.bulk_update_mappings(SyncWatermark, updates)
+    return len(inserts) + len(updates)
+
+
+def incremental_start_date(watermark: Optional[date]) -> Optional[str]:
+    """水位线的下一天，作为增量同步的 start_date (YYYYMMDD)；没有水位线时返回 None"""
+    if watermark is None:
+        return None
+    return (watermark + timedelta(days=1)).strftime("%Y%m%d")
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from ..models.system_setting import SystemSetting
 from ..schemas.system_setting import SystemSettingCreate, SystemSettingUpdate
 from typing import Optional
+from .ai_script_cache import invalidate_script_cache
 import json
 
 
@@ -121,6 +122,9 @@ def update_ai_settings(db: Session, settings: dict) -> bool:
         set_setting_value(db, 'ai_temperature', str(int(settings.get('temperature', 0.7) * 100)), 'integer', 'ai', 'AI 温度参数')
         set_setting_value(db, 'ai_max_tokens', str(settings.get('max_tokens', 2000)), 'integer', 'ai', 'AI 最大 Token 数')
         set_setting_value(db, 'ai_timeout', str(settings.get('timeout', 60)), 'integer', 'ai', 'AI 请求超时时间')
+        # 提供商/模型可能变化，缓存的 AI 分析脚本全部失效
+        invalidate_script_cache(db)
+        db.commit()
         return True
     except Exception as e:
         db.rollback()
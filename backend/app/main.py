@@ -1,16 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import Base, engine
+from .database import Base, engine, SessionLocal
 from .api.v1 import (
     auth, users, stocks, user_stocks, investment_notes, uploaded_files, 
     analysis_rules, analysis_results, sync, system_settings, analysis_tasks, 
     sync_management, index_daily, stock_daily, financials,
-    quant_strategies, trading
+    quant_strategies, trading, backfill
 )
 from .core.config import settings
-from .services.data_sync_scheduler import run_scheduler
+from .services.sync_job_service import fail_stale_sync_jobs
 import os
-import threading
 
 Base.metadata.create_all(bind=engine)
 
@@ -43,10 +42,16 @@ app.include_router(stock_daily.router, prefix="/api/v1/stock-daily", tags=["stoc
 app.include_router(financials.router, prefix="/api/v1/financials", tags=["financials"])
 app.include_router(quant_strategies.router, prefix="/api/v1/quant-strategies", tags=["quant-strategies"])
 app.include_router(trading.router, prefix="/api/v1/trading", tags=["trading"])
+app.include_router(backfill.router, prefix="/api/v1/backfill", tags=["backfill"])
 
 
 @app.on_event("startup")
 def startup_event():
-    scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-    scheduler_thread.start()
-    print("Data sync scheduler started")
+    db = SessionLocal()
+    try:
+        # 只处理心跳已超时的作业，其他工作进程仍在执行的作业不受影响
+        interrupted = fail_stale_sync_jobs(db)
+        if interrupted:
+            print(f"Marked {interrupted} interrupted sync jobs as failed")
+    finally:
+        db.close()
@@ -5,7 +5,8 @@ from .user_stock import UserStock
 from .investment_note import InvestmentNote
 from .uploaded_file import UploadedFile
 from .analysis_rule import AnalysisRule
-from .analysis_result import AnalysisResult
+from .analysis_result import AnalysisResult, AnalysisRuleRun
+from .ai_script_cache import AIScriptCache
 from .system_setting import SystemSetting
 from .sync_interface import SyncInterface
 from .sync_task import SyncTask
@@ -13,8 +14,20 @@ from .sync_execution_log import SyncExecutionLog
 from .stock_daily import StockDaily
 from .stock_daily_basic import StockDailyBasic
 from .stock_moneyflow import StockMoneyflow
+from .moneyflow_hsgt import MoneyflowHsgt
+from .top_list import TopList
 from .index_basic import IndexBasic
 from .index_daily import IndexDaily
+from .trade_calendar import TradeCalendar
+from .backfill_job import BackfillJob, BackfillShard
+from .data_change_log import DataChangeLog
+from .sync_watermark import SyncWatermark
+from .sync_empty_fetch import SyncEmptyFetch
+from .sync_job import SyncJob
+from .scheduler_lease import SchedulerLease
+from .queue_job import QueueJob
+from .scheduler_job_run import SchedulerJobRun
+from .rule_evaluation_state import RuleEvaluationState, RuleMatchState, RuleMatchTransition, RuleFeatureBaseline
 from .quant_strategy import (
     QuantStrategy,
     StrategyVersion,
@@ -45,6 +58,8 @@ __all__ = [
     'UploadedFile',
     'AnalysisRule',
     'AnalysisResult',
+    'AnalysisRuleRun',
+    'AIScriptCache',
     'SystemSetting',
     'SyncInterface',
     'SyncTask',
@@ -52,8 +67,24 @@ __all__ = [
     'StockDaily',
     'StockDailyBasic',
     'StockMoneyflow',
+    'MoneyflowHsgt',
+    'TopList',
     'IndexBasic',
     'IndexDaily',
+    'TradeCalendar',
+    'BackfillJob',
+    'BackfillShard',
+    'DataChangeLog',
+    'SyncWatermark',
+    'SyncEmptyFetch',
+    'SyncJob',
+    'SchedulerLease',
+    'QueueJob',
+    'SchedulerJobRun',
+    'RuleEvaluationState',
+    'RuleMatchState',
+    'RuleMatchTransition',
+    'RuleFeatureBaseline',
     'QuantStrategy',
     'StrategyVersion',
     'BacktestResult',
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class AIScriptCache(Base):
+    """AI 生成脚本缓存 - 按规则集指纹（规则 ID/名称/描述/条件、提供商、模型）保存生成的分析脚本"""
+    __tablename__ = "ai_script_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fingerprint = Column(String(64), unique=True, nullable=False, index=True, comment="规则集指纹")
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    provider = Column(String(50), nullable=False, comment="AI 服务提供商")
+    model = Column(String(100), comment="AI 模型")
+    rule_ids = Column(JSON, default=[], comment="生成脚本时的规则 ID")
+    script = Column(Text, nullable=False)
+    reasoning = Column(Text)
+    hit_count = Column(Integer, default=0, comment="命中次数")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), comment="最近一次命中时间")
+
+    def __repr__(self):
+        return f"<AIScriptCache(user_id={self.user_id}, provider={self.provider}, hits={self.hit_count})>"
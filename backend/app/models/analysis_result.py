@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, JSON, Boolean, String, Text
+from typing import Iterable, List
+import numpy as np
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, JSON, Boolean, String, Text, LargeBinary, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -16,6 +18,50 @@ class AnalysisResult(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_analysis_results_rule_timestamp", "rule_id", "timestamp"),
+        Index("ix_analysis_results_stock_timestamp", "stock_id", "timestamp"),
+    )
+
+
+class AnalysisRuleRun(Base):
+    """规则运行结果 - 每条规则每次运行一行，命中的股票 ID 压缩为有序 int32 数组"""
+    __tablename__ = "analysis_rule_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    rule_id = Column(Integer, ForeignKey("analysis_rules.id"), nullable=False)
+    task_id = Column(Integer, ForeignKey("analysis_tasks.id"), index=True, comment="产生结果的分析任务")
+    source = Column(String(20), nullable=False, default="task", comment="task 分析任务, rule_engine 规则引擎, legacy 由旧结果压缩")
+    run_at = Column(DateTime(timezone=True), nullable=False, comment="运行时间")
+    matched_count = Column(Integer, nullable=False, default=0, comment="命中股票数")
+    matched_stock_ids = Column(LargeBinary, nullable=False, comment="命中股票 ID，升序 int32 小端序")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_analysis_rule_runs_rule_run_at", "rule_id", "run_at"),
+        Index("ix_analysis_rule_runs_run_at", "run_at"),
+    )
+
+    @staticmethod
+    def pack(stock_ids: Iterable[int]) -> bytes:
+        return np.unique(np.fromiter(stock_ids, dtype="<i4")).astype("<i4").tobytes()
+
+    @property
+    def stock_id_array(self) -> np.ndarray:
+        return np.frombuffer(self.matched_stock_ids or b"", dtype="<i4")
+
+    @property
+    def stock_ids(self) -> List[int]:
+        return self.stock_id_array.tolist()
+
+    def contains(self, stock_id: int) -> bool:
+        array = self.stock_id_array
+        position = np.searchsorted(array, stock_id)
+        return bool(position < len(array) and array[position] == stock_id)
+
+    def __repr__(self):
+        return f"<AnalysisRuleRun(rule_id={self.rule_id}, run_at={self.run_at}, matched={self.matched_count})>"
+
 
 class AnalysisTask(Base):
     __tablename__ = "analysis_tasks"
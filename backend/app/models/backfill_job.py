@@ -0,0 +1,64 @@
+from sqlalchemy import Column, Integer, String, Text, JSON, Float, Date, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from ..database import Base
+
+
+class BackfillJob(Base):
+    """历史数据回填任务模型"""
+    __tablename__ = "backfill_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_name = Column(String(200), comment="任务名称")
+    interfaces = Column(JSON, nullable=False, comment="回填的接口列表")
+    ts_codes = Column(JSON, default=[], comment="回填的证券代码列表")
+    start_date = Column(Date, nullable=False, comment="回填开始日期")
+    end_date = Column(Date, nullable=False, comment="回填结束日期")
+    window_days = Column(Integer, default=365, comment="每个分片的日期窗口(天)")
+    concurrency = Column(Integer, default=4, comment="并发分片数")
+    status = Column(String(20), default="pending", comment="任务状态: pending, running, completed, failed, partial")
+    total_shards = Column(Integer, default=0, comment="分片总数")
+    completed_shards = Column(Integer, default=0, comment="已完成分片数")
+    failed_shards = Column(Integer, default=0, comment="失败分片数")
+    rows_written = Column(Integer, default=0, comment="写入记录数")
+    api_calls = Column(Integer, default=0, comment="API 调用次数")
+    rows_per_sec = Column(Float, default=0, comment="写入速率(行/秒)")
+    calls_per_min = Column(Float, default=0, comment="调用速率(次/分钟)")
+    error_message = Column(Text, comment="错误信息")
+    started_at = Column(DateTime(timezone=True), comment="开始时间")
+    finished_at = Column(DateTime(timezone=True), comment="结束时间")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="创建时间")
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), comment="更新时间")
+
+    shards = relationship("BackfillShard", back_populates="job", cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<BackfillJob(id={self.id}, status={self.status}, shards={self.completed_shards}/{self.total_shards})>"
+
+
+class BackfillShard(Base):
+    """回填分片 - 每个完成的分片即为一个检查点"""
+    __tablename__ = "backfill_shards"
+    __table_args__ = (
+        UniqueConstraint("job_id", "interface_name", "ts_code", "start_date", name="uq_backfill_shard"),
+        Index("ix_backfill_shards_job_status", "job_id", "status"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("backfill_jobs.id", ondelete="CASCADE"), nullable=False)
+    interface_name = Column(String(100), nullable=False, comment="接口名称")
+    ts_code = Column(String(20), nullable=False, comment="证券代码")
+    start_date = Column(Date, nullable=False, comment="分片开始日期")
+    end_date = Column(Date, nullable=False, comment="分片结束日期")
+    status = Column(String(20), default="pending", comment="分片状态: pending, running, done, failed")
+    rows = Column(Integer, default=0, comment="写入记录数")
+    attempts = Column(Integer, default=0, comment="执行次数")
+    owner = Column(String(200), comment="正在执行该分片的进程标识")
+    heartbeat_at = Column(DateTime, comment="执行进程最近一次心跳时间 (UTC)")
+    error_message = Column(Text, comment="错误信息")
+    completed_at = Column(DateTime(timezone=True), comment="完成时间")
+
+    job = relationship("BackfillJob", back_populates="shards")
+
+    def __repr__(self):
+        return f"<BackfillShard(id={self.id}, {self.interface_name} {self.ts_code} {self.start_date}~{self.end_date}, status={self.status})>"
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Date, JSON, DateTime, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class DataChangeLog(Base):
+    """数据变更日志模型 - 每次提交按 (表, 证券代码) 记录被写入的交易日"""
+    __tablename__ = "data_change_logs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    batch_id = Column(String(32), nullable=False, index=True, comment="提交批次ID，同一事务内的变更共享")
+    table_name = Column(String(50), nullable=False, comment="变更的数据表")
+    source = Column(String(100), comment="变更来源，例如同步接口名称")
+    ts_code = Column(String(20), nullable=False, comment="证券代码")
+    min_trade_date = Column(Date, comment="最早变更交易日")
+    max_trade_date = Column(Date, comment="最晚变更交易日")
+    trade_dates = Column(JSON, default=[], comment="变更交易日列表 YYYYMMDD")
+    inserted = Column(Integer, default=0, comment="新增条数")
+    updated = Column(Integer, default=0, comment="更新条数")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="创建时间")
+
+    __table_args__ = (
+        Index("ix_data_change_logs_table_id", "table_name", "id"),
+        Index("ix_data_change_logs_ts_code", "ts_code", "max_trade_date"),
+        Index("ix_data_change_logs_created_at", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<DataChangeLog(id={self.id}, table={self.table_name}, ts_code={self.ts_code})>"
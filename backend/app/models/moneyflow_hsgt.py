@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Float, DateTime, Date
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class MoneyflowHsgt(Base):
+    """沪深港通资金流向表（Tushare moneyflow_hsgt），每个交易日一行"""
+    __tablename__ = "moneyflow_hsgt"
+
+    trade_date = Column(Date, primary_key=True, comment="交易日期")
+    ggt_ss = Column(Float, comment="港股通（上海）(百万元)")
+    ggt_sz = Column(Float, comment="港股通（深圳）(百万元)")
+    hgt = Column(Float, comment="沪股通(百万元)")
+    sgt = Column(Float, comment="深股通(百万元)")
+    north_money = Column(Float, comment="北向资金(百万元)")
+    south_money = Column(Float, comment="南向资金(百万元)")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="创建时间")
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class QueueJob(Base):
+    """作业队列模型 - 调度器/API 入队，独立工作进程认领执行（时间均为 UTC）"""
+    __tablename__ = "job_queue"
+
+    id = Column(Integer, primary_key=True, index=True)
+    queue = Column(String(50), nullable=False, comment="队列名称: sync, analysis")
+    job_type = Column(String(50), nullable=False, comment="作业类型: sync_task, analysis_task")
+    payload = Column(JSON, default={}, comment="作业参数")
+    dedupe_key = Column(String(200), comment="去重键，相同键的作业排队或执行中时不重复入队")
+    status = Column(String(20), default="queued", comment="作业状态: queued, running, completed, failed")
+    priority = Column(Integer, default=1, comment="优先级，数值越小越优先（同上游请求优先级）")
+    attempts = Column(Integer, default=0, comment="已认领次数")
+    max_attempts = Column(Integer, default=3, comment="最多认领次数，超过后标记为失败")
+    available_at = Column(DateTime, nullable=False, comment="最早可认领时间（延迟重试）")
+    locked_by = Column(String(200), comment="认领该作业的工作进程标识")
+    locked_at = Column(DateTime, comment="认领时间")
+    heartbeat_at = Column(DateTime, comment="最近心跳时间，超过可见性超时未更新视为工作进程失联")
+    message = Column(Text, comment="结果说明或错误信息")
+    result = Column(JSON, comment="作业结果")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="创建时间")
+    finished_at = Column(DateTime, comment="结束时间")
+
+    __table_args__ = (
+        Index("ix_job_queue_claim", "queue", "status", "priority", "available_at"),
+        Index("ix_job_queue_dedupe", "dedupe_key", "status"),
+    )
+
+    def __repr__(self):
+        return f"<QueueJob(id={self.id}, queue={self.queue}, type={self.job_type}, status={self.status})>"
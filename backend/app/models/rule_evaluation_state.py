@@ -0,0 +1,67 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class RuleEvaluationState(Base):
+    """规则评估状态 - 每条启用规则一行，记录上次评估时的条件指纹，条件变化后需全量重新评估"""
+    __tablename__ = "rule_evaluation_states"
+
+    rule_id = Column(Integer, ForeignKey("analysis_rules.id"), primary_key=True)
+    conditions_hash = Column(String(64), nullable=False, comment="规则条件指纹")
+    indicators = Column(JSON, default=[], comment="规则依赖的指标")
+    matched_count = Column(Integer, default=0, comment="当前命中的股票数")
+    evaluated_stocks = Column(Integer, default=0, comment="上次运行实际重新评估的股票数")
+    evaluated_at = Column(DateTime(timezone=True), comment="上次评估时间")
+
+    def __repr__(self):
+        return f"<RuleEvaluationState(rule_id={self.rule_id}, matched={self.matched_count})>"
+
+
+class RuleMatchState(Base):
+    """规则当前命中的股票 - 只保存命中的 (规则, 股票)，未命中不占行"""
+    __tablename__ = "rule_match_states"
+
+    id = Column(Integer, primary_key=True, index=True)
+    rule_id = Column(Integer, ForeignKey("analysis_rules.id"), nullable=False)
+    stock_id = Column(Integer, ForeignKey("stocks.id"), nullable=False, index=True)
+    matched_at = Column(DateTime(timezone=True), server_default=func.now(), comment="开始命中的时间")
+
+    __table_args__ = (
+        UniqueConstraint("rule_id", "stock_id", name="uq_rule_match_states_rule_stock"),
+    )
+
+    def __repr__(self):
+        return f"<RuleMatchState(rule_id={self.rule_id}, stock_id={self.stock_id})>"
+
+
+class RuleMatchTransition(Base):
+    """规则命中状态变化 - 新命中 (matched=True) 或不再命中 (matched=False)"""
+    __tablename__ = "rule_match_transitions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    rule_id = Column(Integer, ForeignKey("analysis_rules.id"), nullable=False)
+    stock_id = Column(Integer, ForeignKey("stocks.id"), nullable=False)
+    matched = Column(Boolean, nullable=False, comment="变化后的状态")
+    features = Column(JSON, comment="变化时规则依赖的指标取值")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_rule_match_transitions_rule_id", "rule_id", "id"),
+        Index("ix_rule_match_transitions_stock_id", "stock_id", "id"),
+    )
+
+    def __repr__(self):
+        return f"<RuleMatchTransition(rule_id={self.rule_id}, stock_id={self.stock_id}, matched={self.matched})>"
+
+
+class RuleFeatureBaseline(Base):
+    """上次规则评估使用的每只股票指标取值，与本次快照比较得出哪些股票的哪些指标发生了变化"""
+    __tablename__ = "rule_feature_baselines"
+
+    stock_id = Column(Integer, ForeignKey("stocks.id"), primary_key=True)
+    features = Column(JSON, nullable=False, comment="指标 -> 取值")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<RuleFeatureBaseline(stock_id={self.stock_id})>"
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Index
+from ..database import Base
+
+
+class SchedulerJobRun(Base):
+    """调度作业运行记录 - 每次触发的计划/实际开始时间、耗时及错过/重叠/合并事件（时间为 UTC）"""
+    __tablename__ = "scheduler_job_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String(200), nullable=False, comment="调度作业 ID：同步任务 ID 或 system:* 系统作业")
+    holder = Column(String(200), comment="执行该作业的调度进程标识")
+    status = Column(String(20), nullable=False, comment="success 成功, error 出错, missed 超过容错时间被跳过, skipped 上次运行未结束被跳过")
+    scheduled_at = Column(DateTime, nullable=False, comment="计划触发时间")
+    submitted_at = Column(DateTime, comment="提交到执行器的时间")
+    started_at = Column(DateTime, comment="实际开始执行的时间")
+    finished_at = Column(DateTime, comment="结束时间")
+    lag_ms = Column(Float, comment="实际开始 - 计划触发（毫秒）")
+    wait_ms = Column(Float, comment="实际开始 - 提交执行器，即执行器排队时间（毫秒）")
+    duration_ms = Column(Float, comment="运行耗时（毫秒）")
+    coalesced = Column(Integer, default=0, comment="本次触发合并掉的错过触发次数")
+    queue_depth = Column(Integer, default=0, comment="提交时执行器中已排队未开始的作业数")
+    error = Column(Text, comment="错误信息")
+
+    __table_args__ = (
+        Index("ix_scheduler_job_runs_job_scheduled", "job_id", "scheduled_at"),
+        Index("ix_scheduler_job_runs_scheduled", "scheduled_at"),
+    )
+
+    def __repr__(self):
+        return f"<SchedulerJobRun(job_id={self.job_id}, status={self.status}, lag_ms={self.lag_ms})>"
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, DateTime
+from ..database import Base
+
+
+class SchedulerLease(Base):
+    """调度器租约模型 - 多个进程竞争同一租约，持有且未过期者为 leader（时间均为 UTC）"""
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(50), primary_key=True, comment="租约名称")
+    holder = Column(String(200), nullable=False, comment="持有者标识 主机名:进程号:随机后缀")
+    acquired_at = Column(DateTime, nullable=False, comment="当前持有者取得租约的时间")
+    renewed_at = Column(DateTime, nullable=False, comment="最近续约时间")
+    expires_at = Column(DateTime, nullable=False, comment="租约到期时间，过期后其他进程可接管")
+
+    def __repr__(self):
+        return f"<SchedulerLease(name={self.name}, holder={self.holder}, expires_at={self.expires_at})>"
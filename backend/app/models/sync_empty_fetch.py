@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Date, DateTime
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class SyncEmptyFetch(Base):
+    """上游确认无数据的 (接口, 证券代码, 交易日) - 停牌、沪深港通休市等，缺口检测不再视为缺失"""
+    __tablename__ = "sync_empty_fetches"
+
+    interface_name = Column(String(100), primary_key=True, comment="同步接口名称")
+    ts_code = Column(String(20), primary_key=True, comment="证券代码，按交易日整表拉取的市场级接口为 *")
+    trade_date = Column(Date, primary_key=True, comment="交易日")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="确认时间")
+
+    def __repr__(self):
+        return f"<SyncEmptyFetch(interface={self.interface_name}, ts_code={self.ts_code}, trade_date={self.trade_date})>"
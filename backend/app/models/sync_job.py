@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class SyncJob(Base):
+    """手动同步作业模型 - /sync 接口提交的后台作业及其进度"""
+    __tablename__ = "sync_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(50), nullable=False, comment="作业类型: stocks, financials, all_stocks")
+    params = Column(JSON, default={}, comment="作业参数")
+    status = Column(String(20), default="queued", comment="作业状态: queued, running, completed, failed")
+    total = Column(Integer, default=0, comment="总项数")
+    done = Column(Integer, default=0, comment="已处理项数（含失败）")
+    failed = Column(Integer, default=0, comment="失败项数")
+    message = Column(Text, comment="结果说明或错误信息")
+    result = Column(JSON, comment="作业结果")
+    created_by = Column(Integer, comment="提交用户ID")
+    owner = Column(String(200), comment="执行该作业的进程标识")
+    heartbeat_at = Column(DateTime, comment="执行进程最近一次心跳时间 (UTC)")
+    started_at = Column(DateTime(timezone=True), comment="开始时间")
+    finished_at = Column(DateTime(timezone=True), comment="结束时间")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="创建时间")
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), comment="更新时间")
+
+    __table_args__ = (
+        Index("ix_sync_jobs_status_type", "status", "job_type"),
+    )
+
+    def __repr__(self):
+        return f"<SyncJob(id={self.id}, type={self.job_type}, status={self.status}, done={self.done}/{self.total})>"
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Date, DateTime
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class SyncWatermark(Base):
+    """同步水位线模型 - 记录每个 (接口, 证券代码) 从最早历史起连续入库到的最新交易日"""
+    __tablename__ = "sync_watermarks"
+
+    interface_name = Column(String(100), primary_key=True, comment="同步接口名称")
+    ts_code = Column(String(20), primary_key=True, comment="证券代码")
+    last_trade_date = Column(Date, nullable=False, comment="连续入库的最新交易日")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), comment="更新时间")
+
+    def __repr__(self):
+        return f"<SyncWatermark(interface={self.interface_name}, ts_code={self.ts_code}, last_trade_date={self.last_trade_date})>"
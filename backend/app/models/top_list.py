@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, Float, Integer, DateTime, Date, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class TopList(Base):
+    """龙虎榜每日明细表（Tushare top_list），同一股票同一天可因不同上榜理由出现多行"""
+    __tablename__ = "top_list"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ts_code = Column(String(20), nullable=False, comment="TS代码")
+    trade_date = Column(Date, nullable=False, comment="交易日期")
+    reason = Column(String(200), nullable=False, comment="上榜理由")
+    name = Column(String(50), comment="名称")
+    close = Column(Float, comment="收盘价")
+    pct_change = Column(Float, comment="涨跌幅(%)")
+    turnover_rate = Column(Float, comment="换手率(%)")
+    amount = Column(Float, comment="总成交额(元)")
+    l_sell = Column(Float, comment="龙虎榜卖出额(元)")
+    l_buy = Column(Float, comment="龙虎榜买入额(元)")
+    l_amount = Column(Float, comment="龙虎榜成交额(元)")
+    net_amount = Column(Float, comment="龙虎榜净买入额(元)")
+    net_rate = Column(Float, comment="龙虎榜净买额占比(%)")
+    amount_rate = Column(Float, comment="龙虎榜成交额占比(%)")
+    float_values = Column(Float, comment="当日流通市值(元)")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="创建时间")
+
+    __table_args__ = (
+        # 按交易日查询整张榜单
+        UniqueConstraint("trade_date", "ts_code", "reason", name="uq_top_list_date_code_reason"),
+        # 按股票查询区间内的上榜记录
+        Index("ix_top_list_ts_code_trade_date", "ts_code", "trade_date"),
+    )
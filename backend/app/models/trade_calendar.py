@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Integer, Date, DateTime
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class TradeCalendar(Base):
+    """交易日历表（Tushare trade_cal）"""
+    __tablename__ = "trade_calendar"
+
+    exchange = Column(String(10), primary_key=True, comment="交易所 SSE上交所 SZSE深交所")
+    cal_date = Column(Date, primary_key=True, comment="日历日期")
+    is_open = Column(Integer, comment="是否交易 0休市 1交易")
+    pretrade_date = Column(Date, comment="上一个交易日")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="创建时间")
@@ -11,13 +11,14 @@ class AnalysisResult(BaseModel):
     matched: bool
 
 
-class AnalysisResultResponse(BaseModel):
+class AnalysisRuleRunResponse(BaseModel):
     id: int
     rule_id: int
-    stock_id: int
-    timestamp: datetime
-    data: Dict[str, Any]
-    matched: bool
+    task_id: Optional[int]
+    source: str
+    run_at: datetime
+    matched_count: int
+    stock_ids: List[int]
 
     class Config:
         from_attributes = True
@@ -31,3 +31,24 @@ class AnalysisRuleResponse(AnalysisRuleBase):
     
     class Config:
         from_attributes = True
+
+
+class RuleMatchResponse(BaseModel):
+    rule_id: int
+    stock_id: int
+    matched_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class RuleMatchTransitionResponse(BaseModel):
+    id: int
+    rule_id: int
+    stock_id: int
+    matched: bool
+    features: Optional[Dict[str, Any]]
+    created_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
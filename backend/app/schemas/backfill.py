@@ -0,0 +1,56 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime, date
+
+
+class BackfillJobCreate(BaseModel):
+    job_name: Optional[str] = None
+    interfaces: List[str] = Field(default_factory=lambda: ["daily"], description="回填的接口列表")
+    ts_codes: Optional[List[str]] = Field(default=None, description="证券代码列表，为空时使用全部上市股票/综合指数")
+    start_date: str = Field(..., pattern=r"^\d{8}$", description="开始日期 YYYYMMDD")
+    end_date: str = Field(..., pattern=r"^\d{8}$", description="结束日期 YYYYMMDD")
+    window_days: Optional[int] = Field(default=None, ge=1, description="每个分片的日期窗口(天)")
+    concurrency: Optional[int] = Field(default=None, ge=1, le=32, description="并发分片数")
+
+
+class BackfillShardResponse(BaseModel):
+    id: int
+    job_id: int
+    interface_name: str
+    ts_code: str
+    start_date: date
+    end_date: date
+    status: str
+    rows: int = 0
+    attempts: int = 0
+    error_message: Optional[str] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class BackfillJobResponse(BaseModel):
+    id: int
+    job_name: Optional[str] = None
+    interfaces: List[str]
+    ts_codes: Optional[List[str]] = None
+    start_date: date
+    end_date: date
+    window_days: int
+    concurrency: int
+    status: str
+    total_shards: int = 0
+    completed_shards: int = 0
+    failed_shards: int = 0
+    rows_written: int = 0
+    api_calls: int = 0
+    rows_per_sec: float = 0
+    calls_per_min: float = 0
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 
@@ -14,6 +14,25 @@ class SyncResult(BaseModel):
     synced_count: int
     failed_count: int
     failures: Optional[List[str]]
+    diff: Optional[Dict[str, Any]] = None
+
+
+class SyncJobResponse(BaseModel):
+    id: int
+    job_type: str
+    status: str
+    params: Dict[str, Any] = {}
+    total: int = 0
+    done: int = 0
+    failed: int = 0
+    percent: Optional[float] = None
+    rate: Optional[float] = Field(None, description="处理速率（项/秒）")
+    eta_seconds: Optional[float] = Field(None, description="预计剩余秒数")
+    message: Optional[str] = None
+    result: Optional[SyncResult] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
 
 class SyncStatus(BaseModel):
@@ -21,3 +40,4 @@ class SyncStatus(BaseModel):
     next_sync_time: Optional[datetime]
     syncing: bool
     status: str
+    jobs: List[SyncJobResponse] = []
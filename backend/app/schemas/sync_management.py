@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
-from datetime import datetime
+from typing import Optional, Dict, Any, List
+from datetime import datetime, date
 
 
 class SyncInterfaceBase(BaseModel):
@@ -35,10 +35,10 @@ class SyncInterfaceResponse(SyncInterfaceBase):
 class SyncTaskBase(BaseModel):
     task_name: str = Field(..., description="任务名称")
     interface_id: int = Field(..., description="关联的同步接口ID")
-    schedule_type: str = Field(..., pattern="^(cron|interval|date)$", description="调度类型")
+    schedule_type: str = Field(..., pattern="^(cron|interval|date|trading_day)$", description="调度类型")
     schedule_config: Dict[str, Any] = Field(..., description="调度配置")
     task_params: Optional[Dict[str, Any]] = Field(default_factory=dict, description="任务参数")
-    retry_policy: Optional[Dict[str, Any]] = Field(default={"max_retries": 3, "backoff_factor": 2}, description="重试策略")
+    retry_policy: Optional[Dict[str, Any]] = Field(default={"max_retries": 3, "backoff_factor": 2}, description="重试策略: max_retries 单次运行最多重试次数, backoff_factor 退避倍数, retry_delay 首次重试基准秒数(默认60), max_delay 最大等待秒数(默认3600)")
 
 
 class SyncTaskCreate(SyncTaskBase):
@@ -48,7 +48,7 @@ class SyncTaskCreate(SyncTaskBase):
 class SyncTaskUpdate(BaseModel):
     task_name: Optional[str] = None
     interface_id: Optional[int] = None
-    schedule_type: Optional[str] = Field(None, pattern="^(cron|interval|date)$")
+    schedule_type: Optional[str] = Field(None, pattern="^(cron|interval|date|trading_day)$")
     schedule_config: Optional[Dict[str, Any]] = None
     task_params: Optional[Dict[str, Any]] = None
     retry_policy: Optional[Dict[str, Any]] = None
@@ -93,3 +93,20 @@ class SyncExecutionLogResponse(SyncExecutionLogBase):
 
     class Config:
         from_attributes = True
+
+
+class DataChangeLogResponse(BaseModel):
+    id: int
+    batch_id: str
+    table_name: str
+    source: Optional[str] = None
+    ts_code: str
+    min_trade_date: Optional[date] = None
+    max_trade_date: Optional[date] = None
+    trade_dates: List[str] = Field(default_factory=list)
+    inserted: int = 0
+    updated: int = 0
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,12 +1,119 @@
+import asyncio
+import threading
 import requests
-from typing import Optional, Dict, Any
+import httpx
+from datetime import date
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, Tuple
 from ..core.config import settings
+from .data_sources.rate_limiter import RateLimiter
+from .data_sources.response_cache import get_response_cache, CacheMissError
+
+ALPHA_VANTAGE_BASE_URL = "https://www.alphavantage.co/query"
+
+# 各 function 的缓存有效期（秒），未列出的使用 DATA_CACHE_DEFAULT_TTL
+ALPHA_VANTAGE_CACHE_TTLS = {
+    "GLOBAL_QUOTE": 60,
+    "TIME_SERIES_DAILY": 6 * 3600,
+    "INCOME_STATEMENT": 7 * 24 * 3600,
+    "BALANCE_SHEET": 7 * 24 * 3600,
+    "CASH_FLOW": 7 * 24 * 3600,
+}
+
+
+class AlphaVantageQuotaExceeded(Exception):
+    """Alpha Vantage 每日调用配额已用完"""
+    pass
+
+
+class AlphaVantageRateLimited(Exception):
+    """Alpha Vantage 返回限流提示（Note / Information）或错误信息而不是数据"""
+    pass
+
+
+class AlphaVantageQuota:
+    """Alpha Vantage 调用配额 - 每分钟限流 + 每日总量，同步与异步客户端共享"""
+
+    def __init__(self, calls_per_minute: int, daily_limit: int):
+        # burst=1: 严格按 60/N 秒间隔发放，避免滚动窗口内超过每分钟上限
+        self.limiter = RateLimiter(calls_per_minute, burst=1)
+        self.daily_limit = daily_limit
+        self.day = date.today()
+        self.used_today = 0
+        self._lock = threading.Lock()
+
+    def _consume_daily(self) -> None:
+        with self._lock:
+            today = date.today()
+            if today != self.day:
+                self.day = today
+                self.used_today = 0
+            if self.daily_limit and self.used_today >= self.daily_limit:
+                raise AlphaVantageQuotaExceeded(f"Alpha Vantage 今日调用次数已达上限 {self.daily_limit}")
+            self.used_today += 1
+
+    async def acquire(self) -> None:
+        self._consume_daily()
+        await self.limiter.acquire()
+
+    def acquire_sync(self) -> None:
+        self._consume_daily()
+        self.limiter.acquire_sync()
+
+
+quota = AlphaVantageQuota(settings.ALPHA_VANTAGE_CALLS_PER_MINUTE, settings.ALPHA_VANTAGE_DAILY_QUOTA)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """进程级共享的 requests.Session，复用 TLS 连接"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=settings.ALPHA_VANTAGE_CONCURRENCY * 2))
+        return _session
+
+
+def _is_error_payload(payload: Any) -> bool:
+    """限流提示和错误信息不能缓存"""
+    return not isinstance(payload, dict) or any(key in payload for key in ("Note", "Information", "Error Message"))
+
+
+def _cache_lookup(cache, params: Dict[str, Any]) -> Tuple[bool, Any, Dict[str, Any], Optional[int]]:
+    function = params["function"]
+    cache_params = {key: value for key, value in params.items() if key != "apikey"}
+    ttl = settings.DATA_CACHE_TTLS.get(function, ALPHA_VANTAGE_CACHE_TTLS.get(function))
+    if cache is None:
+        return False, None, cache_params, ttl
+    hit, payload = cache.get("alpha_vantage", function, cache_params, ttl)
+    if not hit and cache.replay:
+        raise CacheMissError(f"回放模式缓存未命中: alpha_vantage.{function} {cache_params}")
+    return hit, payload, cache_params, ttl
 
 
 class AlphaVantageAPI:
     def __init__(self, api_key: str = None):
         self.api_key = api_key or settings.ALPHA_VANTAGE_API_KEY
-        self.base_url = "https://www.alphavantage.co/query"
+        self.base_url = ALPHA_VANTAGE_BASE_URL
+        self.cache = get_response_cache()
+
+    def _request(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """发起请求，经过原始响应缓存（缓存键不包含 apikey），缓存未命中时占用配额"""
+        hit, payload, cache_params, _ = _cache_lookup(self.cache, params)
+        if hit:
+            return payload
+
+        quota.acquire_sync()
+        response = get_http_session().get(self.base_url, params={**params, "apikey": self.api_key}, timeout=30)
+        response.raise_for_status()
+        payload = response.json()
+
+        if self.cache is not None and not _is_error_payload(payload):
+            self.cache.put("alpha_vantage", params["function"], cache_params, payload)
+        return payload
         
     def get_daily_data(self, symbol: str, outputsize: str = "compact") -> Optional[Dict[str, Any]]:
         """
@@ -15,14 +122,13 @@ class AlphaVantageAPI:
         params = {
             "function": "TIME_SERIES_DAILY",
             "symbol": symbol,
-            "outputsize": outputsize,
-            "apikey": self.api_key
+            "outputsize": outputsize
         }
         
         try:
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._request(params)
+        except CacheMissError:
+            raise
         except Exception as e:
             print(f"Error fetching daily data for {symbol}: {str(e)}")
             return None
@@ -33,14 +139,13 @@ class AlphaVantageAPI:
         """
         params = {
             "function": "GLOBAL_QUOTE",
-            "symbol": symbol,
-            "apikey": self.api_key
+            "symbol": symbol
         }
         
         try:
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._request(params)
+        except CacheMissError:
+            raise
         except Exception as e:
             print(f"Error fetching quote for {symbol}: {str(e)}")
             return None
@@ -51,14 +156,13 @@ class AlphaVantageAPI:
         """
         params = {
             "function": "INCOME_STATEMENT",
-            "symbol": symbol,
-            "apikey": self.api_key
+            "symbol": symbol
         }
         
         try:
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._request(params)
+        except CacheMissError:
+            raise
         except Exception as e:
             print(f"Error fetching income statement for {symbol}: {str(e)}")
             return None
@@ -69,14 +173,13 @@ class AlphaVantageAPI:
         """
         params = {
             "function": "BALANCE_SHEET",
-            "symbol": symbol,
-            "apikey": self.api_key
+            "symbol": symbol
         }
         
         try:
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._request(params)
+        except CacheMissError:
+            raise
         except Exception as e:
             print(f"Error fetching balance sheet for {symbol}: {str(e)}")
             return None
@@ -87,14 +190,13 @@ class AlphaVantageAPI:
         """
         params = {
             "function": "CASH_FLOW",
-            "symbol": symbol,
-            "apikey": self.api_key
+            "symbol": symbol
         }
         
         try:
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._request(params)
+        except CacheMissError:
+            raise
         except Exception as e:
             print(f"Error fetching cash flow for {symbol}: {str(e)}")
             return None
@@ -108,14 +210,90 @@ class AlphaVantageAPI:
             "symbol": symbol,
             "interval": interval,
             "time_period": time_period,
-            "series_type": "close",
-            "apikey": self.api_key
+            "series_type": "close"
         }
         
         try:
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            return response.json()
+            return self._request(params)
+        except CacheMissError:
+            raise
         except Exception as e:
             print(f"Error fetching {indicator} for {symbol}: {str(e)}")
             return None
+
+
+class AsyncAlphaVantageAPI:
+    """异步 Alpha Vantage 客户端 - 共享连接池，三大报表并发获取，内置配额限流
+
+    用法:
+        async with AsyncAlphaVantageAPI() as api:
+            income, balance, cash_flow = await api.get_financial_statements("IBM")
+    """
+
+    def __init__(self, api_key: str = None, max_connections: int = None):
+        self.api_key = api_key or settings.ALPHA_VANTAGE_API_KEY
+        self.base_url = ALPHA_VANTAGE_BASE_URL
+        self.cache = get_response_cache()
+        max_connections = max_connections or settings.ALPHA_VANTAGE_CONCURRENCY * 2
+        self.client = httpx.AsyncClient(
+            timeout=30,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def __aenter__(self) -> "AsyncAlphaVantageAPI":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def _request(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        hit, payload, cache_params, _ = _cache_lookup(self.cache, params)
+        if hit:
+            return payload
+
+        await quota.acquire()
+        response = await self.client.get(self.base_url, params={**params, "apikey": self.api_key})
+        response.raise_for_status()
+        payload = response.json()
+
+        if self.cache is not None and not _is_error_payload(payload):
+            self.cache.put("alpha_vantage", params["function"], cache_params, payload)
+        return payload
+
+    async def _fetch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """获取数据；网络/HTTP 错误、回放缓存未命中和限流提示都抛出，由调用方计为失败"""
+        payload = await self._request(params)
+        if _is_error_payload(payload):
+            message = payload.get("Note") or payload.get("Information") or payload.get("Error Message") \
+                if isinstance(payload, dict) else payload
+            raise AlphaVantageRateLimited(f"{params['function']} {params.get('symbol')}: {message}")
+        return payload
+
+    async def get_income_statement(self, symbol: str) -> Dict[str, Any]:
+        """获取利润表数据"""
+        return await self._fetch({"function": "INCOME_STATEMENT", "symbol": symbol})
+
+    async def get_balance_sheet(self, symbol: str) -> Dict[str, Any]:
+        """获取资产负债表数据"""
+        return await self._fetch({"function": "BALANCE_SHEET", "symbol": symbol})
+
+    async def get_cash_flow(self, symbol: str) -> Dict[str, Any]:
+        """获取现金流量表数据"""
+        return await self._fetch({"function": "CASH_FLOW", "symbol": symbol})
+
+    async def get_financial_statements(self, symbol: str) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """并发获取利润表、资产负债表、现金流量表，任一失败时等三个请求都结束后抛出"""
+        results = await asyncio.gather(
+            self.get_income_statement(symbol),
+            self.get_balance_sheet(symbol),
+            self.get_cash_flow(symbol),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        income, balance, cash_flow = results
+        return income, balance, cash_flow
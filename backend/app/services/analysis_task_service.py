@@ -1,20 +1,37 @@
 import asyncio
-from typing import List, Optional
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
 from sqlalchemy.orm import Session
 from datetime import datetime
 import traceback
 
-from app.models.analysis_result import AnalysisTask, AnalysisResult
+from app.models.analysis_result import AnalysisTask
 from app.models.analysis_rule import AnalysisRule
 from app.models.stock import Stock
 from app.crud.analysis_rule import get_enabled_analysis_rules_by_user
+from app.crud.analysis_result import save_rule_runs
+from app.crud.ai_script_cache import get_cached_script, save_cached_script, record_script_cache_hit, invalidate_script_cache
+from app.core.config import settings
 from app.crud.stock import get_stocks
 from app.services.ai_service import get_ai_service
 from app.services.script_sandbox import sandbox
+from app.services.feature_snapshot import load_feature_snapshot, snapshot_records
 from app.schemas.analysis_result import AnalysisTaskResponse
 from app.crud.system_setting import get_ai_settings
 
 
+def rule_set_fingerprint(rules_data: List[Dict[str, Any]], ai_config: Dict[str, Any], stock_fields: List[str]) -> str:
+    """AI 脚本缓存键：规则 ID/名称/描述/条件、提供商、模型及股票数据字段"""
+    payload = {
+        "rules": sorted(rules_data, key=lambda rule: rule["id"]),
+        "provider": ai_config.get("provider"),
+        "model": ai_config.get("model"),
+        "stock_fields": sorted(stock_fields),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
 class AnalysisTaskService:
     """分析任务服务"""
 
@@ -59,19 +76,24 @@ class AnalysisTaskService:
                 raise ValueError("No enabled analysis rules found")
 
             # 2. 获取股票数据
-            stocks = get_stocks(self.db, skip=0, limit=1000)
+            stocks = get_stocks(self.db, skip=0, limit=1000)["data"]
             if not stocks:
                 raise ValueError("No stock data found")
 
-            # 转换为字典列表
+            # 转换为字典列表，价格和涨跌幅取自特征快照中的最新日线
+            features = {
+                record['id']: record
+                for record in snapshot_records(load_feature_snapshot(self.db, stock_ids=[stock.id for stock in stocks]))
+            }
             stock_data = []
             for stock in stocks:
+                feature = features.get(stock.id, {})
                 stock_dict = {
                     'id': stock.id,
-                    'code': stock.code,
+                    'code': stock.ts_code,
                     'name': stock.name,
-                    'price': float(stock.price) if stock.price else 0,
-                    'change': float(stock.change) if stock.change is not None else 0,
+                    'price': feature.get('price') or 0,
+                    'change': feature.get('change') or 0,
                     'market': stock.market,
                     'industry': stock.industry,
                 }
@@ -88,8 +110,17 @@ class AnalysisTaskService:
                 }
                 rules_data.append(rule_dict)
 
-            ai_service = get_ai_service(self.ai_config)
-            script, reasoning = await ai_service.generate_script(rules_data, stock_data)
+            # 规则集未变化时复用缓存的脚本，跳过 LLM 调用
+            fingerprint = rule_set_fingerprint(rules_data, self.ai_config, list(stock_data[0]))
+            cached = get_cached_script(self.db, fingerprint) if settings.AI_SCRIPT_CACHE_ENABLED else None
+            if cached:
+                script, reasoning = cached.script, cached.reasoning
+                record_script_cache_hit(self.db, cached)
+                script_cache = 'hit'
+            else:
+                ai_service = get_ai_service(self.ai_config)
+                script, reasoning = await ai_service.generate_script(rules_data, stock_data)
+                script_cache = 'miss' if settings.AI_SCRIPT_CACHE_ENABLED else 'disabled'
 
             if not script:
                 raise ValueError("AI failed to generate analysis script")
@@ -102,25 +133,30 @@ class AnalysisTaskService:
             # 5. 在沙箱中执行脚本
             success, matched_ids, exec_log = await sandbox.execute_script(script, stock_data)
 
-            # 6. 保存执行结果
-            task.execution_log = exec_log
+            # 6. 保存执行结果；新生成的脚本执行成功后才缓存，缓存的脚本执行失败则失效
+            if success and script_cache == 'miss':
+                save_cached_script(
+                    self.db, fingerprint, task.user_id, self.ai_config['provider'], self.ai_config.get('model'),
+                    [rule.id for rule in rules], script, reasoning
+                )
+            elif not success and script_cache == 'hit':
+                invalidate_script_cache(self.db, fingerprint=fingerprint)
+                self.db.commit()
+            task.execution_log = {**exec_log, 'script_cache': script_cache}
             task.matched_stock_ids = matched_ids if success else []
 
             if success:
                 task.status = 'completed'
                 task.completed_at = datetime.now()
 
-                # 7. 创建分析结果记录
-                for stock_id in matched_ids:
-                    for rule in rules:
-                        result = AnalysisResult(
-                            rule_id=rule.id,
-                            stock_id=stock_id,
-                            matched=True,
-                            timestamp=datetime.now(),
-                            data={'task_id': task.id}
-                        )
-                        self.db.add(result)
+                # 7. 保存分析结果：每条规则一行，命中的股票压缩存储
+                save_rule_runs(
+                    self.db,
+                    {rule.id: matched_ids for rule in rules},
+                    source='task',
+                    task_id=task.id,
+                    run_at=task.completed_at
+                )
                 self.db.commit()
 
             else:
@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, date, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models.backfill_job import BackfillJob, BackfillShard
+from ..models.stock import Stock
+from ..models.index_basic import IndexBasic
+from ..crud.backfill import (
+    get_backfill_job,
+    create_backfill_job,
+    get_unfinished_shards,
+    claim_backfill_shard,
+    heartbeat_backfill_shards,
+    reset_interrupted_shards,
+)
+from ..core.config import settings
+from .leader_election import make_holder_id
+from .sync_task_manager import SyncTaskManager
+from .request_queue import Priority, request_priority
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 支持按 ts_code + start_date/end_date 拉取历史区间的接口
+BACKFILL_INTERFACES = ["daily", "daily_basic", "moneyflow", "index_daily"]
+
+_running_jobs: Dict[int, asyncio.Task] = {}
+
+
+class ThroughputMeter:
+    """回填吞吐量统计"""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.rows = 0
+        self.calls = 0
+
+    def record(self, rows: int, calls: int = 1) -> None:
+        self.rows += rows
+        self.calls += calls
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.monotonic() - self.started_at, 1e-6)
+
+    @property
+    def rows_per_sec(self) -> float:
+        return round(self.rows / self.elapsed, 2)
+
+    @property
+    def calls_per_min(self) -> float:
+        return round(self.calls * 60 / self.elapsed, 2)
+
+
+def split_date_range(start_date: date, end_date: date, window_days: int) -> List[Tuple[date, date]]:
+    """将日期区间按窗口切分为连续的子区间"""
+    windows = []
+    cursor = start_date
+    while cursor <= end_date:
+        window_end = min(cursor + timedelta(days=window_days - 1), end_date)
+        windows.append((cursor, window_end))
+        cursor = window_end + timedelta(days=1)
+    return windows
+
+
+class BackfillOrchestrator:
+    """历史数据回填编排器 - 按 (接口 × 代码 × 日期窗口) 分片并发执行，每个分片完成即落检查点"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.manager = SyncTaskManager(db, None)
+        self.registry = self.manager.tushare_registry
+        # 分片认领者标识，心跳超时前其他进程不会重置本进程正在执行的分片
+        self.owner = make_holder_id()
+
+    def create_job(self, request: Dict[str, Any]) -> BackfillJob:
+        """创建回填任务并切分分片"""
+        interfaces = request.get("interfaces") or ["daily"]
+        unsupported = [name for name in interfaces if name not in BACKFILL_INTERFACES]
+        if unsupported:
+            raise ValueError(f"接口不支持回填: {', '.join(unsupported)}")
+
+        start_date = datetime.strptime(request["start_date"], "%Y%m%d").date()
+        end_date = datetime.strptime(request["end_date"], "%Y%m%d").date()
+        if start_date > end_date:
+            raise ValueError("开始日期不能晚于结束日期")
+
+        window_days = request.get("window_days") or settings.BACKFILL_WINDOW_DAYS
+        concurrency = request.get("concurrency") or settings.BACKFILL_CONCURRENCY
+        windows = split_date_range(start_date, end_date, window_days)
+
+        shards = []
+        for interface_name in interfaces:
+            ts_codes = self._resolve_ts_codes(interface_name, request.get("ts_codes"))
+            for ts_code in ts_codes:
+                for window_start, window_end in windows:
+                    shards.append({
+                        "interface_name": interface_name,
+                        "ts_code": ts_code,
+                        "start_date": window_start,
+                        "end_date": window_end,
+                        "status": "pending",
+                    })
+
+        if not shards:
+            raise ValueError("没有可回填的证券代码")
+
+        job = create_backfill_job(
+            self.db,
+            {
+                "job_name": request.get("job_name") or f"backfill {request['start_date']}-{request['end_date']}",
+                "interfaces": interfaces,
+                "ts_codes": request.get("ts_codes") or [],
+                "start_date": start_date,
+                "end_date": end_date,
+                "window_days": window_days,
+                "concurrency": concurrency,
+                "status": "pending",
+            },
+            shards,
+        )
+        logger.info(f"[回填] ✓ 任务 ID {job.id} 已创建: {len(interfaces)} 个接口, {len(windows)} 个日期窗口, 共 {len(shards)} 个分片")
+        return job
+
+    def _resolve_ts_codes(self, interface_name: str, ts_codes: Optional[List[str]]) -> List[str]:
+        """未指定代码时，股票接口使用全部上市股票，指数接口使用综合指数"""
+        if ts_codes:
+            return ts_codes
+        if interface_name == "index_daily":
+            indices = self.db.query(IndexBasic.ts_code).filter(IndexBasic.category == "综合指数").all()
+            return [row.ts_code for row in indices if row.ts_code]
+        stocks = self.db.query(Stock.ts_code).filter(Stock.list_status == "L").all()
+        return [row.ts_code for row in stocks if row.ts_code]
+
+    async def run_job(self, job_id: int) -> BackfillJob:
+        """执行回填任务，跳过已完成分片，从上次中断处继续"""
+        job = get_backfill_job(self.db, job_id)
+        if not job:
+            raise ValueError(f"回填任务 ID {job_id} 未找到")
+
+        stale_before = datetime.utcnow() - timedelta(seconds=settings.BACKFILL_SHARD_TIMEOUT)
+        interrupted = reset_interrupted_shards(self.db, job_id, stale_before)
+        if interrupted:
+            logger.info(f"[回填] 任务 ID {job_id}: 重置 {interrupted} 个心跳超时的中断分片")
+
+        shards = get_unfinished_shards(self.db, job_id)
+        logger.info(f"[回填] ========== 开始执行任务 ID {job_id}: 待执行分片 {len(shards)}/{job.total_shards}, 并发 {job.concurrency} ==========")
+
+        job.status = "running"
+        job.started_at = job.started_at or datetime.now()
+        job.finished_at = None
+        job.failed_shards = 0
+        job.error_message = None
+        self.db.commit()
+
+        meter = ThroughputMeter()
+        semaphore = asyncio.Semaphore(job.concurrency or 1)
+
+        async def run_with_limit(shard: BackfillShard) -> None:
+            async with semaphore:
+                await self._run_shard(job, shard, meter)
+
+        # 回填让出上游请求槽位给交互请求和定时任务
+        heartbeat = asyncio.create_task(self._heartbeat_loop(job_id))
+        try:
+            with request_priority(Priority.BATCH):
+                await asyncio.gather(*(run_with_limit(shard) for shard in shards))
+        finally:
+            heartbeat.cancel()
+
+        # 多个进程可能同时执行同一任务，按分片状态重新汇总
+        counts = dict(self.db.query(BackfillShard.status, func.count(BackfillShard.id)).filter(
+            BackfillShard.job_id == job_id
+        ).group_by(BackfillShard.status).all())
+        job.completed_shards = counts.get("done", 0)
+        job.failed_shards = counts.get("failed", 0)
+        running_elsewhere = counts.get("running", 0)
+        if running_elsewhere:
+            # 其他进程仍在执行部分分片，由其结束时更新任务状态
+            logger.info(f"[回填] 任务 ID {job_id}: {running_elsewhere} 个分片仍由其他进程执行")
+        else:
+            if job.failed_shards == 0:
+                job.status = "completed"
+            elif job.completed_shards > 0:
+                job.status = "partial"
+            else:
+                job.status = "failed"
+            job.finished_at = datetime.now()
+        self.db.commit()
+
+        logger.info(
+            f"[回填] ========== 任务 ID {job_id} 结束: 状态 {job.status}, 完成 {job.completed_shards}/{job.total_shards}, "
+            f"失败 {job.failed_shards}, 本次写入 {meter.rows} 行, {meter.rows_per_sec} 行/秒, {meter.calls_per_min} 次/分钟 =========="
+        )
+        return job
+
+    async def _heartbeat_loop(self, job_id: int) -> None:
+        """定期刷新本进程认领的 running 分片的心跳（独立会话，不干扰分片事务）"""
+        from ..database import SessionLocal
+        while True:
+            await asyncio.sleep(settings.BACKFILL_HEARTBEAT_INTERVAL)
+            db = SessionLocal()
+            try:
+                heartbeat_backfill_shards(db, job_id, self.owner)
+            except Exception as e:
+                logger.warning(f"[回填] ⚠ 任务 ID {job_id} 分片心跳失败: {str(e)}")
+            finally:
+                db.close()
+
+    async def _run_shard(self, job: BackfillJob, shard: BackfillShard, meter: ThroughputMeter) -> None:
+        """认领并执行单个分片、记录检查点；分片已被其他进程认领时跳过"""
+        if not claim_backfill_shard(self.db, shard.id, self.owner):
+            logger.info(f"[回填] 分片 {shard.interface_name} {shard.ts_code} {shard.start_date} 已由其他进程执行，跳过")
+            return
+        self.db.refresh(shard)
+
+        params = {
+            "ts_code": shard.ts_code,
+            "start_date": shard.start_date.strftime("%Y%m%d"),
+            "end_date": shard.end_date.strftime("%Y%m%d"),
+        }
+
+        try:
+            data = await self.registry.execute(shard.interface_name, params)
+            rows = data if isinstance(data, list) else []
+            if rows:
+                self.manager._save_synced_data(self.db, shard.interface_name, rows)
+        except Exception as e:
+            self.db.rollback()
+            shard.status = "failed"
+            shard.error_message = str(e)
+            job.api_calls = (job.api_calls or 0) + 1
+            self.db.commit()
+            meter.record(0)
+            logger.error(f"[回填] ✗ 分片 {shard.interface_name} {shard.ts_code} {params['start_date']}~{params['end_date']} 失败: {str(e)}")
+            return
+
+        meter.record(len(rows))
+        shard.status = "done"
+        shard.rows = len(rows)
+        shard.error_message = None
+        shard.completed_at = datetime.now()
+        job.completed_shards = (job.completed_shards or 0) + 1
+        job.rows_written = (job.rows_written or 0) + len(rows)
+        job.api_calls = (job.api_calls or 0) + 1
+        job.rows_per_sec = meter.rows_per_sec
+        job.calls_per_min = meter.calls_per_min
+        self.db.commit()
+
+        logger.info(
+            f"[回填] 任务 ID {job.id} 进度 {job.completed_shards}/{job.total_shards}: "
+            f"{shard.interface_name} {shard.ts_code} {params['start_date']}~{params['end_date']} 写入 {len(rows)} 行 | "
+            f"{meter.rows_per_sec} 行/秒, {meter.calls_per_min} 次/分钟"
+        )
+
+
+def launch_backfill_job(job_id: int) -> bool:
+    """在当前事件循环中后台执行回填任务，任务已在运行时返回 False"""
+    running = _running_jobs.get(job_id)
+    if running and not running.done():
+        return False
+
+    async def runner():
+        from ..database import SessionLocal
+        db = SessionLocal()
+        try:
+            await BackfillOrchestrator(db).run_job(job_id)
+        except Exception as e:
+            logger.error(f"[回填] ✗ 任务 ID {job_id} 执行异常: {str(e)}")
+        finally:
+            db.close()
+            _running_jobs.pop(job_id, None)
+
+    _running_jobs[job_id] = asyncio.create_task(runner())
+    return True
+
+
+def is_backfill_running(job_id: int) -> bool:
+    running = _running_jobs.get(job_id)
+    return running is not None and not running.done()
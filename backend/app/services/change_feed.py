@@ -0,0 +1,130 @@
+import logging
+import threading
+import uuid
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..models.data_change_log import DataChangeLog
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "change_feed_pending"
+
+
+class ChangeEvent:
+    """一次提交内某张表的变更集合"""
+
+    def __init__(self, batch_id: str, table_name: str, source: Optional[str], changes: Dict[str, Dict[str, Set[date]]]):
+        self.batch_id = batch_id
+        self.table_name = table_name
+        self.source = source
+        # ts_code -> {"insert": {trade_date}, "update": {trade_date}}
+        self.changes = changes
+
+    @property
+    def ts_codes(self) -> List[str]:
+        return sorted(self.changes)
+
+    def keys(self) -> List[Tuple[str, date]]:
+        """全部被写入的 (ts_code, trade_date)"""
+        return sorted(
+            (ts_code, trade_date)
+            for ts_code, kinds in self.changes.items()
+            for trade_dates in kinds.values()
+            for trade_date in trade_dates
+        )
+
+    def __repr__(self):
+        return f"<ChangeEvent(table={self.table_name}, source={self.source}, ts_codes={len(self.changes)})>"
+
+
+class ChangeCollector:
+    """收集一次写入涉及的键，写入方在提交前交给 ChangeFeed.stage"""
+
+    def __init__(self, table_name: str, source: Optional[str] = None):
+        self.table_name = table_name
+        self.source = source
+        self.changes: Dict[str, Dict[str, Set[date]]] = {}
+
+    def add(self, ts_code: str, trade_date: date, change_type: str = "update") -> None:
+        kinds = self.changes.setdefault(ts_code, {"insert": set(), "update": set()})
+        kinds[change_type].add(trade_date)
+
+    def add_many(self, keys: Iterable[Tuple[str, date]], change_type: str = "update") -> None:
+        for ts_code, trade_date in keys:
+            self.add(ts_code, trade_date, change_type)
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+
+class ChangeFeed:
+    """进程内数据变更订阅 - 变更日志与业务数据在同一事务写入，提交成功后通知订阅者"""
+
+    def __init__(self):
+        self._subscribers: List[Tuple[Callable[[ChangeEvent], None], Optional[Set[str]]]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[ChangeEvent], None], tables: Optional[Iterable[str]] = None) -> Callable[[ChangeEvent], None]:
+        """订阅变更，tables 为空表示订阅全部表"""
+        with self._lock:
+            self._subscribers.append((callback, set(tables) if tables else None))
+        return callback
+
+    def unsubscribe(self, callback: Callable[[ChangeEvent], None]) -> None:
+        with self._lock:
+            self._subscribers = [item for item in self._subscribers if item[0] is not callback]
+
+    def stage(self, db: Session, collector: ChangeCollector) -> Optional[ChangeEvent]:
+        """在当前事务中写入变更日志，事务提交后再发布"""
+        if not collector:
+            return None
+
+        pending = db.info.setdefault(_PENDING_KEY, [])
+        batch_id = pending[0].batch_id if pending else uuid.uuid4().hex
+        change_event = ChangeEvent(batch_id, collector.table_name, collector.source, collector.changes)
+
+        rows = []
+        for ts_code, kinds in collector.changes.items():
+            trade_dates = kinds["insert"] | kinds["update"]
+            rows.append({
+                "batch_id": batch_id,
+                "table_name": collector.table_name,
+                "source": collector.source,
+                "ts_code": ts_code,
+                "min_trade_date": min(trade_dates),
+                "max_trade_date": max(trade_dates),
+                "trade_dates": sorted(d.strftime("%Y%m%d") for d in trade_dates),
+                "inserted": len(kinds["insert"]),
+                "updated": len(kinds["update"] - kinds["insert"]),
+            })
+        db.bulk_insert_mappings(DataChangeLog, rows)
+        pending.append(change_event)
+        return change_event
+
+    def publish(self, change_event: ChangeEvent) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback, tables in subscribers:
+            if tables is not None and change_event.table_name not in tables:
+                continue
+            try:
+                callback(change_event)
+            except Exception as e:
+                logger.error(f"[变更订阅] ✗ 订阅者 {getattr(callback, '__name__', callback)} 处理 {change_event} 失败: {str(e)}")
+
+
+change_feed = ChangeFeed()
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    for change_event in pending or []:
+        change_feed.publish(change_event)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
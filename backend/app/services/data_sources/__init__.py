@@ -1,17 +1,27 @@
 from .base import DataSourceAdapter
 from .tushare_adapter import TushareAdapter
 from .alpha_vantage_adapter import AlphaVantageAdapter
+from .fake_adapter import FakeDataSourceAdapter
 from .interface_config import InterfaceConfig
 from .interface_registry import InterfaceRegistry
 from .interface_executor import InterfaceExecutor
 from .tushare_interfaces import register_tushare_interfaces
+from .rate_limiter import RateLimiter, get_rate_limiter
+from .response_cache import ResponseCache, CachedDataSourceAdapter, CacheMissError, get_response_cache
 
 __all__ = [
     'DataSourceAdapter',
     'TushareAdapter',
     'AlphaVantageAdapter',
+    'FakeDataSourceAdapter',
     'InterfaceConfig',
     'InterfaceRegistry',
     'InterfaceExecutor',
     'register_tushare_interfaces',
+    'RateLimiter',
+    'get_rate_limiter',
+    'ResponseCache',
+    'CachedDataSourceAdapter',
+    'CacheMissError',
+    'get_response_cache',
 ]
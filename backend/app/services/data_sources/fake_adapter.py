@@ -0,0 +1,313 @@
+import asyncio
+import logging
+import random
+import time
+import zlib
+from collections import deque
+from datetime import datetime, date, timedelta
+from typing import Any, Dict, List, Optional
+from .base import DataSourceAdapter
+
+logger = logging.getLogger(__name__)
+
+FAKE_INDICES = [
+    {"ts_code": "000001.SH", "name": "上证指数", "market": "SSE", "publisher": "中证公司", "category": "综合指数", "base_point": 100.0},
+    {"ts_code": "399001.SZ", "name": "深证成指", "market": "SZSE", "publisher": "深交所", "category": "综合指数", "base_point": 1000.0},
+    {"ts_code": "000300.SH", "name": "沪深300", "market": "SSE", "publisher": "中证公司", "category": "规模指数", "base_point": 1000.0},
+    {"ts_code": "399006.SZ", "name": "创业板指", "market": "SZSE", "publisher": "深交所", "category": "规模指数", "base_point": 1000.0},
+]
+
+
+class FakeRateLimitError(Exception):
+    """模拟 Tushare 服务端的频率限制错误"""
+    pass
+
+
+class FakeDataSourceAdapter(DataSourceAdapter):
+    """本地模拟数据源 - 为 tushare_interfaces 中注册的接口生成确定性的合成数据，用于离线开发和基准测试"""
+
+    source_name = "fake"
+
+    def __init__(
+        self,
+        symbols: int = 100,
+        seed: int = 42,
+        latency_ms: float = 0,
+        calls_per_minute: Optional[int] = None,
+        start_date: str = "20200101",
+        end_date: str = "20241231",
+    ):
+        super().__init__("fake")
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.calls_per_minute = calls_per_minute
+        self.start_date = datetime.strptime(start_date, "%Y%m%d").date()
+        self.end_date = datetime.strptime(end_date, "%Y%m%d").date()
+        self.ts_codes = [self._make_ts_code(i) for i in range(symbols)]
+        self.trade_dates = self._build_calendar()
+        self._trade_date_set = set(self.trade_dates)
+        self.call_count = 0
+        self._call_times: deque = deque()
+        self._bars: Dict[str, List[Dict[str, Any]]] = {}
+        self.endpoints = {
+            "daily": self._daily,
+            "daily_basic": self._daily_basic,
+            "moneyflow": self._moneyflow,
+            "moneyflow_hsgt": self._moneyflow_hsgt,
+            "top_list": self._top_list,
+            "index_basic": self._index_basic,
+            "index_daily": self._index_daily,
+            "trade_cal": self._trade_cal,
+        }
+
+    @staticmethod
+    def _make_ts_code(i: int) -> str:
+        return f"{600000 + i:06d}.SH" if i % 2 == 0 else f"{i:06d}.SZ"
+
+    def _build_calendar(self) -> List[date]:
+        """周一至周五视为交易日"""
+        days = []
+        cursor = self.start_date
+        while cursor <= self.end_date:
+            if cursor.weekday() < 5:
+                days.append(cursor)
+            cursor += timedelta(days=1)
+        return days
+
+    def _rng(self, *parts: Any) -> random.Random:
+        key = "|".join(str(part) for part in parts)
+        return random.Random(self.seed ^ zlib.crc32(key.encode("utf-8")))
+
+    def is_available(self) -> bool:
+        return True
+
+    async def call_api(self, endpoint: str, params: Dict[str, Any]) -> Any:
+        self._check_rate_limit()
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        handler = self.endpoints.get(endpoint)
+        if handler is None:
+            raise ValueError(f"Unknown endpoint: {endpoint}")
+
+        rows = handler(params)
+        fields = params.get("fields")
+        if fields:
+            wanted = [field.strip() for field in fields.split(",") if field.strip()]
+            rows = [{key: row.get(key) for key in wanted} for row in rows]
+        logger.debug(f"[模拟数据源] {endpoint} 返回 {len(rows)} 条, params: {params}")
+        return rows
+
+    def _check_rate_limit(self) -> None:
+        self.call_count += 1
+        if not self.calls_per_minute:
+            return
+        now = time.monotonic()
+        while self._call_times and now - self._call_times[0] > 60:
+            self._call_times.popleft()
+        if len(self._call_times) >= self.calls_per_minute:
+            raise FakeRateLimitError(f"抱歉，您每分钟最多访问该接口{self.calls_per_minute}次")
+        self._call_times.append(now)
+
+    def _select_dates(self, params: Dict[str, Any]) -> List[date]:
+        trade_date = params.get("trade_date")
+        if trade_date:
+            target = datetime.strptime(str(trade_date), "%Y%m%d").date()
+            return [target] if target in self._trade_date_set else []
+        start = params.get("start_date")
+        end = params.get("end_date")
+        start = datetime.strptime(str(start), "%Y%m%d").date() if start else self.start_date
+        end = datetime.strptime(str(end), "%Y%m%d").date() if end else self.end_date
+        return [d for d in self.trade_dates if start <= d <= end]
+
+    def _select_codes(self, params: Dict[str, Any], universe: List[str]) -> List[str]:
+        ts_code = params.get("ts_code")
+        if not ts_code:
+            return universe
+        known = set(universe)
+        return [code for code in str(ts_code).split(",") if code in known]
+
+    def _price_path(self, ts_code: str, base_price: float) -> List[Dict[str, Any]]:
+        """按代码生成整段日历上的随机游走 K 线，结果缓存"""
+        bars = self._bars.get(ts_code)
+        if bars is not None:
+            return bars
+
+        rng = self._rng("bars", ts_code)
+        close = base_price * (0.5 + rng.random())
+        bars = []
+        for trade_date in self.trade_dates:
+            pre_close = close
+            pct = max(min(rng.gauss(0, 2.0), 10.0), -10.0)
+            close = round(max(pre_close * (1 + pct / 100), 0.01), 2)
+            open_price = round(pre_close * (1 + rng.uniform(-0.01, 0.01)), 2)
+            high = round(max(open_price, close) * (1 + rng.uniform(0, 0.02)), 2)
+            low = round(min(open_price, close) * (1 - rng.uniform(0, 0.02)), 2)
+            vol = round(rng.uniform(5e4, 5e6), 2)
+            bars.append({
+                "trade_date": trade_date,
+                "open": open_price,
+                "high": high,
+                "low": low,
+                "close": close,
+                "pre_close": round(pre_close, 2),
+                "change": round(close - pre_close, 2),
+                "pct_chg": round((close - pre_close) / pre_close * 100, 4),
+                "vol": vol,
+                "amount": round(vol * close / 10, 3),
+            })
+        self._bars[ts_code] = bars
+        return bars
+
+    def _iter_bars(self, params: Dict[str, Any], universe: List[str], base_price: float):
+        dates = set(self._select_dates(params))
+        for ts_code in self._select_codes(params, universe):
+            for bar in self._price_path(ts_code, base_price):
+                if bar["trade_date"] in dates:
+                    yield ts_code, bar
+
+    @staticmethod
+    def _format_date(value: date) -> str:
+        return value.strftime("%Y%m%d")
+
+    def _daily(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {"ts_code": ts_code, **bar, "trade_date": self._format_date(bar["trade_date"])}
+            for ts_code, bar in self._iter_bars(params, self.ts_codes, 20.0)
+        ]
+
+    def _daily_basic(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rows = []
+        for ts_code, bar in self._iter_bars(params, self.ts_codes, 20.0):
+            rng = self._rng("basic", ts_code)
+            total_share = round(rng.uniform(1e4, 1e6), 2)
+            float_share = round(total_share * rng.uniform(0.3, 1.0), 2)
+            eps = rng.uniform(0.1, 3.0)
+            bps = rng.uniform(2.0, 20.0)
+            day_rng = self._rng("basic", ts_code, bar["trade_date"])
+            pe = round(bar["close"] / eps, 4)
+            rows.append({
+                "ts_code": ts_code,
+                "trade_date": self._format_date(bar["trade_date"]),
+                "close": bar["close"],
+                "turnover_rate": round(day_rng.uniform(0.1, 10.0), 4),
+                "turnover_rate_f": round(day_rng.uniform(0.1, 15.0), 4),
+                "volume_ratio": round(day_rng.uniform(0.3, 3.0), 2),
+                "pe": pe,
+                "pe_ttm": round(pe * day_rng.uniform(0.9, 1.1), 4),
+                "pb": round(bar["close"] / bps, 4),
+                "ps": round(day_rng.uniform(0.5, 10.0), 4),
+                "ps_ttm": round(day_rng.uniform(0.5, 10.0), 4),
+                "dv_ratio": round(rng.uniform(0, 5.0), 4),
+                "dv_ttm": round(rng.uniform(0, 5.0), 4),
+                "total_share": total_share,
+                "float_share": float_share,
+                "free_share": round(float_share * 0.8, 2),
+                "total_mv": round(total_share * bar["close"], 2),
+                "circ_mv": round(float_share * bar["close"], 2),
+            })
+        return rows
+
+    def _moneyflow(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rows = []
+        for ts_code, bar in self._iter_bars(params, self.ts_codes, 20.0):
+            rng = self._rng("moneyflow", ts_code, bar["trade_date"])
+            row = {"ts_code": ts_code, "trade_date": self._format_date(bar["trade_date"])}
+            for side in ("buy", "sell"):
+                for size in ("sm", "md", "lg", "elg"):
+                    vol = round(bar["vol"] * rng.uniform(0.02, 0.2), 2)
+                    row[f"{side}_{size}_vol"] = vol
+                    row[f"{side}_{size}_amt"] = round(vol * bar["close"] / 10, 2)
+            rows.append(row)
+        return rows
+
+    def _moneyflow_hsgt(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rows = []
+        for trade_date in self._select_dates(params):
+            rng = self._rng("hsgt", trade_date)
+            hgt = round(rng.gauss(0, 3000), 2)
+            sgt = round(rng.gauss(0, 3000), 2)
+            ggt_ss = round(rng.gauss(0, 1500), 2)
+            ggt_sz = round(rng.gauss(0, 1500), 2)
+            rows.append({
+                "trade_date": self._format_date(trade_date),
+                "ggt_ss": ggt_ss,
+                "ggt_sz": ggt_sz,
+                "hgt": hgt,
+                "sgt": sgt,
+                "north_money": round(hgt + sgt, 2),
+                "south_money": round(ggt_ss + ggt_sz, 2),
+            })
+        return rows
+
+    def _top_list(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rows = []
+        codes = set(self._select_codes(params, self.ts_codes))
+        for trade_date in self._select_dates(params):
+            rng = self._rng("top_list", trade_date)
+            picked = rng.sample(self.ts_codes, min(5, len(self.ts_codes)))
+            for ts_code in picked:
+                if ts_code not in codes:
+                    continue
+                l_buy = round(rng.uniform(1e6, 1e8), 2)
+                l_sell = round(rng.uniform(1e6, 1e8), 2)
+                amount = round((l_buy + l_sell) * rng.uniform(2, 10), 2)
+                rows.append({
+                    "trade_date": self._format_date(trade_date),
+                    "ts_code": ts_code,
+                    "name": f"模拟{ts_code[:6]}",
+                    "close": round(rng.uniform(5, 100), 2),
+                    "pct_change": round(rng.uniform(-10, 10), 4),
+                    "turnover_rate": round(rng.uniform(1, 30), 4),
+                    "amount": amount,
+                    "l_sell": l_sell,
+                    "l_buy": l_buy,
+                    "l_amount": round(l_buy + l_sell, 2),
+                    "net_amount": round(l_buy - l_sell, 2),
+                    "net_rate": round((l_buy - l_sell) / amount * 100, 4),
+                    "amount_rate": round((l_buy + l_sell) / amount * 100, 4),
+                    "float_values": round(rng.uniform(1e9, 1e11), 2),
+                    "reason": rng.choice(["日涨幅偏离值达7%", "日跌幅偏离值达7%", "日换手率达20%"]),
+                })
+        return rows
+
+    def _index_basic(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {**index, "base_date": "20041231", "list_date": "20050408"}
+            for index in FAKE_INDICES
+            if not params.get("ts_code") or index["ts_code"] == params["ts_code"]
+        ]
+
+    def _index_daily(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        index_codes = [index["ts_code"] for index in FAKE_INDICES]
+        return [
+            {"ts_code": ts_code, **bar, "trade_date": self._format_date(bar["trade_date"])}
+            for ts_code, bar in self._iter_bars(params, index_codes, 3000.0)
+        ]
+
+    def _trade_cal(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        start = params.get("start_date")
+        end = params.get("end_date")
+        cursor = datetime.strptime(str(start), "%Y%m%d").date() if start else self.start_date
+        end = datetime.strptime(str(end), "%Y%m%d").date() if end else self.end_date
+        exchange = params.get("exchange") or "SSE"
+
+        rows = []
+        previous = None
+        lookback = cursor - timedelta(days=1)
+        while previous is None and lookback >= cursor - timedelta(days=7):
+            if lookback.weekday() < 5:
+                previous = lookback
+            lookback -= timedelta(days=1)
+        while cursor <= end:
+            is_open = cursor.weekday() < 5
+            rows.append({
+                "exchange": exchange,
+                "cal_date": self._format_date(cursor),
+                "is_open": 1 if is_open else 0,
+                "pretrade_date": self._format_date(previous) if previous else None,
+            })
+            if is_open:
+                previous = cursor
+            cursor += timedelta(days=1)
+        return rows
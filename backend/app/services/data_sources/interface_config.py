@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 
 class InterfaceConfig:
@@ -11,7 +11,8 @@ class InterfaceConfig:
         description: str = "",
         params_schema: Dict[str, Any] = None,
         retry_policy: Dict[str, Any] = None,
-        enabled: bool = True
+        enabled: bool = True,
+        cache_ttl: Optional[int] = None
     ):
         self.interface_name = interface_name
         self.data_source = data_source
@@ -19,6 +20,7 @@ class InterfaceConfig:
         self.params_schema = params_schema or {}
         self.retry_policy = retry_policy or {"max_retries": 3, "backoff": 1}
         self.enabled = enabled
+        self.cache_ttl = cache_ttl
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -28,4 +30,5 @@ class InterfaceConfig:
             "params_schema": self.params_schema,
             "retry_policy": self.retry_policy,
             "enabled": self.enabled,
+            "cache_ttl": self.cache_ttl,
         }
@@ -1,7 +1,10 @@
 import asyncio
 import logging
+import time
 from typing import Any, Callable, Dict
 from .interface_config import InterfaceConfig
+from .response_cache import CacheMissError
+from ..sync_telemetry import current_telemetry
 
 logger = logging.getLogger(__name__)
 
@@ -25,14 +28,27 @@ class InterfaceExecutor:
         max_retries = self.config.retry_policy.get("max_retries", 3)
         backoff = self.config.retry_policy.get("backoff", 1)
 
+        telemetry = current_telemetry()
+
         for attempt in range(max_retries):
+            started = time.perf_counter()
             try:
                 result = await self.adapter.call_api(self.config.interface_name, params)
+                if telemetry:
+                    telemetry.record_api_call(time.perf_counter() - started)
                 logger.info(f"Successfully retrieved data from {self.config.interface_name}")
                 return result
 
+            except CacheMissError:
+                logger.error(f"Replay cache miss for {self.config.interface_name}, params: {params}")
+                raise
+
             except Exception as e:
+                if telemetry:
+                    telemetry.record_api_call(time.perf_counter() - started, success=False)
                 if attempt < max_retries - 1:
+                    if telemetry:
+                        telemetry.record_retry()
                     wait_time = backoff * (2 ** attempt)
                     logger.warning(f"Attempt {attempt + 1} failed for {self.config.interface_name}: {str(e)}. Retrying in {wait_time}s...")
                     await asyncio.sleep(wait_time)
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+import time
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """令牌桶限流器 - 同一数据源的所有调用共享配额"""
+
+    def __init__(self, calls_per_minute: int, burst: Optional[int] = None):
+        self.calls_per_minute = max(1, int(calls_per_minute))
+        self.capacity = burst or self.calls_per_minute
+        self.rate = self.calls_per_minute / 60.0
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.total_calls = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """预占一个令牌，返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            self.total_calls += 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    async def acquire(self) -> None:
+        """异步获取调用许可"""
+        wait_time = self._reserve()
+        if wait_time > 0:
+            logger.debug(f"[限流] 等待 {wait_time:.2f}s")
+            await asyncio.sleep(wait_time)
+
+    def acquire_sync(self) -> None:
+        """同步获取调用许可（用于线程池中的阻塞调用）"""
+        wait_time = self._reserve()
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(source: str, calls_per_minute: int) -> RateLimiter:
+    """获取数据源的进程级共享限流器"""
+    with _limiters_lock:
+        limiter = _limiters.get(source)
+        if limiter is None:
+            limiter = RateLimiter(calls_per_minute)
+            _limiters[source] = limiter
+            logger.info(f"[限流] 数据源 {source} 限流器已创建: {calls_per_minute} 次/分钟")
+        return limiter
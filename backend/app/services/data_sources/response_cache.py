@@ -0,0 +1,269 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from ...core.config import settings
+from .base import DataSourceAdapter
+from ..sync_telemetry import current_telemetry
+
+logger = logging.getLogger(__name__)
+
+CACHE_MODES = ("off", "on", "replay")
+
+
+class CacheMissError(LookupError):
+    """回放模式下缓存未命中"""
+    pass
+
+
+def _json_default(value: Any) -> Any:
+    # numpy 标量等对象
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+class ResponseCache:
+    """磁盘原始响应缓存 - gzip 压缩存储，按接口 TTL 过期，按总大小 LRU 淘汰"""
+
+    def __init__(self, cache_dir: str, max_bytes: int, default_ttl: int, mode: str = "on"):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"不支持的缓存模式: {mode}")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def normalize_params(params: Dict[str, Any]) -> Dict[str, str]:
+        """去掉空参数并统一为字符串，保证等价请求得到相同的键"""
+        return {
+            str(key): str(value)
+            for key, value in sorted(params.items())
+            if value is not None and value != ""
+        }
+
+    def make_key(self, source: str, endpoint: str, params: Dict[str, Any]) -> str:
+        raw = json.dumps([source, endpoint, self.normalize_params(params)], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, source: str, key: str) -> str:
+        return os.path.join(self.cache_dir, source, key[:2], f"{key}.json.gz")
+
+    def _load_index(self) -> None:
+        """首次使用时扫描缓存目录，建立 路径 -> (大小, 最近访问时间) 索引"""
+        if self._index is not None:
+            return
+        self._index = {}
+        self._total_bytes = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json.gz"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                self._index[path] = (stat.st_size, stat.st_mtime)
+                self._total_bytes += stat.st_size
+
+    def get(self, source: str, endpoint: str, params: Dict[str, Any], ttl: Optional[int] = None) -> Tuple[bool, Any]:
+        """读取缓存，返回 (是否命中, 响应)。回放模式忽略 TTL"""
+        path = self._path(source, self.make_key(source, endpoint, params))
+        try:
+            with open(path, "rb") as f:
+                entry = json.loads(gzip.decompress(f.read()).decode("utf-8"))
+        except (OSError, ValueError):
+            self._count(hit=False)
+            return False, None
+
+        ttl = self.default_ttl if ttl is None else ttl
+        if not self.replay and ttl >= 0 and time.time() - entry.get("stored_at", 0) > ttl:
+            self._count(hit=False)
+            return False, None
+
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        with self._lock:
+            self._load_index()
+            if path in self._index:
+                self._index[path] = (self._index[path][0], now)
+            self.hits += 1
+        return True, entry.get("payload")
+
+    def _count(self, hit: bool) -> None:
+        # 同步作业在多个线程中并发读取缓存
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, source: str, endpoint: str, params: Dict[str, Any], payload: Any) -> None:
+        """写入缓存并按需淘汰最久未访问的条目"""
+        key = self.make_key(source, endpoint, params)
+        path = self._path(source, key)
+        entry = {
+            "source": source,
+            "endpoint": endpoint,
+            "params": self.normalize_params(params),
+            "stored_at": time.time(),
+            "payload": payload,
+        }
+        data = gzip.compress(json.dumps(entry, ensure_ascii=False, default=_json_default).encode("utf-8"))
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._load_index()
+            previous = self._index.get(path)
+            if previous:
+                self._total_bytes -= previous[0]
+            self._index[path] = (len(data), time.time())
+            self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """LRU 淘汰直到总大小降到上限的 90%"""
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for path, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            del self._index[path]
+            self._total_bytes -= size
+            evicted += 1
+        logger.info(f"[响应缓存] LRU 淘汰 {evicted} 个条目，当前占用 {self._total_bytes} 字节")
+
+    def clear(self, source: Optional[str] = None) -> int:
+        """清空缓存（可指定数据源），返回删除的条目数"""
+        prefix = os.path.join(self.cache_dir, source) if source else self.cache_dir
+        removed = 0
+        with self._lock:
+            self._load_index()
+            for path in [p for p in self._index if p.startswith(prefix)]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                self._total_bytes -= self._index.pop(path)[0]
+                removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._load_index()
+            return {
+                "mode": self.mode,
+                "cache_dir": self.cache_dir,
+                "entries": len(self._index),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class CachedDataSourceAdapter(DataSourceAdapter):
+    """带响应缓存的数据源适配器包装 - 对调用方透明"""
+
+    def __init__(self, adapter: DataSourceAdapter, source: str, cache: ResponseCache, ttls: Optional[Dict[str, int]] = None):
+        super().__init__(adapter.api_key)
+        self.adapter = adapter
+        self.source = source
+        self.cache = cache
+        self.ttls = ttls or {}
+
+    @staticmethod
+    def is_date_bounded(params: Dict[str, Any]) -> bool:
+        """请求是否只涉及已结束的交易日（trade_date 或 end_date 早于今天），这类数据不会再变化"""
+        bound = params.get("trade_date") or params.get("end_date")
+        if not bound:
+            return False
+        return str(bound).replace("-", "") < datetime.now().strftime("%Y%m%d")
+
+    def _ttl(self, endpoint: str, params: Dict[str, Any]) -> Optional[int]:
+        """接口单独配置的有效期优先；否则已结束日期的请求用默认有效期，其余用 DATA_CACHE_OPEN_ENDED_TTL"""
+        if endpoint in self.ttls:
+            return self.ttls[endpoint]
+        if self.is_date_bounded(params):
+            return None
+        return settings.DATA_CACHE_OPEN_ENDED_TTL
+
+    def is_available(self) -> bool:
+        return self.cache.replay or self.adapter.is_available()
+
+    async def call_api(self, endpoint: str, params: Dict[str, Any]) -> Any:
+        ttl = self._ttl(endpoint, params)
+        if ttl == 0 and not self.cache.replay:
+            # 不限定日期的请求（如最新行情、股票列表）默认不缓存，避免新交易日后仍返回旧数据
+            return await self.adapter.call_api(endpoint, params)
+        hit, payload = self.cache.get(self.source, endpoint, params, ttl)
+        if hit:
+            logger.debug(f"[响应缓存] 命中 {self.source}.{endpoint}, params: {params}")
+            telemetry = current_telemetry()
+            if telemetry:
+                telemetry.record_cache_hit()
+            return payload
+        if self.cache.replay:
+            raise CacheMissError(f"回放模式缓存未命中: {self.source}.{endpoint} {params}")
+
+        result = await self.adapter.call_api(endpoint, params)
+        # 空结果可能只是数据尚未发布，不缓存
+        if result:
+            self.cache.put(self.source, endpoint, params, result)
+        return result
+
+    def normalize_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self.adapter.normalize_params(params)
+
+    def normalize_response(self, response: Any) -> Any:
+        return self.adapter.normalize_response(response)
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """获取进程级共享的响应缓存，DATA_CACHE_MODE=off 时返回 None"""
+    global _response_cache
+    if settings.DATA_CACHE_MODE == "off":
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                cache_dir=settings.DATA_CACHE_DIR,
+                max_bytes=settings.DATA_CACHE_MAX_BYTES,
+                default_ttl=settings.DATA_CACHE_DEFAULT_TTL,
+                mode=settings.DATA_CACHE_MODE,
+            )
+            logger.info(f"[响应缓存] 已启用: 模式 {settings.DATA_CACHE_MODE}, 目录 {settings.DATA_CACHE_DIR}")
+        return _response_cache
@@ -2,7 +2,10 @@ import asyncio
 import logging
 from typing import Any, Dict, Optional
 from ..tushare_api import TushareAPI
+from ...core.config import settings
 from .base import DataSourceAdapter
+from .rate_limiter import get_rate_limiter
+from ..sync_telemetry import current_telemetry
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +16,7 @@ class TushareAdapter(DataSourceAdapter):
     def __init__(self, api_token: Optional[str] = None):
         super().__init__(api_token)
         self.api = TushareAPI(api_token)
+        self.rate_limiter = get_rate_limiter("tushare", settings.TUSHARE_CALLS_PER_MINUTE)
 
     def is_available(self) -> bool:
         return self.api.pro is not None
@@ -28,7 +32,13 @@ class TushareAdapter(DataSourceAdapter):
         if method is None:
             raise ValueError(f"Unknown endpoint: {endpoint}")
 
-        df = method(**params)
+        await self.rate_limiter.acquire()
+        loop = asyncio.get_running_loop()
+        df = await loop.run_in_executor(None, lambda: method(**params))
+        telemetry = current_telemetry()
+        if telemetry and df is not None:
+            # Tushare SDK 不暴露原始响应，按 DataFrame 内存占用估算接收字节数
+            telemetry.record_bytes(df.memory_usage(deep=True).sum())
         result = df.to_dict(orient="records") if df is not None and not df.empty else []
         logger.info(f"Retrieved {len(result)} records from {endpoint}")
         return result
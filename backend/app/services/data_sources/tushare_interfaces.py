@@ -1,9 +1,11 @@
 import logging
 from typing import Dict, Any
 from .interface_registry import InterfaceRegistry
-from .tushare_adapter import TushareAdapter
+from .base import DataSourceAdapter
 from .interface_config import InterfaceConfig
 from .interface_executor import InterfaceExecutor
+from .response_cache import CachedDataSourceAdapter, get_response_cache
+from ...core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -14,21 +16,31 @@ tushare_config = [
     {"interface_name": "moneyflow", "description": "资金流向数据"},
     {"interface_name": "moneyflow_hsgt", "description": "沪深港通资金流向"},
     {"interface_name": "top_list", "description": "龙虎榜数据"},
-    {"interface_name": "index_basic", "description": "指数基本信息"},
+    {"interface_name": "index_basic", "description": "指数基本信息", "cache_ttl": 7 * 24 * 3600},
     {"interface_name": "index_daily", "description": "指数日线数据"},
+    {"interface_name": "trade_cal", "description": "交易日历", "cache_ttl": 24 * 3600},
 ]
 
 
-def register_tushare_interfaces(registry: InterfaceRegistry, adapter: TushareAdapter):
+def register_tushare_interfaces(registry: InterfaceRegistry, adapter: DataSourceAdapter):
     logger.info(f"Registering {len(tushare_config)} Tushare interfaces")
 
-    for interface_info in tushare_config:
-        config = InterfaceConfig(
+    configs = [
+        InterfaceConfig(
             interface_name=interface_info["interface_name"],
             data_source="tushare",
-            description=interface_info["description"]
+            description=interface_info["description"],
+            cache_ttl=settings.DATA_CACHE_TTLS.get(interface_info["interface_name"], interface_info.get("cache_ttl"))
         )
+        for interface_info in tushare_config
+    ]
 
+    cache = get_response_cache()
+    if cache is not None:
+        ttls = {config.interface_name: config.cache_ttl for config in configs if config.cache_ttl is not None}
+        adapter = CachedDataSourceAdapter(adapter, getattr(adapter, "source_name", "tushare"), cache, ttls)
+
+    for config in configs:
         executor = InterfaceExecutor(adapter, config)
         registry.register(config, executor)
-        logger.debug(f"Registered interface: {interface_info['interface_name']}")
+        logger.debug(f"Registered interface: {config.interface_name}")
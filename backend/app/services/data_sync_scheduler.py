@@ -1,8 +1,11 @@
-import schedule
-import time
-from datetime import datetime, timedelta
+import asyncio
+from datetime import datetime
 from .data_sync_service import DataSyncService
+from .rule_engine_service import RuleEngine
 from ..database import get_db
+from ..core.config import settings
+from ..crud.analysis_result import compact_legacy_analysis_results, purge_analysis_rule_runs
+from ..crud.data_change_log import purge_data_changes
 
 
 def sync_stock_data_task():
@@ -43,12 +46,11 @@ def sync_financial_data_task():
         # 获取所有用户的自选股
         user_stocks = sync_service.get_all_user_stocks()
         
-        # 按用户同步数据
-        for user_stock in user_stocks:
-            try:
-                sync_service.sync_financial_data_for_user(user_stock["user_id"], user_stock["stock_id"])
-            except Exception as e:
-                print(f"Error syncing financial data for stock {user_stock['stock_id']} for user {user_stock['user_id']}: {str(e)}")
+        # 多个用户关注同一股票时只同步一次，批量并发获取
+        stock_codes = list(dict.fromkeys(user_stock["code"] for user_stock in user_stocks))
+        result = asyncio.run(sync_service.sync_financial_data_batch(stock_codes))
+        for failure in result["failures"]:
+            print(f"Error syncing financial data for stock {failure}")
                 
         print(f"Financial data sync completed at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     except Exception as e:
@@ -57,16 +59,54 @@ def sync_financial_data_task():
         db.close()
 
 
-# 配置任务调度
-schedule.every().day.at("18:30").do(sync_stock_data_task)  # 每日收盘后同步
-schedule.every(7).days.do(sync_financial_data_task)  # 每周同步财务数据
+def evaluate_rules_task():
+    """
+    定时增量评估分析规则
+    """
+    print(f"Starting rule evaluation at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    db = next(get_db())
+
+    try:
+        summary = RuleEngine(db).evaluate_incremental()
+        print(f"Rule evaluation completed at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: "
+              f"{summary['newly_matched']} newly matched, {summary['unmatched']} no longer matched")
+    except Exception as e:
+        db.rollback()
+        print(f"Error in rule evaluation task: {str(e)}")
+    finally:
+        db.close()
+
+
+def analysis_result_retention_task():
+    """
+    定时压缩旧的逐行分析结果并清理超过保留期的规则运行结果
+    """
+    db = next(get_db())
+
+    try:
+        compacted = compact_legacy_analysis_results(db)
+        purged = purge_analysis_rule_runs(db, settings.ANALYSIS_RESULT_RETENTION_DAYS)
+        db.commit()
+        print(f"Analysis result retention completed: compacted {compacted['legacy_rows']} legacy rows "
+              f"into {compacted['runs']} runs, purged {purged} runs")
+    except Exception as e:
+        db.rollback()
+        print(f"Error in analysis result retention task: {str(e)}")
+    finally:
+        db.close()
 
 
-def run_scheduler():
+def data_change_log_retention_task():
     """
-    启动调度器
+    定时清理超过保留期的数据变更日志
     """
-    print("Scheduler started")
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # 每分钟检查一次任务
+    db = next(get_db())
+
+    try:
+        purged = purge_data_changes(db, settings.DATA_CHANGE_LOG_RETENTION_DAYS)
+        print(f"Data change log retention completed: purged {purged} rows")
+    except Exception as e:
+        db.rollback()
+        print(f"Error in data change log retention task: {str(e)}")
+    finally:
+        db.close()
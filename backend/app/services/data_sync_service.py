@@ -3,10 +3,17 @@ from ..models.stock import Stock
 from ..models.user_stock import UserStock
 from ..models.stock_daily import StockDaily
 from .tushare_api import TushareAPI
-from .alpha_vantage_api import AlphaVantageAPI
+from .change_feed import change_feed, ChangeCollector
+from .data_transform import get_model_mapping, transform_records
+from .stock_master_service import reconcile_stock_master
+from ..crud.bulk import bulk_upsert
+from ..crud.sync_watermark import get_sync_watermarks, frame_watermarks, advance_sync_watermarks, incremental_start_date
+from .alpha_vantage_api import AlphaVantageAPI, AsyncAlphaVantageAPI, AlphaVantageQuotaExceeded, AlphaVantageRateLimited
+from ..core.config import settings
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from dateutil.parser import parse as parse_date
+import asyncio
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -19,9 +26,9 @@ class DataSyncService:
         self.tushare_api = TushareAPI()
         self.alpha_vantage_api = AlphaVantageAPI()
         
-    def sync_stock_data(self, sync_request: Dict[str, Any]) -> Dict[str, Any]:
+    def sync_stock_data(self, sync_request: Dict[str, Any], progress=None) -> Dict[str, Any]:
         """
-        同步股票数据
+        同步股票数据，progress 为可选的作业进度（set_total / advance）
         """
         stock_codes = sync_request.get("stock_codes", [])
         sync_type = sync_request.get("sync_type", "all")
@@ -29,10 +36,14 @@ class DataSyncService:
         if not stock_codes:
             user_stocks = self.get_all_user_stocks()
             stock_codes = [stock["code"] for stock in user_stocks]
+        # 多个用户关注同一股票时只同步一次
+        stock_codes = list(dict.fromkeys(stock_codes))
             
         success_count = 0
         failed_count = 0
         failures = []
+        if progress:
+            progress.set_total(len(stock_codes))
         
         for code in stock_codes:
             try:
@@ -44,9 +55,13 @@ class DataSyncService:
                     self.sync_financial_data(code)
                     
                 success_count += 1
+                if progress:
+                    progress.advance()
             except Exception as e:
                 failed_count += 1
                 failures.append(f"{code}: {str(e)}")
+                if progress:
+                    progress.advance(failed=True)
                 
         return {
             "success": True,
@@ -148,10 +163,16 @@ class DataSyncService:
         logger.info(f"同步时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
         daily_data = None
+        # 与同步任务的 daily 接口共用水位线
+        watermark = get_sync_watermarks(self.db, "daily", [stock_code]).get(stock_code)
+        start_date = incremental_start_date(watermark)
 
         if self.tushare_api.is_available():
-            logger.info("使用 Tushare API 获取数据")
-            daily_data = self.tushare_api.get_daily_data(ts_code=stock_code)
+            if start_date and start_date > datetime.now().strftime("%Y%m%d"):
+                logger.info(f"股票 {stock_code} 已同步到 {watermark}，无需拉取")
+                return
+            logger.info(f"使用 Tushare API 获取数据，起始日期: {start_date or '全部历史'}")
+            daily_data = self.tushare_api.get_daily_data(ts_code=stock_code, start_date=start_date)
 
             if daily_data and len(daily_data) > 0:
                 logger.info(f"从 Tushare 获取到 {len(daily_data)} 条交易数据")
@@ -159,71 +180,26 @@ class DataSyncService:
                 if dates:
                     logger.info(f"数据范围: {max(dates)} 至 {min(dates)}")
 
-                new_count = 0
-                update_count = 0
-                error_count = 0
-
-                for item in daily_data:
-                    try:
-                        trade_date_str = item.get("trade_date")
-                        if not trade_date_str:
-                            continue
-
-                        trade_date = parse_date(trade_date_str).date()
-                        open_price = item.get("open")
-                        high_price = item.get("high")
-                        low_price = item.get("low")
-                        close_price = item.get("close")
-                        pre_close = item.get("pre_close")
-                        change = item.get("change")
-                        pct_chg = item.get("pct_chg")
-                        vol = item.get("vol")
-                        amount = item.get("amount")
-
-                        existing = self.db.query(StockDaily).filter(
-                            StockDaily.ts_code == stock_code,
-                            StockDaily.trade_date == trade_date
-                        ).first()
-
-                        if existing:
-                            existing.open = open_price
-                            existing.high = high_price
-                            existing.low = low_price
-                            existing.close = close_price
-                            existing.pre_close = pre_close
-                            existing.change = change
-                            existing.pct_chg = pct_chg
-                            existing.vol = vol
-                            existing.amount = amount
-                            update_count += 1
-                        else:
-                            new_daily = StockDaily(
-                                ts_code=stock_code,
-                                trade_date=trade_date,
-                                open=open_price,
-                                high=high_price,
-                                low=low_price,
-                                close=close_price,
-                                pre_close=pre_close,
-                                change=change,
-                                pct_chg=pct_chg,
-                                vol=vol,
-                                amount=amount
-                            )
-                            self.db.add(new_daily)
-                            new_count += 1
-                    except Exception as e:
-                        logger.error(f"处理交易数据失败 {item.get('trade_date')}: {str(e)}")
-                        error_count += 1
+                mapping = get_model_mapping(StockDaily)
+                frame, error_count = transform_records(daily_data, mapping)
+                frame["ts_code"] = stock_code
 
                 try:
+                    result = bulk_upsert(self.db, mapping, frame)
+                    changes = ChangeCollector("stock_daily", source="data_sync")
+                    changes.add_many(result.inserted, "insert")
+                    changes.add_many(result.updated, "update")
+                    change_feed.stage(self.db, changes)
+                    advance_sync_watermarks(self.db, "daily", frame_watermarks(frame))
                     self.db.commit()
                     logger.info(f"✓ 股票 {stock_code} 的交易数据保存成功")
-                    logger.info(f"新增: {new_count} 条, 更新: {update_count} 条, 失败: {error_count} 条")
+                    logger.info(f"新增: {len(result.inserted)} 条, 更新: {len(result.updated)} 条, 失败: {error_count} 条")
                 except Exception as e:
                     self.db.rollback()
                     logger.error(f"✗ 提交股票 {stock_code} 的交易数据失败: {str(e)}")
                     raise
+            elif start_date and daily_data is not None:
+                logger.info(f"股票 {stock_code} 自 {start_date} 起没有新的交易数据")
             else:
                 logger.warning(f"Tushare 未获取到有效数据")
                 logger.info(f"API响应: {daily_data if daily_data else '无响应'}")
@@ -240,6 +216,8 @@ class DataSyncService:
                 new_count = 0
                 update_count = 0
                 error_count = 0
+                changes = ChangeCollector("stock_daily", source="data_sync")
+                latest_date = None
 
                 for trade_date_str, data in time_series.items():
                     try:
@@ -266,6 +244,7 @@ class DataSyncService:
                             existing.vol = volume
                             existing.amount = float(data.get("6. volume", 0))
                             update_count += 1
+                            changes.add(stock_code, trade_date, "update")
                         else:
                             new_daily = StockDaily(
                                 ts_code=stock_code,
@@ -282,11 +261,15 @@ class DataSyncService:
                             )
                             self.db.add(new_daily)
                             new_count += 1
+                            changes.add(stock_code, trade_date, "insert")
+                        latest_date = max(latest_date or trade_date, trade_date)
                     except Exception as e:
                         logger.error(f"处理交易数据失败 {trade_date_str}: {str(e)}")
                         error_count += 1
 
                 try:
+                    change_feed.stage(self.db, changes)
+                    # Alpha Vantage 只返回最近一段数据，不推进水位线，否则之后 Tushare 不会再补更早的历史
                     self.db.commit()
                     logger.info(f"✓ 股票 {stock_code} 的交易数据保存成功")
                     logger.info(f"新增: {new_count} 条, 更新: {update_count} 条, 失败: {error_count} 条")
@@ -301,23 +284,88 @@ class DataSyncService:
         logger.info(f"========== 股票 {stock_code} 同步完成 ==========")
             
     def sync_financial_data(self, stock_code: str):
-        from ..crud.stock_income_statement import upsert_income_statements
-        from ..crud.stock_balance_sheet import upsert_balance_sheets
-        from ..crud.stock_cash_flow import upsert_cash_flows
-        from ..models.stock import Stock
-
         stock = self.db.query(Stock).filter(Stock.ts_code == stock_code).first()
         if not stock:
             logger.warning(f"股票 {stock_code} 不存在，跳过财务数据同步")
             return
 
-        stock_id = stock.id
-        ts_code = stock.ts_code
-
         income_statement = self.alpha_vantage_api.get_income_statement(stock_code)
         balance_sheet = self.alpha_vantage_api.get_balance_sheet(stock_code)
         cash_flow = self.alpha_vantage_api.get_cash_flow(stock_code)
 
+        self._save_financial_statements(stock, income_statement, balance_sheet, cash_flow)
+
+    async def sync_financial_data_batch(self, stock_codes: List[str], concurrency: Optional[int] = None, progress=None) -> Dict[str, Any]:
+        """
+        批量同步财务数据 - 共享连接池并发获取，吞吐由 Alpha Vantage 配额限流器决定
+        """
+        concurrency = concurrency or settings.ALPHA_VANTAGE_CONCURRENCY
+        # 同一股票只获取、写入一次，避免并发任务重复 upsert
+        stock_codes = list(dict.fromkeys(stock_codes or []))
+        stocks = {
+            stock.ts_code: stock
+            for stock in self.db.query(Stock).filter(Stock.ts_code.in_(stock_codes)).all()
+        } if stock_codes else {}
+
+        success_count = 0
+        failures = []
+        semaphore = asyncio.Semaphore(concurrency)
+        started = datetime.now()
+        logger.info(f"[财务数据] 开始批量同步 {len(stock_codes)} 只股票, 并发 {concurrency}")
+        if progress:
+            progress.set_total(len(stock_codes))
+
+        async with AsyncAlphaVantageAPI() as api:
+            async def sync_one(code: str) -> None:
+                succeeded = await sync_code(code)
+                if progress:
+                    progress.advance(failed=not succeeded)
+
+            async def sync_code(code: str) -> bool:
+                nonlocal success_count
+                stock = stocks.get(code)
+                if not stock:
+                    failures.append(f"{code}: 股票不存在")
+                    return False
+                try:
+                    async with semaphore:
+                        income_statement, balance_sheet, cash_flow = await api.get_financial_statements(code)
+                    if not any(statement and "annualReports" in statement
+                               for statement in (income_statement, balance_sheet, cash_flow)):
+                        failures.append(f"{code}: 未获取到财务报表")
+                        return False
+                    self._save_financial_statements(stock, income_statement, balance_sheet, cash_flow)
+                    success_count += 1
+                    return True
+                except (AlphaVantageQuotaExceeded, AlphaVantageRateLimited) as e:
+                    failures.append(f"{code}: {str(e)}")
+                except Exception as e:
+                    self.db.rollback()
+                    failures.append(f"{code}: {str(e)}")
+                return False
+
+            await asyncio.gather(*(sync_one(code) for code in stock_codes))
+
+        elapsed = (datetime.now() - started).total_seconds()
+        logger.info(f"[财务数据] 批量同步完成: 成功 {success_count}, 失败 {len(failures)}, 耗时 {elapsed:.1f}s")
+        return {
+            "success": True,
+            "message": f"同步完成，成功 {success_count} 个，失败 {len(failures)} 个",
+            "synced_count": success_count,
+            "failed_count": len(failures),
+            "failures": failures
+        }
+
+    def _save_financial_statements(self, stock: Stock, income_statement: Optional[Dict[str, Any]],
+                                   balance_sheet: Optional[Dict[str, Any]], cash_flow: Optional[Dict[str, Any]]):
+        from ..crud.stock_income_statement import upsert_income_statements
+        from ..crud.stock_balance_sheet import upsert_balance_sheets
+        from ..crud.stock_cash_flow import upsert_cash_flows
+
+        stock_id = stock.id
+        ts_code = stock.ts_code
+        stock_code = stock.ts_code
+
         if income_statement and "annualReports" in income_statement:
             reports = income_statement["annualReports"]
             income_data = []
@@ -445,24 +493,28 @@ class DataSyncService:
                 "failures": []
             }
             
-        success_count = 0
-        failed_count = 0
-        failures = []
-        
-        for stock_data in stocks:
-            try:
-                self._save_stock_data(stock_data)
-                success_count += 1
-            except Exception as e:
-                failed_count += 1
-                failures.append(f"{stock_data.get('ts_code', 'unknown')}: {str(e)}")
-                
+        try:
+            diff = reconcile_stock_master(self.db, stocks, list_status=list_status, market=market)
+        except Exception as e:
+            logger.error(f"[股票主数据] ✗ 批量同步失败: {str(e)}")
+            return {
+                "success": False,
+                "message": f"同步失败: {str(e)}",
+                "synced_count": 0,
+                "failed_count": len(stocks),
+                "failures": [str(e)]
+            }
+
         return {
             "success": True,
-            "message": f"同步完成，成功 {success_count} 个，失败 {failed_count} 个",
-            "synced_count": success_count,
-            "failed_count": failed_count,
-            "failures": failures
+            "message": (
+                f"同步完成，新增 {len(diff['inserted'])} 个，更新 {len(diff['updated'])} 个，"
+                f"退市 {len(diff['delisted'])} 个，未变化 {diff['unchanged']} 个"
+            ),
+            "synced_count": diff["fetched"],
+            "failed_count": diff["invalid"],
+            "failures": [],
+            "diff": diff
         }
         
     def get_all_user_stocks(self) -> List[Dict[str, Any]]:
@@ -525,15 +577,3 @@ class DataSyncService:
                         print(f"成功同步用户 {user_id} 股票 {ts_code} 的财务数据")
                 except Exception as e:
                     print(f"同步用户 {user_id} 股票 {getattr(stock, 'symbol', 'unknown')} 的财务数据失败: {str(e)}")
-                    
-    def get_sync_status(self) -> Dict[str, Any]:
-        """
-        获取数据同步状态
-        """
-        return {
-            "last_sync_time": datetime.now(),
-            "next_sync_time": datetime.now(),
-            "syncing": False,
-            "status": "idle",
-            "tushare_available": self.tushare_api.is_available()
-        }
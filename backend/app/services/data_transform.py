@@ -0,0 +1,110 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+import pandas as pd
+from sqlalchemy import Date, DateTime, Float, Integer, Numeric, String
+
+logger = logging.getLogger(__name__)
+
+# 由数据库生成的列，不从接口数据写入
+_GENERATED_COLUMNS = {"id", "created_at", "updated_at"}
+
+
+class ModelMapping:
+    """接口数据到目标模型的列映射 - 根据模型定义推导日期列、数值列和字符串列"""
+
+    def __init__(self, model: Type, key_columns: Sequence[str] = ("ts_code", "trade_date"), renames: Optional[Dict[str, str]] = None):
+        self.model = model
+        self.key_columns = list(key_columns)
+        self.renames = renames or {}
+
+        columns = [column for column in model.__table__.columns if column.name not in _GENERATED_COLUMNS]
+        self.columns = [column.name for column in columns]
+        self.date_columns = [
+            column.name for column in columns
+            if isinstance(column.type, Date) and not isinstance(column.type, DateTime)
+        ]
+        self.numeric_columns = [
+            column.name for column in columns
+            if isinstance(column.type, (Float, Integer, Numeric))
+        ]
+        self.string_columns = [column.name for column in columns if isinstance(column.type, String)]
+        # 代理主键（如自增 id）不在业务键中时，更新需要先查出主键
+        self.primary_keys = [column.name for column in model.__table__.primary_key.columns]
+
+    def __repr__(self):
+        return f"<ModelMapping(model={self.model.__name__}, keys={self.key_columns})>"
+
+
+_mappings: Dict[Tuple[Type, Tuple[str, ...]], ModelMapping] = {}
+
+
+def get_model_mapping(model: Type, key_columns: Sequence[str] = ("ts_code", "trade_date")) -> ModelMapping:
+    """获取（并缓存）模型的列映射"""
+    cache_key = (model, tuple(key_columns))
+    mapping = _mappings.get(cache_key)
+    if mapping is None:
+        mapping = ModelMapping(model, key_columns)
+        _mappings[cache_key] = mapping
+    return mapping
+
+
+def to_frame(data: Any) -> pd.DataFrame:
+    """接口返回的记录列表或 DataFrame 统一为 DataFrame"""
+    if isinstance(data, pd.DataFrame):
+        return data
+    if not data:
+        return pd.DataFrame()
+    if isinstance(data, dict):
+        data = [data]
+    return pd.DataFrame.from_records(data)
+
+
+def parse_date_column(series: pd.Series) -> pd.Series:
+    """整列解析日期：优先按 YYYYMMDD，其余（如 YYYY-MM-DD、date 对象）再统一解析一次"""
+    text = series.astype("string").str.strip()
+    parsed = pd.to_datetime(text, format="%Y%m%d", errors="coerce")
+    fallback = parsed.isna() & text.notna() & (text != "")
+    if fallback.any():
+        parsed.loc[fallback] = pd.to_datetime(text[fallback], errors="coerce")
+    return parsed.dt.date.where(parsed.notna(), None)
+
+
+def transform_records(data: Any, mapping: ModelMapping) -> Tuple[pd.DataFrame, int]:
+    """列式转换：列映射、日期解析、类型转换、空值处理、按业务键去重
+
+    返回 (转换后的 DataFrame, 因业务键缺失或无效被丢弃的行数)
+    """
+    frame = to_frame(data)
+    if frame.empty:
+        return pd.DataFrame(columns=mapping.key_columns), 0
+    if mapping.renames:
+        frame = frame.rename(columns=mapping.renames)
+
+    missing_keys = [key for key in mapping.key_columns if key not in frame.columns]
+    if missing_keys:
+        logger.warning(f"[数据转换] {mapping.model.__name__} 缺少业务键列 {missing_keys}，丢弃 {len(frame)} 行")
+        return pd.DataFrame(columns=mapping.key_columns), len(frame)
+
+    frame = frame[[column for column in mapping.columns if column in frame.columns]].copy()
+
+    for column in mapping.date_columns:
+        if column in frame.columns:
+            frame[column] = parse_date_column(frame[column])
+    for column in mapping.numeric_columns:
+        if column in frame.columns:
+            frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    for column in mapping.string_columns:
+        if column in frame.columns and frame[column].dtype != object:
+            frame[column] = frame[column].astype("string").astype(object)
+
+    valid = frame[mapping.key_columns].notna().all(axis=1)
+    skipped = int((~valid).sum())
+    frame = frame[valid].drop_duplicates(subset=mapping.key_columns, keep="last")
+    return frame.reset_index(drop=True), skipped
+
+
+def frame_to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """DataFrame 转为写库用的字典列表，NaN/NaT 统一为 None"""
+    if frame.empty:
+        return []
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
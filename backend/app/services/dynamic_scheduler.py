@@ -1,13 +1,17 @@
 import asyncio
 import logging
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, Optional, Callable, List
 from datetime import datetime
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.schedulers.base import STATE_RUNNING
+from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.executors.asyncio import AsyncIOExecutor
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.date import DateTrigger
+from .trading_day_trigger import TradingDayTrigger
+from .scheduler_metrics import SchedulerMetrics
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,12 +20,17 @@ logger = logging.getLogger(__name__)
 class DynamicScheduler:
     """动态任务调度器 - 基于 APScheduler 实现"""
 
-    def __init__(self, db_url: str, timezone: str = "Asia/Shanghai"):
+    def __init__(self, timezone: str = "Asia/Shanghai"):
+        # 任务定义以 sync_tasks 表为准，由调度运行时在成为 leader 时加载并持续对齐，
+        # 调度器本身只保存在内存中，避免多个进程共享同一个 APScheduler 作业表重复触发
         jobstores = {
-            'default': SQLAlchemyJobStore(url=db_url)
+            'default': MemoryJobStore(),
+            # 延迟重试等临时任务，进程重启后由正常调度重新触发
+            'memory': MemoryJobStore()
         }
         executors = {
-            'default': ThreadPoolExecutor(20)
+            'default': ThreadPoolExecutor(20),
+            'asyncio': AsyncIOExecutor()
         }
         job_defaults = {
             'coalesce': True,
@@ -36,12 +45,13 @@ class DynamicScheduler:
             timezone=timezone
         )
         self.task_functions: Dict[str, Callable] = {}
+        self.metrics = SchedulerMetrics(self.scheduler)
 
-    def start(self) -> None:
-        """启动调度器"""
+    def start(self, paused: bool = False) -> None:
+        """启动调度器，paused=True 时只维护任务不触发（非 leader 进程）"""
         if not self.scheduler.running:
-            self.scheduler.start()
-            logger.info(f"========== 调度器已启动 ==========")
+            self.scheduler.start(paused=paused)
+            logger.info(f"========== 调度器已启动{'（暂停触发）' if paused else ''} ==========")
             logger.info(f"启动时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             logger.info(f"时区: {self.scheduler.timezone}")
         else:
@@ -51,11 +61,44 @@ class DynamicScheduler:
         """关闭调度器"""
         if self.scheduler.running:
             self.scheduler.shutdown(wait=wait)
+            self.metrics.close()
             logger.info(f"========== 调度器已关闭 ==========")
             logger.info(f"关闭时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         else:
             logger.warning("调度器未运行")
 
+    @property
+    def is_active(self) -> bool:
+        """调度器正在触发任务（已启动且未暂停）"""
+        return self.scheduler.state == STATE_RUNNING
+
+    def pause_all(self) -> None:
+        """暂停触发所有任务（失去 leader 身份时）"""
+        if self.scheduler.running:
+            self.scheduler.pause()
+            logger.info("[调度器] 已暂停触发")
+
+    def resume_all(self) -> None:
+        """恢复触发（成为 leader 时）"""
+        if self.scheduler.running:
+            self.scheduler.resume()
+            logger.info("[调度器] 已恢复触发")
+
+    def task_job_ids(self) -> List[str]:
+        """由同步任务生成的作业 ID（不含系统作业和一次性重试）"""
+        return [job.id for job in self.scheduler.get_jobs(jobstore="default") if job.id.isdigit()]
+
+    def add_system_job(self, job_id: str, func: Callable, trigger: Any) -> None:
+        """添加系统内置的周期作业（普通函数，在线程池中执行）"""
+        self.scheduler.add_job(
+            self.metrics.instrument(job_id, func),
+            trigger=trigger,
+            id=job_id,
+            name=job_id,
+            replace_existing=True
+        )
+        logger.info(f"[系统作业] ✓ {job_id} 已添加，触发器: {trigger}")
+
     def register_task_function(self, task_id: str, func: Callable) -> None:
         """注册任务执行函数"""
         self.task_functions[str(task_id)] = func
@@ -75,14 +118,30 @@ class DynamicScheduler:
 
         func = self.task_functions[task_id_str]
         self.scheduler.add_job(
-            func,
+            self.metrics.instrument(task_id_str, func),
             trigger=trigger,
             id=task_id_str,
             name=task_id_str,
+            # 任务函数是协程，必须在事件循环中执行（线程池执行器只会创建协程对象而不等待）
+            executor="asyncio",
             replace_existing=True
         )
         logger.info(f"[任务添加] ✓ 任务 ID {task_id} 已添加，触发器类型: {schedule_type}, 配置: {schedule_config}")
 
+    def add_one_shot_job(self, job_id: str, func: Callable, run_date: datetime) -> None:
+        """添加一次性协程任务（内存存储，不持久化），用于延迟重试"""
+        self.scheduler.add_job(
+            self.metrics.instrument(job_id, func),
+            trigger=DateTrigger(run_date=run_date),
+            id=job_id,
+            name=job_id,
+            jobstore="memory",
+            executor="asyncio",
+            misfire_grace_time=None,
+            replace_existing=True
+        )
+        logger.info(f"[一次性任务] ✓ {job_id} 已添加，执行时间: {run_date.strftime('%Y-%m-%d %H:%M:%S')}")
+
     async def remove_task(self, task_id: int) -> None:
         """从调度器移除任务"""
         task_id_str = str(task_id)
@@ -173,6 +232,10 @@ class DynamicScheduler:
             trigger = IntervalTrigger(**config)
             logger.info(f"[触发器构建] ✓ 创建 INTERVAL 触发器: {config}")
             return trigger
+        elif schedule_type == "trading_day":
+            trigger = TradingDayTrigger(timezone=self.scheduler.timezone, **config)
+            logger.info(f"[触发器构建] ✓ 创建 TRADING_DAY 触发器: {config}")
+            return trigger
         elif schedule_type == "date":
             trigger = DateTrigger(**config)
             logger.info(f"[触发器构建] ✓ 创建 DATE 触发器: {config}")
@@ -0,0 +1,175 @@
+import logging
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+from ..models.stock import Stock
+from ..models.stock_daily import StockDaily
+from ..models.stock_daily_basic import StockDailyBasic
+from ..models.stock_income_statement import StockIncomeStatement
+from ..models.stock_balance_sheet import StockBalanceSheet
+from ..models.data_change_log import DataChangeLog
+
+logger = logging.getLogger(__name__)
+
+# 均线窗口（交易日）
+MA_WINDOW = 20
+
+# 快照列：股票信息 + 规则指标
+INDICATOR_COLUMNS = ("price", "change", "volume", "ma20", "pe", "pb", "dividend_yield", "roe", "eps")
+SNAPSHOT_COLUMNS = ("ts_code", "name", "trade_date") + INDICATOR_COLUMNS
+
+
+def _latest_per_key(key_column, date_column, as_of: Optional[date]):
+    """每个 key 不晚于 as_of 的最新日期（分组子查询）"""
+    query = select(key_column.label("key"), func.max(date_column).label("latest"))
+    if as_of is not None:
+        query = query.where(date_column <= as_of)
+    return query.group_by(key_column).subquery()
+
+
+class FeatureSnapshotLoader:
+    """规则评估特征快照 - 用少量集合查询组装全市场每只股票的最新指标，按数据日期缓存
+
+    price/change/volume 取自每只股票最新一条日线，ma20 为最近 20 个交易日收盘价均值，
+    pe/pb/dividend_yield 取自最新每日指标，roe/eps 由最新一期利润表和资产负债表计算。
+    缓存键为各数据源的最新日期及变更日志的最新 ID，写入新日期或修订已有数据后自动重新加载。
+    """
+
+    def __init__(self):
+        self._cache: Dict[Tuple, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def load(self, db: Session, stock_ids: Optional[Iterable[int]] = None, as_of: Optional[date] = None) -> pd.DataFrame:
+        """返回特征快照：行索引为股票 ID，列为 SNAPSHOT_COLUMNS；未指定 stock_ids 时为全部上市股票"""
+        key = (as_of,) + self._watermarks(db, as_of)
+        with self._lock:
+            snapshot = self._cache.get(key)
+        if snapshot is None:
+            snapshot = self._build(db, as_of)
+            with self._lock:
+                # 只保留最近的快照
+                self._cache = {key: snapshot}
+            logger.info(f"[特征快照] 已加载 {len(snapshot)} 只股票，数据日期 {key[1:]}")
+
+        if stock_ids is None:
+            return snapshot[snapshot["listed"]].drop(columns=["listed"])
+        return snapshot.reindex(list(stock_ids)).drop(columns=["listed"])
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._cache = {}
+
+    def _watermarks(self, db: Session, as_of: Optional[date]) -> Tuple:
+        """各数据源的最新日期、股票数及最新变更日志 ID，作为缓存键"""
+        def latest(column):
+            query = select(func.max(column))
+            if as_of is not None:
+                query = query.where(column <= as_of)
+            return query.scalar_subquery()
+
+        return tuple(db.query(
+            latest(StockDaily.trade_date),
+            latest(StockDailyBasic.trade_date),
+            latest(StockIncomeStatement.fiscal_date_ending),
+            latest(StockBalanceSheet.fiscal_date_ending),
+            select(func.count(Stock.id)).scalar_subquery(),
+            select(func.max(DataChangeLog.id)).scalar_subquery(),
+        ).one())
+
+    def _build(self, db: Session, as_of: Optional[date]) -> pd.DataFrame:
+        stocks = pd.DataFrame(
+            db.query(Stock.id, Stock.ts_code, Stock.name, Stock.list_status).all(),
+            columns=["id", "ts_code", "name", "list_status"],
+        )
+        stocks["listed"] = stocks["list_status"].eq("L")
+        stocks = stocks.drop(columns=["list_status"]).set_index("id")
+        stocks = stocks.join(self._daily(db, as_of), on="ts_code")
+        stocks = stocks.join(self._moving_average(db, as_of), on="ts_code")
+        stocks = stocks.join(self._daily_basic(db, as_of), on="ts_code")
+        stocks = stocks.join(self._financials(db, as_of))
+        stocks = stocks.reindex(columns=list(SNAPSHOT_COLUMNS) + ["listed"])
+        stocks[list(INDICATOR_COLUMNS)] = stocks[list(INDICATOR_COLUMNS)].astype("float64")
+        return stocks
+
+    def _daily(self, db: Session, as_of: Optional[date]) -> pd.DataFrame:
+        latest = _latest_per_key(StockDaily.ts_code, StockDaily.trade_date, as_of)
+        rows = db.query(StockDaily.ts_code, StockDaily.trade_date, StockDaily.close, StockDaily.pct_chg, StockDaily.vol).join(
+            latest, and_(StockDaily.ts_code == latest.c.key, StockDaily.trade_date == latest.c.latest)
+        ).all()
+        return pd.DataFrame(rows, columns=["ts_code", "trade_date", "price", "change", "volume"]).set_index("ts_code")
+
+    def _moving_average(self, db: Session, as_of: Optional[date]) -> pd.DataFrame:
+        """最近 MA_WINDOW 个交易日（全市场有数据的日期）内各股票收盘价均值，停牌日不计"""
+        dates_query = db.query(StockDaily.trade_date).distinct()
+        if as_of is not None:
+            dates_query = dates_query.filter(StockDaily.trade_date <= as_of)
+        window = [row.trade_date for row in dates_query.order_by(StockDaily.trade_date.desc()).limit(MA_WINDOW)]
+        if not window:
+            return pd.DataFrame(columns=["ma20"])
+
+        rows = db.query(StockDaily.ts_code, StockDaily.close).filter(
+            StockDaily.trade_date.between(min(window), max(window))
+        ).all()
+        closes = pd.DataFrame(rows, columns=["ts_code", "close"])
+        return closes.groupby("ts_code")["close"].mean().rename("ma20").to_frame()
+
+    def _daily_basic(self, db: Session, as_of: Optional[date]) -> pd.DataFrame:
+        latest = _latest_per_key(StockDailyBasic.ts_code, StockDailyBasic.trade_date, as_of)
+        rows = db.query(
+            StockDailyBasic.ts_code, StockDailyBasic.pe, StockDailyBasic.pb, StockDailyBasic.dv_ttm, StockDailyBasic.dv_ratio
+        ).join(
+            latest, and_(StockDailyBasic.ts_code == latest.c.key, StockDailyBasic.trade_date == latest.c.latest)
+        ).all()
+        frame = pd.DataFrame(rows, columns=["ts_code", "pe", "pb", "dv_ttm", "dv_ratio"]).set_index("ts_code")
+        # 股息率优先使用 TTM
+        frame["dividend_yield"] = frame["dv_ttm"].fillna(frame["dv_ratio"])
+        return frame[["pe", "pb", "dividend_yield"]]
+
+    def _financials(self, db: Session, as_of: Optional[date]) -> pd.DataFrame:
+        """最新一期报表：roe = 净利润 / 股东权益 × 100，eps = 净利润 / 总股本"""
+        income_latest = _latest_per_key(
+            StockIncomeStatement.stock_id, StockIncomeStatement.fiscal_date_ending, as_of
+        )
+        income = pd.DataFrame(db.query(StockIncomeStatement.stock_id, StockIncomeStatement.net_income).join(
+            income_latest, and_(
+                StockIncomeStatement.stock_id == income_latest.c.key,
+                StockIncomeStatement.fiscal_date_ending == income_latest.c.latest
+            )
+        ).all(), columns=["stock_id", "net_income"]).drop_duplicates("stock_id").set_index("stock_id")
+
+        balance_latest = _latest_per_key(
+            StockBalanceSheet.stock_id, StockBalanceSheet.fiscal_date_ending, as_of
+        )
+        balance = pd.DataFrame(db.query(
+            StockBalanceSheet.stock_id, StockBalanceSheet.total_shareholder_equity, StockBalanceSheet.common_shares_outstanding
+        ).join(
+            balance_latest, and_(
+                StockBalanceSheet.stock_id == balance_latest.c.key,
+                StockBalanceSheet.fiscal_date_ending == balance_latest.c.latest
+            )
+        ).all(), columns=["stock_id", "equity", "shares"]).drop_duplicates("stock_id").set_index("stock_id")
+
+        frame = income.join(balance, how="outer")
+        equity = frame["equity"].where(frame["equity"] != 0)
+        shares = frame["shares"].where(frame["shares"] != 0)
+        return pd.DataFrame({
+            "roe": frame["net_income"] / equity * 100,
+            "eps": frame["net_income"] / shares,
+        }).replace([np.inf, -np.inf], np.nan)
+
+
+feature_snapshot_loader = FeatureSnapshotLoader()
+
+
+def load_feature_snapshot(db: Session, stock_ids: Optional[Iterable[int]] = None, as_of: Optional[date] = None) -> pd.DataFrame:
+    return feature_snapshot_loader.load(db, stock_ids=stock_ids, as_of=as_of)
+
+
+def snapshot_records(snapshot: pd.DataFrame) -> List[Dict]:
+    """快照转为每只股票一个字典（缺失值为 None），供 API/脚本使用"""
+    frame = snapshot.astype(object).where(snapshot.notna(), None)
+    return [{"id": stock_id, **values} for stock_id, values in frame.to_dict(orient="index").items()]
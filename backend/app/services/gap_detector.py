@@ -0,0 +1,171 @@
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from ..crud.sync_empty_fetch import MARKET_TS_CODE, get_empty_fetches
+from ..models.stock import Stock
+from ..models.stock_daily import StockDaily
+from ..models.index_daily import IndexDaily
+from ..models.moneyflow_hsgt import MoneyflowHsgt
+from ..models.top_list import TopList
+
+logger = logging.getLogger(__name__)
+
+# 接口 -> (目标模型, 是否支持按 trade_date 拉取全市场, 是否支持逗号分隔的多个 ts_code)
+GAP_TARGETS = {
+    "daily": (StockDaily, True, True),
+    "index_daily": (IndexDaily, False, False),
+}
+
+# 按交易日整表拉取的市场级接口 -> 目标模型（缺口以交易日为单位）
+DATE_GAP_TARGETS = {
+    "moneyflow_hsgt": MoneyflowHsgt,
+    "top_list": TopList,
+}
+
+# 单个日期缺失的代码数达到该值时，改为按 trade_date 一次拉取全市场
+BY_DATE_THRESHOLD = 20
+# 合并为一次请求的代码数上限
+MAX_CODES_PER_CALL = 50
+
+
+def find_gaps(db: Session, model: Any, ts_codes: List[str], trading_days: List[date], lookup_chunk: int = 500,
+              interface_name: Optional[str] = None) -> Dict[str, List[date]]:
+    """用集合运算求出每个代码在给定交易日中缺失的日期
+
+    上市前、退市后的日期不算缺失；指定 interface_name 时，该接口已确认上游无数据的 (代码, 日期)（如停牌）也不算缺失。
+    """
+    if not ts_codes or not trading_days:
+        return {}
+    start, end = trading_days[0], trading_days[-1]
+    confirmed_empty = get_empty_fetches(db, interface_name, start, end) if interface_name else set()
+
+    existing: Dict[str, Set[date]] = {ts_code: set() for ts_code in ts_codes}
+    listing: Dict[str, tuple] = {}
+    for offset in range(0, len(ts_codes), lookup_chunk):
+        chunk = ts_codes[offset:offset + lookup_chunk]
+        rows = db.query(model.ts_code, model.trade_date).filter(
+            model.ts_code.in_(chunk),
+            model.trade_date.between(start, end)
+        ).all()
+        for ts_code, trade_date in rows:
+            existing[ts_code].add(trade_date)
+        if model is StockDaily:
+            for ts_code, list_date, delist_date in db.query(Stock.ts_code, Stock.list_date, Stock.delist_date).filter(Stock.ts_code.in_(chunk)):
+                listing[ts_code] = (list_date, delist_date)
+
+    expected_all = set(trading_days)
+    gaps = {}
+    for ts_code in ts_codes:
+        expected = expected_all
+        list_date, delist_date = listing.get(ts_code, (None, None))
+        if list_date or delist_date:
+            expected = {
+                day for day in expected_all
+                if (not list_date or day >= list_date) and (not delist_date or day < delist_date)
+            }
+        missing = {day for day in expected - existing[ts_code] if (ts_code, day) not in confirmed_empty}
+        if missing:
+            gaps[ts_code] = sorted(missing)
+    return gaps
+
+
+def find_missing_dates(db: Session, model: Any, trading_days: List[date], interface_name: Optional[str] = None) -> List[date]:
+    """市场级数据表中没有任何记录的交易日；指定 interface_name 时排除该接口已确认无数据的交易日（如沪深港通休市）"""
+    if not trading_days:
+        return []
+    rows = db.query(model.trade_date).filter(
+        model.trade_date.between(trading_days[0], trading_days[-1])
+    ).distinct().all()
+    existing = {row.trade_date for row in rows}
+    if interface_name:
+        existing |= {day for ts_code, day in get_empty_fetches(db, interface_name, trading_days[0], trading_days[-1])
+                     if ts_code == MARKET_TS_CODE}
+    return [day for day in trading_days if day not in existing]
+
+
+def empty_pairs(plan: Dict[str, str], gaps: Dict[str, List[date]], rows: List[Dict[str, Any]], latest_day: date) -> Set[Tuple[str, date]]:
+    """一次补缺口调用请求的缺失 (代码, 日期) 中，上游没有返回数据的部分
+
+    按 trade_date 拉取全市场时，只有该日返回了其他代码的数据才确认（整日为空说明数据尚未发布或上游异常）；
+    按代码区间拉取时，最新交易日的数据可能尚未发布，同样要求该日已有其他代码的数据。
+    市场级接口的 gaps 为 {"*": 缺失交易日}，最新交易日之前整日没有返回数据即确认。
+    """
+    by_date = "trade_date" in plan
+    if by_date:
+        day = datetime.strptime(plan["trade_date"], "%Y%m%d").date()
+        requested = {(ts_code, day) for ts_code, days in gaps.items() if day in days}
+    else:
+        start = datetime.strptime(plan["start_date"], "%Y%m%d").date()
+        end = datetime.strptime(plan["end_date"], "%Y%m%d").date()
+        requested = {
+            (ts_code, day) for ts_code in plan["ts_code"].split(",")
+            for day in gaps.get(ts_code, []) if start <= day <= end
+        }
+
+    returned = {(row.get("ts_code") or MARKET_TS_CODE, str(row.get("trade_date"))) for row in rows}
+    published = {trade_date for _, trade_date in returned}
+    empty = set()
+    for ts_code, day in requested:
+        key = day.strftime("%Y%m%d")
+        if ts_code == MARKET_TS_CODE:
+            if key not in published and day < latest_day:
+                empty.add((ts_code, day))
+        elif (ts_code, key) not in returned and (key in published or (day < latest_day and not by_date)):
+            empty.add((ts_code, day))
+    return empty
+
+
+def plan_fetches(
+    gaps: Dict[str, List[date]],
+    trading_days: List[date],
+    by_date: bool,
+    multi_code: bool,
+    by_date_threshold: int = BY_DATE_THRESHOLD
+) -> List[Dict[str, str]]:
+    """把缺口转换为最少的接口调用参数
+
+    1. 支持按日期拉全市场的接口，缺失代码数达到阈值的日期用 trade_date 一次拉取；
+    2. 其余缺口按代码合并为连续交易日区间；
+    3. 区间相同的代码合并到同一次调用（接口支持多代码时）。
+    """
+    plans: List[Dict[str, str]] = []
+    remaining = {ts_code: list(days) for ts_code, days in gaps.items()}
+
+    if by_date:
+        date_counts: Dict[date, int] = {}
+        for days in remaining.values():
+            for day in days:
+                date_counts[day] = date_counts.get(day, 0) + 1
+        market_dates = {day for day, count in date_counts.items() if count >= by_date_threshold}
+        for day in sorted(market_dates):
+            plans.append({"trade_date": day.strftime("%Y%m%d")})
+        remaining = {
+            ts_code: [day for day in days if day not in market_dates]
+            for ts_code, days in remaining.items()
+        }
+
+    position = {day: index for index, day in enumerate(trading_days)}
+    ranges: Dict[tuple, List[str]] = {}
+    for ts_code, days in remaining.items():
+        run_start: Optional[date] = None
+        previous: Optional[date] = None
+        for day in days:
+            if previous is not None and position[day] == position[previous] + 1:
+                previous = day
+                continue
+            if run_start is not None:
+                ranges.setdefault((run_start, previous), []).append(ts_code)
+            run_start = previous = day
+        if run_start is not None:
+            ranges.setdefault((run_start, previous), []).append(ts_code)
+
+    batch_size = MAX_CODES_PER_CALL if multi_code else 1
+    for (start, end), codes in sorted(ranges.items()):
+        for offset in range(0, len(codes), batch_size):
+            plans.append({
+                "ts_code": ",".join(codes[offset:offset + batch_size]),
+                "start_date": start.strftime("%Y%m%d"),
+                "end_date": end.strftime("%Y%m%d"),
+            })
+    return plans
@@ -0,0 +1,190 @@
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+from ..models.analysis_rule import AnalysisRule
+from ..models.rule_evaluation_state import RuleEvaluationState, RuleMatchState, RuleMatchTransition, RuleFeatureBaseline
+from .feature_snapshot import load_feature_snapshot
+from .rule_engine_service import RULE_INDICATORS, compile_rule_set, conditions_fingerprint, rule_indicators
+
+logger = logging.getLogger(__name__)
+
+_INDICATOR_COLUMNS = {indicator: index for index, indicator in enumerate(RULE_INDICATORS)}
+
+# IN 条件每批的 ID 数
+DELETE_CHUNK = 500
+
+
+def _json_value(value: float) -> Optional[float]:
+    """NaN 不是合法的 JSON，缺失值保存为 null（读回时还原为 NaN）"""
+    return None if np.isnan(value) else float(value)
+
+
+class IncrementalRuleEvaluator:
+    """增量规则评估 - 只重新评估依赖指标发生变化的股票，只保存命中状态的变化
+
+    每次运行把全市场特征快照与上次评估的指标取值（rule_feature_baselines）比较，得到每只股票变化的指标；
+    规则只对其依赖指标有变化的股票重新评估，其余股票沿用 rule_match_states 中的命中状态。
+    新增、条件修改过或重新启用的规则对全部股票评估；退出快照（退市）的股票视为不再命中。
+    新命中 / 不再命中写入 rule_match_transitions，不保存完整的结果集。
+    停用规则的状态在下次运行时清除，不产生状态变化记录。
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def run(self, features: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+        """features 须为全市场快照（行索引为股票 ID），未指定时加载最新特征快照"""
+        started = time.perf_counter()
+        if features is None:
+            features = load_feature_snapshot(self.db)
+        # 缺失指标保持 NaN：与任何阈值比较都不命中
+        current = features.reindex(columns=list(RULE_INDICATORS)).astype("float64")
+        stock_ids = current.index.to_numpy()
+        matrix = current.to_numpy()
+        positions = {stock_id: index for index, stock_id in enumerate(stock_ids.tolist())}
+
+        baseline = self._load_baseline()
+        previous = baseline.reindex(index=current.index, columns=list(RULE_INDICATORS)).to_numpy(dtype="float64")
+        # 两次都缺失的指标不算变化；不在基线中的新股票所有指标都视为变化
+        changed = ~((matrix == previous) | (np.isnan(matrix) & np.isnan(previous)))
+        changed[~current.index.isin(baseline.index)] = True
+
+        rules = self.db.query(AnalysisRule).filter(AnalysisRule.enabled == True).all()
+        rule_ids = [rule.id for rule in rules]
+        states = {state.rule_id: state for state in self.db.query(RuleEvaluationState).all()}
+        matched_before: Dict[int, Set[int]] = {}
+        for rule_id, stock_id in self.db.query(RuleMatchState.rule_id, RuleMatchState.stock_id).filter(
+            RuleMatchState.rule_id.in_(rule_ids)
+        ).all():
+            matched_before.setdefault(rule_id, set()).add(stock_id)
+
+        now = datetime.now()
+        transitions: List[Dict[str, Any]] = []
+        additions: List[Dict[str, Any]] = []
+        summary: Dict[int, Dict[str, Any]] = {}
+        evaluated_total = 0
+        pending = []
+        for rule in rules:
+            fingerprint = conditions_fingerprint(rule.conditions)
+            indicators = rule_indicators(rule.conditions)
+            state = states.get(rule.id)
+            full = state is None or state.conditions_hash != fingerprint
+            if full:
+                rows = np.ones(len(stock_ids), dtype=bool)
+            else:
+                columns = [_INDICATOR_COLUMNS[indicator] for indicator in indicators]
+                rows = changed[:, columns].any(axis=1) if columns else np.zeros(len(stock_ids), dtype=bool)
+            pending.append((rule, fingerprint, indicators, state, full, rows))
+
+        # 所有规则的待评估股票合并后按共享子表达式的计划只求值一次，再按各规则自己的待评估股票取结果
+        union = np.zeros(len(stock_ids), dtype=bool)
+        for *_, rows in pending:
+            union |= rows
+        union_ids = stock_ids[union]
+        masks = compile_rule_set(rules).evaluate(matrix[union])
+
+        for (rule, fingerprint, indicators, state, full, rows), mask in zip(pending, masks):
+            rule_rows = rows[union]
+            candidates = set(union_ids[rule_rows].tolist())
+            hits = set(union_ids[rule_rows & mask].tolist())
+            before = matched_before.get(rule.id, set())
+            after = {stock_id for stock_id in before if stock_id in positions and stock_id not in candidates} | hits
+            newly_matched = sorted(after - before)
+            unmatched = sorted(before - after)
+            evaluated_total += len(candidates)
+
+            for stock_id in newly_matched:
+                transitions.append(self._transition(rule.id, stock_id, True, indicators, matrix, positions))
+                additions.append({"rule_id": rule.id, "stock_id": stock_id, "matched_at": now})
+            for stock_id in unmatched:
+                transitions.append(self._transition(rule.id, stock_id, False, indicators, matrix, positions))
+            for start in range(0, len(unmatched), DELETE_CHUNK):
+                self.db.query(RuleMatchState).filter(
+                    RuleMatchState.rule_id == rule.id,
+                    RuleMatchState.stock_id.in_(unmatched[start:start + DELETE_CHUNK])
+                ).delete(synchronize_session=False)
+
+            if state is None:
+                state = RuleEvaluationState(rule_id=rule.id)
+                self.db.add(state)
+            state.conditions_hash = fingerprint
+            state.indicators = list(indicators)
+            state.matched_count = len(after)
+            state.evaluated_stocks = len(candidates)
+            state.evaluated_at = now
+            summary[rule.id] = {
+                "full": full,
+                "evaluated": len(candidates),
+                "matched": len(after),
+                "newly_matched": newly_matched,
+                "unmatched": unmatched,
+            }
+
+        self.db.bulk_insert_mappings(RuleMatchState, additions)
+        self.db.bulk_insert_mappings(RuleMatchTransition, transitions)
+        self._drop_disabled(rule_ids)
+        changed_stocks = self._save_baseline(baseline, current, changed.any(axis=1))
+        self.db.commit()
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            f"[增量规则评估] ✓ {len(rules)} 条规则，{changed_stocks}/{len(stock_ids)} 只股票指标有变化，"
+            f"重新评估 {evaluated_total} 个 (规则, 股票)，新命中 {len(additions)}，"
+            f"不再命中 {len(transitions) - len(additions)}，耗时 {elapsed_ms:.0f} ms"
+        )
+        return {
+            "rules": len(rules),
+            "stocks": len(stock_ids),
+            "changed_stocks": changed_stocks,
+            "evaluated": evaluated_total,
+            "newly_matched": len(additions),
+            "unmatched": len(transitions) - len(additions),
+            "elapsed_ms": round(elapsed_ms, 1),
+            "details": summary,
+        }
+
+    def _transition(self, rule_id: int, stock_id: int, matched: bool, indicators, matrix: np.ndarray,
+                    positions: Dict[int, int]) -> Dict[str, Any]:
+        position = positions.get(stock_id)
+        features = None
+        if position is not None:
+            features = {
+                indicator: _json_value(matrix[position, _INDICATOR_COLUMNS[indicator]]) for indicator in indicators
+            }
+        return {"rule_id": rule_id, "stock_id": stock_id, "matched": matched, "features": features}
+
+    def _load_baseline(self) -> pd.DataFrame:
+        rows = self.db.query(RuleFeatureBaseline.stock_id, RuleFeatureBaseline.features).all()
+        if not rows:
+            return pd.DataFrame(columns=list(RULE_INDICATORS), dtype="float64")
+        return pd.DataFrame.from_records(
+            [row.features or {} for row in rows], index=[row.stock_id for row in rows]
+        )
+
+    def _save_baseline(self, baseline: pd.DataFrame, current: pd.DataFrame, changed_rows: np.ndarray) -> int:
+        """只写入指标有变化的股票，删除已不在快照中的股票；返回变化的股票数"""
+        existing = set(baseline.index.tolist())
+        inserts, updates = [], []
+        for stock_id, values in current[changed_rows].iterrows():
+            record = {"stock_id": int(stock_id), "features": {
+                indicator: _json_value(value) for indicator, value in zip(RULE_INDICATORS, values.tolist())
+            }}
+            (updates if stock_id in existing else inserts).append(record)
+        self.db.bulk_insert_mappings(RuleFeatureBaseline, inserts)
+        self.db.bulk_update_mappings(RuleFeatureBaseline, updates)
+
+        removed = sorted(existing - set(current.index.tolist()))
+        for start in range(0, len(removed), DELETE_CHUNK):
+            self.db.query(RuleFeatureBaseline).filter(
+                RuleFeatureBaseline.stock_id.in_(removed[start:start + DELETE_CHUNK])
+            ).delete(synchronize_session=False)
+        return len(inserts) + len(updates)
+
+    def _drop_disabled(self, rule_ids: List[int]) -> None:
+        """停用或删除的规则不再维护状态，重新启用后全量评估"""
+        self.db.query(RuleMatchState).filter(~RuleMatchState.rule_id.in_(rule_ids)).delete(synchronize_session=False)
+        self.db.query(RuleEvaluationState).filter(~RuleEvaluationState.rule_id.in_(rule_ids)).delete(synchronize_session=False)
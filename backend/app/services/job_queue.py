@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from ..core.config import settings
+from ..database import SessionLocal
+from ..models.queue_job import QueueJob
+from ..crud.job_queue import enqueue_job, claim_jobs, heartbeat_jobs, complete_job, fail_job, requeue_expired_jobs
+from .leader_election import make_holder_id
+from .request_queue import Priority, request_priority
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_sync_task(payload: Dict[str, Any]) -> Any:
+    from .sync_task_manager import SyncTaskManager
+
+    db = SessionLocal()
+    try:
+        # 任务内的失败由 _execute_task 记录执行日志并按任务的重试策略重新入队
+        await SyncTaskManager(db, None)._execute_task(
+            db,
+            payload["task_id"],
+            execution_type=payload.get("execution_type", "scheduled"),
+            run_id=payload.get("run_id"),
+            attempt=payload.get("attempt", 0),
+        )
+    finally:
+        db.close()
+
+
+async def _run_analysis_task(payload: Dict[str, Any]) -> Any:
+    from .analysis_task_service import AnalysisTaskService
+
+    db = SessionLocal()
+    try:
+        task = await AnalysisTaskService(db).execute_task(payload["task_id"])
+        return {"status": task.status, "error_message": task.error_message}
+    finally:
+        db.close()
+
+
+# 作业类型 -> (队列, 执行函数)
+JOB_HANDLERS: Dict[str, Tuple[str, Callable[[Dict[str, Any]], Awaitable[Any]]]] = {
+    "sync_task": ("sync", _run_sync_task),
+    "analysis_task": ("analysis", _run_analysis_task),
+}
+
+
+def enqueue(db, job_type: str, payload: Dict[str, Any], priority: Priority = Priority.SCHEDULED,
+            delay_seconds: float = 0, dedupe_key: Optional[str] = None) -> QueueJob:
+    queue, _ = JOB_HANDLERS[job_type]
+    job = enqueue_job(db, queue, job_type, payload, priority=int(priority), delay_seconds=delay_seconds,
+                      dedupe_key=dedupe_key, max_attempts=settings.JOB_QUEUE_MAX_ATTEMPTS)
+    logger.info(f"[作业队列] 作业 ID {job.id} 已入队 {queue}: {job_type} {payload}")
+    return job
+
+
+def enqueue_sync_task(db, task_id: int, execution_type: str = "scheduled", run_id: Optional[str] = None,
+                      attempt: int = 0, delay_seconds: float = 0) -> QueueJob:
+    """同步任务入队；同一任务的定时执行仍在排队或执行时不重复入队"""
+    payload = {"task_id": task_id, "execution_type": execution_type, "run_id": run_id, "attempt": attempt}
+    priority = Priority.INTERACTIVE if execution_type == "manual" else Priority.SCHEDULED
+    dedupe_key = f"sync_task:{task_id}" if execution_type == "scheduled" else None
+    return enqueue(db, "sync_task", payload, priority=priority, delay_seconds=delay_seconds, dedupe_key=dedupe_key)
+
+
+def enqueue_analysis_task(db, task_id: int) -> QueueJob:
+    return enqueue(db, "analysis_task", {"task_id": task_id}, priority=Priority.INTERACTIVE,
+                   dedupe_key=f"analysis_task:{task_id}")
+
+
+def _run_handler(handler: Callable[[Dict[str, Any]], Awaitable[Any]], payload: Dict[str, Any], priority: Priority) -> Any:
+    """在工作线程中用独立的事件循环执行作业"""
+    with request_priority(priority):
+        return asyncio.run(handler(payload))
+
+
+class QueueWorker:
+    """作业队列工作进程 - 认领并执行作业，定期心跳
+
+    每个工作进程最多同时执行 concurrency 个作业，各队列另有跨进程的并发上限（JOB_QUEUE_CONCURRENCY）。
+    作业在独立线程（各自的事件循环）中执行：其中的同步数据库操作不会阻塞心跳，多个作业可以真正并行。
+    工作进程崩溃或失联时，其作业在可见性超时后由任一工作进程重新入队。
+    """
+
+    def __init__(self, queues: List[str], concurrency: Optional[int] = None, worker_id: Optional[str] = None):
+        self.queues = queues
+        self.concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        self.worker_id = worker_id or make_holder_id()
+        self.running: Dict[int, asyncio.Task] = {}
+        self.processed = 0
+        self._wakeup = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="queue-job")
+
+    async def run(self, stop: asyncio.Event) -> None:
+        logger.info(f"[作业队列] 工作进程 {self.worker_id} 启动，队列: {', '.join(self.queues)}, 并发: {self.concurrency}")
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        try:
+            while not stop.is_set():
+                claimed = self.poll_once()
+                if claimed:
+                    continue
+                self._wakeup.clear()
+                # 空闲或槽位已满时等待：轮询间隔到期、有作业结束或收到退出信号
+                waiters = [asyncio.ensure_future(self._wakeup.wait()), asyncio.ensure_future(stop.wait())]
+                await asyncio.wait(waiters, timeout=settings.JOB_QUEUE_POLL_INTERVAL, return_when=asyncio.FIRST_COMPLETED)
+                for waiter in waiters:
+                    waiter.cancel()
+        finally:
+            if self.running:
+                logger.info(f"[作业队列] 等待 {len(self.running)} 个执行中的作业结束...")
+                await asyncio.gather(*self.running.values(), return_exceptions=True)
+            heartbeat.cancel()
+            self._executor.shutdown(wait=False)
+            logger.info(f"[作业队列] 工作进程 {self.worker_id} 退出，共处理 {self.processed} 个作业")
+
+    def poll_once(self) -> int:
+        """回收失联作业并按空闲槽位认领，返回本次认领的作业数"""
+        db = SessionLocal()
+        try:
+            requeued = requeue_expired_jobs(db, settings.JOB_QUEUE_VISIBILITY_TIMEOUT)
+            if requeued:
+                logger.warning(f"[作业队列] ⚠ 回收 {requeued} 个超时未心跳的作业")
+
+            claimed = 0
+            for queue in self.queues:
+                free = self.concurrency - len(self.running)
+                if free <= 0:
+                    break
+                jobs = claim_jobs(db, queue, self.worker_id, free, settings.JOB_QUEUE_CONCURRENCY.get(queue))
+                for job in jobs:
+                    self.running[job.id] = asyncio.create_task(self._execute(job.id, job.job_type, dict(job.payload or {}), job.priority))
+                claimed += len(jobs)
+            return claimed
+        except Exception as e:
+            db.rollback()
+            logger.error(f"[作业队列] ✗ 认领作业失败: {str(e)}")
+            return 0
+        finally:
+            db.close()
+
+    async def _execute(self, job_id: int, job_type: str, payload: Dict[str, Any], priority: int) -> None:
+        started = time.perf_counter()
+        logger.info(f"[作业队列] 开始执行作业 ID {job_id}: {job_type} {payload}")
+        db = SessionLocal()
+        try:
+            _, handler = JOB_HANDLERS[job_type]
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, _run_handler, handler, payload, Priority(priority))
+            if not complete_job(db, job_id, self.worker_id, result=result):
+                logger.warning(f"[作业队列] ⚠ 作业 ID {job_id} 已被重新分配，忽略本次结果")
+            else:
+                logger.info(f"[作业队列] ✓ 作业 ID {job_id} 完成，耗时 {time.perf_counter() - started:.1f}s")
+        except Exception as e:
+            db.rollback()
+            job = db.query(QueueJob).filter(QueueJob.id == job_id).first()
+            attempts = job.attempts if job else 1
+            status = fail_job(db, job_id, self.worker_id, str(e), retry_delay=min(300, 10 * 2 ** (attempts - 1)))
+            logger.error(f"[作业队列] ✗ 作业 ID {job_id} 执行失败（{status}）: {str(e)}")
+        finally:
+            db.close()
+            self.running.pop(job_id, None)
+            self.processed += 1
+            self._wakeup.set()
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_QUEUE_HEARTBEAT_INTERVAL)
+            job_ids = list(self.running)
+            if not job_ids:
+                continue
+            db = SessionLocal()
+            try:
+                alive = heartbeat_jobs(db, self.worker_id, job_ids)
+                if alive < len(job_ids):
+                    logger.warning(f"[作业队列] ⚠ {len(job_ids) - alive} 个作业已不再由本进程持有")
+            except Exception as e:
+                db.rollback()
+                logger.error(f"[作业队列] ✗ 心跳失败: {str(e)}")
+            finally:
+                db.close()
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models.stock_daily import StockDaily
+from ..core.config import settings
+from .change_feed import change_feed, ChangeEvent
+from .trading_calendar import trading_calendar
+from .request_queue import Priority, request_priority
+
+logger = logging.getLogger(__name__)
+
+
+def expected_latest_trade_date(now: Optional[datetime] = None) -> date:
+    """最近一个应有日线的交易日：优先使用已加载的交易日历，否则按工作日估算（16 点收盘数据发布后算当天）"""
+    now = now or datetime.now()
+    if trading_calendar.covers(now.date(), now.date()):
+        latest = trading_calendar.latest_trading_day(now)
+        if latest:
+            return latest
+    day = now.date() if now.hour >= 16 else now.date() - timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+class KlineLoader:
+    """按需加载 K 线 - 每个代码单飞合并、在线程池中同步、缓存数据水位，过期数据先返回再后台刷新"""
+
+    def __init__(self, watermark_ttl: int = None, refresh_interval: int = None):
+        self.watermark_ttl = watermark_ttl if watermark_ttl is not None else settings.KLINE_WATERMARK_TTL
+        self.refresh_interval = refresh_interval if refresh_interval is not None else settings.KLINE_REFRESH_INTERVAL
+        # ts_code -> (最新交易日, 检查时间)
+        self._watermarks: Dict[str, Tuple[Optional[date], float]] = {}
+        self._last_refresh: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        change_feed.subscribe(self._on_change, tables=["stock_daily"])
+
+    def _on_change(self, event: ChangeEvent) -> None:
+        """任意入库路径写入日线后直接推进水位，无需再查库"""
+        now = time.monotonic()
+        for ts_code, kinds in event.changes.items():
+            latest = max(kinds["insert"] | kinds["update"])
+            current = self._watermarks.get(ts_code, (None, 0))[0]
+            if current is None or latest > current:
+                self._watermarks[ts_code] = (latest, now)
+
+    def get_watermark(self, db: Session, ts_code: str) -> Optional[date]:
+        """该代码已入库的最新交易日，短时间内复用缓存结果"""
+        cached = self._watermarks.get(ts_code)
+        if cached and time.monotonic() - cached[1] < self.watermark_ttl:
+            return cached[0]
+        watermark = db.query(func.max(StockDaily.trade_date)).filter(StockDaily.ts_code == ts_code).scalar()
+        self._watermarks[ts_code] = (watermark, time.monotonic())
+        return watermark
+
+    def _recently_refreshed(self, ts_code: str) -> bool:
+        last_refresh = self._last_refresh.get(ts_code)
+        return last_refresh is not None and time.monotonic() - last_refresh < self.refresh_interval
+
+    def _should_refresh(self, ts_code: str, watermark: date) -> bool:
+        if watermark >= expected_latest_trade_date():
+            return False
+        # 节假日等情况下水位会一直落后，限制刷新频率
+        return not self._recently_refreshed(ts_code)
+
+    async def ensure_loaded(self, db: Session, ts_code: str) -> None:
+        """无数据时等待首次加载；数据过期时立即返回，后台刷新"""
+        watermark = self.get_watermark(db, ts_code)
+        if watermark is None:
+            inflight = self._inflight.get(ts_code)
+            # 刷新间隔内拉取过仍无数据（未知代码或尚无日线）时直接返回，不再占用上游调用和交互请求槽位
+            if (inflight is None or inflight.done()) and self._recently_refreshed(ts_code):
+                return
+            await self.refresh(ts_code)
+        elif self._should_refresh(ts_code, watermark):
+            logger.info(f"[K线加载] {ts_code} 数据截至 {watermark}，后台刷新")
+            self._start_refresh(ts_code)
+
+    async def refresh(self, ts_code: str) -> None:
+        """同步指定代码的日线；同一代码并发请求只触发一次同步"""
+        await asyncio.shield(self._start_refresh(ts_code))
+
+    def _start_refresh(self, ts_code: str) -> asyncio.Task:
+        task = self._inflight.get(ts_code)
+        if task is not None and not task.done():
+            return task
+
+        self._last_refresh[ts_code] = time.monotonic()
+        loop = asyncio.get_running_loop()
+        task = loop.create_task(self._run_refresh(ts_code))
+        self._inflight[ts_code] = task
+        task.add_done_callback(lambda finished: self._on_refresh_done(ts_code, finished))
+        return task
+
+    def _on_refresh_done(self, ts_code: str, task: asyncio.Task) -> None:
+        if self._inflight.get(ts_code) is task:
+            del self._inflight[ts_code]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"[K线加载] ✗ {ts_code} 同步失败: {str(task.exception())}")
+
+    async def _run_refresh(self, ts_code: str) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._load_blocking, ts_code)
+
+    def _load_blocking(self, ts_code: str) -> None:
+        """在线程池中执行，使用独立会话"""
+        from ..database import SessionLocal
+        from .data_sync_service import DataSyncService
+
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            with request_priority(Priority.INTERACTIVE):
+                DataSyncService(db).sync_stock_trading_data(ts_code)
+            watermark = db.query(func.max(StockDaily.trade_date)).filter(StockDaily.ts_code == ts_code).scalar()
+            self._watermarks[ts_code] = (watermark, time.monotonic())
+        finally:
+            db.close()
+        logger.info(f"[K线加载] ✓ {ts_code} 同步完成，耗时 {time.perf_counter() - started:.2f}s")
+
+
+kline_loader = KlineLoader()
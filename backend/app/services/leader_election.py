@@ -0,0 +1,66 @@
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import case, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..models.scheduler_lease import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+
+def make_holder_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class LeaderElector:
+    """基于数据库租约的选主：条件更新保证同一时刻只有一个持有者，leader 停止续约后租约过期即可被接管"""
+
+    def __init__(self, name: str, ttl_seconds: int, holder: Optional[str] = None):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.holder = holder or make_holder_id()
+
+    def try_acquire(self, db: Session) -> bool:
+        """续约或接管已过期的租约，返回当前进程是否为 leader"""
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+        try:
+            updated = db.query(SchedulerLease).filter(
+                SchedulerLease.name == self.name,
+                or_(SchedulerLease.holder == self.holder, SchedulerLease.expires_at < now)
+            ).update({
+                "acquired_at": case((SchedulerLease.holder == self.holder, SchedulerLease.acquired_at), else_=now),
+                "holder": self.holder,
+                "renewed_at": now,
+                "expires_at": expires_at,
+            }, synchronize_session=False)
+            if updated:
+                db.commit()
+                return True
+
+            if db.query(SchedulerLease.name).filter(SchedulerLease.name == self.name).first():
+                db.rollback()
+                return False
+
+            db.add(SchedulerLease(name=self.name, holder=self.holder, acquired_at=now, renewed_at=now, expires_at=expires_at))
+            db.commit()
+            return True
+        except IntegrityError:
+            # 其他进程同时插入了租约
+            db.rollback()
+            return False
+
+    def release(self, db: Session) -> None:
+        """主动释放租约（把到期时间置为过去），其他进程下一次检查即可接管"""
+        db.query(SchedulerLease).filter(
+            SchedulerLease.name == self.name,
+            SchedulerLease.holder == self.holder
+        ).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)}, synchronize_session=False)
+        db.commit()
+
+    def current(self, db: Session) -> Optional[SchedulerLease]:
+        return db.query(SchedulerLease).filter(SchedulerLease.name == self.name).first()
@@ -0,0 +1,296 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+from ..core.config import settings
+from .sync_telemetry import current_telemetry
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """请求优先级，数值越小越优先"""
+    INTERACTIVE = 0  # 用户触发：手动同步、按需加载 K 线、手动执行任务
+    SCHEDULED = 1    # 定时任务及其重试
+    BATCH = 2        # 全市场回填等大批量任务
+
+
+_current_priority: ContextVar[Priority] = ContextVar("request_priority", default=Priority.SCHEDULED)
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """在当前上下文中设置上游请求优先级（线程池中执行的代码需要在线程内重新设置）"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _current_priority.get()
+
+
+class _Waiter:
+    """排队中的请求，grant 由释放槽位的线程调用"""
+
+    def __init__(self, priority: Priority, grant: Callable[[], None]):
+        self.priority = priority
+        self.grant = grant
+        self.granted = False
+        self.cancelled = False
+
+
+class _SharedCall:
+    """进行中的上游请求，相同 (接口, 参数) 的调用共享结果"""
+
+    def __init__(self):
+        self.future: Future = Future()
+        self.waiter: Optional[_Waiter] = None
+        self.followers = 0
+
+
+class RequestQueue:
+    """上游请求优先级队列 + 相同请求合并
+
+    同时在途的上游请求数不超过 max_concurrent，其中 reserved_interactive 个槽位只留给交互请求；
+    槽位释放时总是先唤醒优先级最高的等待者，因此交互请求不会被大批量任务饿死。
+    线程安全，协程和线程池中的阻塞调用共用同一组槽位。
+    """
+
+    def __init__(self, max_concurrent: int, reserved_interactive: int = 1):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.reserved_interactive = min(max(0, int(reserved_interactive)), self.max_concurrent - 1)
+        self.active = 0
+        self.coalesced = 0
+        self.completed: Dict[str, int] = {priority.name.lower(): 0 for priority in Priority}
+        self._heap: List[Tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._inflight: Dict[Hashable, _SharedCall] = {}
+        self._lock = threading.Lock()
+
+    def _can_start(self, priority: Priority) -> bool:
+        if priority == Priority.INTERACTIVE:
+            return self.active < self.max_concurrent
+        return self.active < self.max_concurrent - self.reserved_interactive
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        heapq.heappush(self._heap, (int(waiter.priority), next(self._sequence), waiter))
+
+    def _try_start(self, priority: Priority) -> bool:
+        """没有更高或同级的请求在排队且有空闲槽位时直接占用（调用方持有锁）"""
+        queued_ahead = any(not waiter.granted and not waiter.cancelled and waiter.priority <= priority for _, _, waiter in self._heap)
+        if not queued_ahead and self._can_start(priority):
+            self.active += 1
+            return True
+        return False
+
+    def _dispatch(self) -> None:
+        """按优先级把空闲槽位分配给等待者（调用方持有锁）"""
+        while self._heap:
+            _, _, waiter = self._heap[0]
+            if waiter.granted or waiter.cancelled:
+                heapq.heappop(self._heap)
+                continue
+            if not self._can_start(waiter.priority):
+                return
+            heapq.heappop(self._heap)
+            waiter.granted = True
+            self.active += 1
+            waiter.grant()
+
+    def _release(self, priority: Priority) -> None:
+        with self._lock:
+            self.active -= 1
+            self.completed[priority.name.lower()] += 1
+            self._dispatch()
+
+    def _promote(self, waiter: Optional[_Waiter], priority: Priority) -> None:
+        """合并进来的请求优先级更高时，提升仍在排队的原请求（调用方持有锁）"""
+        if waiter is None or waiter.granted or waiter.cancelled or priority >= waiter.priority:
+            return
+        waiter.priority = priority
+        self._enqueue(waiter)
+        self._dispatch()
+
+    async def _acquire(self, priority: Priority, shared: Optional[_SharedCall] = None) -> Priority:
+        """等待槽位，返回最终占用槽位时的优先级（排队期间可能被提升）"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def grant() -> None:
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        with self._lock:
+            if self._try_start(priority):
+                return priority
+            waiter = _Waiter(priority, grant)
+            if shared is not None:
+                shared.waiter = waiter
+            self._enqueue(waiter)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                waiter.cancelled = True
+            if granted:
+                self._release(waiter.priority)
+            raise
+        return waiter.priority
+
+    def _acquire_sync(self, priority: Priority, shared: Optional[_SharedCall] = None) -> Priority:
+        event = threading.Event()
+        with self._lock:
+            if self._try_start(priority):
+                return priority
+            waiter = _Waiter(priority, event.set)
+            if shared is not None:
+                shared.waiter = waiter
+            self._enqueue(waiter)
+        event.wait()
+        return waiter.priority
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[Priority] = None):
+        """占用一个上游请求槽位"""
+        priority = await self._acquire(current_priority() if priority is None else priority)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]], priority: Optional[Priority] = None) -> Any:
+        """按优先级执行协程请求；相同 key 的请求正在进行时直接等待其结果"""
+        priority = current_priority() if priority is None else priority
+        shared, leader = self._join(key, priority)
+        if not leader:
+            logger.debug(f"[请求队列] 合并相同请求: {key}")
+            with _coalesced_telemetry():
+                return _copy_result(await asyncio.shield(asyncio.wrap_future(shared.future)))
+
+        try:
+            granted_priority = await self._acquire(priority, shared)
+            try:
+                result = await call()
+            finally:
+                self._release(granted_priority)
+        except BaseException as e:
+            self._finish(key, shared, error=e)
+            raise
+        self._finish(key, shared, result=result)
+        return result
+
+    def run_sync(self, key: Hashable, call: Callable[[], Any], priority: Optional[Priority] = None) -> Any:
+        """run 的阻塞版本，供线程池中的同步调用使用"""
+        if _on_event_loop():
+            # 在事件循环线程里阻塞等待会卡住持有槽位的协程，这里直接执行
+            logger.warning(f"[请求队列] ⚠ 在事件循环线程中发起阻塞请求，跳过排队: {key}")
+            return call()
+
+        priority = current_priority() if priority is None else priority
+        shared, leader = self._join(key, priority)
+        if not leader:
+            logger.debug(f"[请求队列] 合并相同请求: {key}")
+            with _coalesced_telemetry():
+                return _copy_result(shared.future.result())
+
+        try:
+            granted_priority = self._acquire_sync(priority, shared)
+            try:
+                result = call()
+            finally:
+                self._release(granted_priority)
+        except BaseException as e:
+            self._finish(key, shared, error=e)
+            raise
+        self._finish(key, shared, result=result)
+        return result
+
+    def _join(self, key: Hashable, priority: Priority) -> Tuple[_SharedCall, bool]:
+        """登记请求，返回 (共享调用, 是否由本调用方负责执行)"""
+        with self._lock:
+            shared = self._inflight.get(key)
+            if shared is None:
+                shared = _SharedCall()
+                self._inflight[key] = shared
+                return shared, True
+            shared.followers += 1
+            self.coalesced += 1
+            self._promote(shared.waiter, priority)
+            return shared, False
+
+    def _finish(self, key: Hashable, shared: _SharedCall, result: Any = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if self._inflight.get(key) is shared:
+                del self._inflight[key]
+        if error is None:
+            shared.future.set_result(result)
+        elif isinstance(error, Exception):
+            shared.future.set_exception(error)
+        else:
+            shared.future.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waiting: Dict[str, int] = {priority.name.lower(): 0 for priority in Priority}
+            for _, _, waiter in self._heap:
+                if not waiter.granted and not waiter.cancelled:
+                    waiting[waiter.priority.name.lower()] += 1
+            return {
+                "max_concurrent": self.max_concurrent,
+                "reserved_interactive": self.reserved_interactive,
+                "active": self.active,
+                "waiting": waiting,
+                "inflight": len(self._inflight),
+                "coalesced": self.coalesced,
+                "completed": dict(self.completed),
+            }
+
+
+@contextmanager
+def _coalesced_telemetry() -> Iterator[None]:
+    """合并进来的调用方也在自己的执行统计中记一次调用，否则只有发起请求的任务计数"""
+    telemetry = current_telemetry()
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        if telemetry:
+            telemetry.record_coalesced(time.perf_counter() - started, success=False)
+        raise
+    if telemetry:
+        telemetry.record_coalesced(time.perf_counter() - started)
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def _copy_result(result: Any) -> Any:
+    """合并的调用方各自拿到一份列表，避免互相修改"""
+    return list(result) if isinstance(result, list) else result
+
+
+def make_request_key(namespace: str, endpoint: str, params: Dict[str, Any]) -> Tuple[Any, ...]:
+    """(命名空间, 接口, 规范化参数) 作为合并键，参数顺序和空值不影响"""
+    normalized = tuple(sorted(
+        (str(key), str(value)) for key, value in params.items() if value is not None and value != ""
+    ))
+    return namespace, endpoint, normalized
+
+
+request_queue = RequestQueue(settings.SYNC_MAX_CONCURRENT_REQUESTS, settings.SYNC_INTERACTIVE_RESERVED_SLOTS)
@@ -1,76 +1,262 @@
 from sqlalchemy.orm import Session
 from ..models.analysis_rule import AnalysisRule
-from typing import Dict, Any, List
+from ..crud.analysis_result import save_rule_runs
+from ..models.stock import Stock
+from .feature_snapshot import load_feature_snapshot, snapshot_records
+from typing import Dict, Any, List, Callable, Iterable, Optional, Tuple
 from datetime import datetime
+from functools import lru_cache
+import hashlib
+import json
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# 规则可用的指标，特征矩阵按此顺序一列一个指标
+RULE_INDICATORS = ("price", "change", "volume", "ma20", "pe", "pb", "roe", "eps", "dividend_yield")
+
+def _not_equal(values: np.ndarray, threshold: float) -> np.ndarray:
+    # NaN != x 为 True，缺失指标不能因此命中
+    return np.not_equal(values, threshold) & ~np.isnan(values)
+
+
+# 缺失的指标为 NaN，与任何阈值比较（包括 neq）都不命中
+RULE_OPERATORS: Dict[str, Callable[[np.ndarray, float], np.ndarray]] = {
+    "gt": np.greater,
+    "lt": np.less,
+    "gte": np.greater_equal,
+    "lte": np.less_equal,
+    "eq": np.equal,
+    "neq": _not_equal,
+}
+
+_INDICATOR_COLUMNS = {indicator: index for index, indicator in enumerate(RULE_INDICATORS)}
+
+RuleMask = Callable[[np.ndarray], np.ndarray]
+
+
+# 谓词: (特征矩阵列, 运算符名, 阈值)
+Predicate = Tuple[int, str, float]
+
+
+def _parse_conditions(conditions: Dict[str, Any]) -> Tuple[str, List[Predicate]]:
+    """解析并校验规则条件，返回 (逻辑, 谓词列表)"""
+    if not isinstance(conditions, dict):
+        raise ValueError("conditions must be an object")
+    logic = conditions.get("logic", "AND")
+    if logic not in ("AND", "OR"):
+        raise ValueError(f"Unsupported logic operator: {logic}")
+
+    items = conditions.get("conditions", [])
+    if not isinstance(items, list):
+        raise ValueError("conditions must be a list")
+
+    predicates: List[Predicate] = []
+    for condition in items:
+        if not isinstance(condition, dict):
+            raise ValueError(f"Invalid condition: {condition}")
+        indicator = condition.get("indicator")
+        operator = condition.get("operator")
+        if indicator not in _INDICATOR_COLUMNS:
+            raise ValueError(f"Unsupported indicator: {indicator}")
+        if operator not in RULE_OPERATORS:
+            raise ValueError(f"Unsupported operator: {operator}")
+        value = condition.get("value")
+        try:
+            threshold = float(value)
+        except (TypeError, ValueError):
+            threshold = float("nan")
+        # 阈值须为数值；NaN 与任何指标比较都不命中，同样视为不合法
+        if isinstance(value, bool) or np.isnan(threshold):
+            raise ValueError(f"Invalid value for {indicator}: {value}")
+        predicates.append((_INDICATOR_COLUMNS[indicator], operator, threshold))
+    return logic, predicates
+
+
+def validate_conditions(conditions: Optional[Dict[str, Any]]) -> None:
+    """校验规则条件，不合法时抛出 ValueError（创建/修改规则时调用）"""
+    _parse_conditions(conditions or {})
+
+
+def _compile_conditions(conditions: Dict[str, Any]) -> RuleMask:
+    """把规则条件编译为 (特征矩阵 -> 布尔掩码) 函数，指标/运算符/逻辑在编译时校验"""
+    logic, predicates = _parse_conditions(conditions)
+    compiled = [(column, RULE_OPERATORS[operator], value) for column, operator, value in predicates]
+    combine = np.logical_and if logic == "AND" else np.logical_or
+
+    def mask(matrix: np.ndarray) -> np.ndarray:
+        # 没有条件时与 all([]) / any([]) 一致：AND 全部命中，OR 全不命中
+        result = np.full(matrix.shape[0], logic == "AND")
+        for column, compare, value in compiled:
+            combine(result, compare(matrix[:, column], value), out=result)
+        return result
+
+    return mask
+
+
+class RuleSetPlan:
+    """规则集求值计划 - 把多条规则编译成共享公共子表达式的 DAG
+
+    三层节点自底向上：
+        指标列      多条规则引用的同一指标只从特征矩阵取一次
+        谓词        (指标, 运算符, 阈值) 相同的条件只计算一次布尔掩码
+        表达式      谓词集合和逻辑相同的规则（AND/OR 与条件顺序、重复无关）只组合一次
+    每次求值的代价与不同谓词/表达式的数量成正比，与规则数（用户数）无关，最后把表达式结果分发给各规则。
+    条件不合法的规则（如库中残留的旧数据）不参与求值、全不命中，记录在 invalid 中，不影响其他规则。
+    """
+
+    def __init__(self, conditions_list: Iterable[Dict[str, Any]]):
+        predicate_index: Dict[Predicate, int] = {}
+        expression_index: Dict[Tuple[str, Tuple[int, ...]], int] = {}
+        self.predicates: List[Predicate] = []
+        self.expressions: List[Tuple[str, Tuple[int, ...]]] = []
+        # 第 i 条规则对应的表达式
+        self.rule_expressions: List[int] = []
+        # 条件不合法的规则: 编译顺序 -> 错误信息
+        self.invalid: Dict[int, str] = {}
+
+        for position, conditions in enumerate(conditions_list):
+            try:
+                logic, predicates = _parse_conditions(conditions)
+            except ValueError as e:
+                self.invalid[position] = str(e)
+                # 没有谓词的 OR 表达式全不命中
+                logic, predicates = "OR", []
+            node_ids = set()
+            for predicate in predicates:
+                if predicate not in predicate_index:
+                    predicate_index[predicate] = len(self.predicates)
+                    self.predicates.append(predicate)
+                node_ids.add(predicate_index[predicate])
+            # 单个谓词时 AND 与 OR 等价
+            expression = ("AND" if len(node_ids) == 1 else logic, tuple(sorted(node_ids)))
+            if expression not in expression_index:
+                expression_index[expression] = len(self.expressions)
+                self.expressions.append(expression)
+            self.rule_expressions.append(expression_index[expression])
+
+        self.columns = sorted({column for column, _, _ in self.predicates})
+
+    def evaluate(self, matrix: np.ndarray) -> List[np.ndarray]:
+        """返回每条规则（按编译顺序）的布尔掩码；表达式相同的规则共享同一数组，调用方不应原地修改"""
+        columns = {column: np.ascontiguousarray(matrix[:, column]) for column in self.columns}
+        predicate_masks = [
+            RULE_OPERATORS[operator](columns[column], value) for column, operator, value in self.predicates
+        ]
+
+        expression_masks = []
+        for logic, node_ids in self.expressions:
+            if not node_ids:
+                expression_masks.append(np.full(matrix.shape[0], logic == "AND"))
+            elif len(node_ids) == 1:
+                expression_masks.append(predicate_masks[node_ids[0]])
+            else:
+                combine = np.logical_and if logic == "AND" else np.logical_or
+                result = combine(predicate_masks[node_ids[0]], predicate_masks[node_ids[1]])
+                for node_id in node_ids[2:]:
+                    combine(result, predicate_masks[node_id], out=result)
+                expression_masks.append(result)
+
+        return [expression_masks[expression] for expression in self.rule_expressions]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "rules": len(self.rule_expressions),
+            "expressions": len(self.expressions),
+            "predicates": len(self.predicates),
+            "indicators": len(self.columns),
+            "invalid": len(self.invalid),
+        }
+
+
+@lru_cache(maxsize=1024)
+def _compile_cached(conditions_json: str) -> RuleMask:
+    return _compile_conditions(json.loads(conditions_json))
+
+
+def _conditions_key(conditions: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(conditions or {}, sort_keys=True)
+
+
+def compile_rule(rule: AnalysisRule) -> RuleMask:
+    """按条件内容缓存编译结果，规则修改后条件变化会重新编译"""
+    return _compile_cached(_conditions_key(rule.conditions))
+
+
+@lru_cache(maxsize=64)
+def _compile_rule_set_cached(conditions_keys: Tuple[str, ...]) -> RuleSetPlan:
+    return RuleSetPlan(json.loads(key) for key in conditions_keys)
+
+
+def compile_rule_set(rules: Iterable[AnalysisRule]) -> RuleSetPlan:
+    """把一组规则编译为共享子表达式的求值计划，按各规则条件内容缓存；条件不合法的规则跳过并告警"""
+    rules = list(rules)
+    plan = _compile_rule_set_cached(tuple(_conditions_key(rule.conditions) for rule in rules))
+    for position, error in plan.invalid.items():
+        logger.warning(f"[规则引擎] ⚠ 规则 ID {rules[position].id} 条件不合法，已跳过: {error}")
+    return plan
+
+
+def conditions_fingerprint(conditions: Optional[Dict[str, Any]]) -> str:
+    """规则条件指纹，条件内容不变则指纹不变"""
+    return hashlib.sha1(_conditions_key(conditions).encode("utf-8")).hexdigest()
+
+
+def rule_indicators(conditions: Optional[Dict[str, Any]]) -> Tuple[str, ...]:
+    """规则依赖的指标，按 RULE_INDICATORS 顺序去重"""
+    items = conditions.get("conditions") if isinstance(conditions, dict) else None
+    used = {condition.get("indicator") for condition in items or [] if isinstance(condition, dict)}
+    return tuple(indicator for indicator in RULE_INDICATORS if indicator in used)
+
+
+def build_feature_matrix(records: Iterable[Dict[str, Any]], id_key: str = "id") -> pd.DataFrame:
+    """由每只股票一个字典的记录构造特征矩阵：行索引为股票 ID，列为 RULE_INDICATORS，缺失值为 NaN"""
+    frame = pd.DataFrame.from_records(list(records))
+    if frame.empty:
+        return pd.DataFrame(columns=list(RULE_INDICATORS), dtype="float64")
+    frame = frame.set_index(id_key)
+    features = frame.reindex(columns=list(RULE_INDICATORS))
+    return features.apply(pd.to_numeric, errors="coerce").astype("float64")
 
 
 class RuleEngine:
     def __init__(self, db_session: Session):
         self.db = db_session
-        
+
     def evaluate_rule(self, rule: AnalysisRule, stock_code: str, data: Dict[str, Any]) -> bool:
         """
-        评估单条规则
+        评估单条规则（单只股票）
         """
-        conditions = rule.conditions.get("conditions", [])
-        logic = rule.conditions.get("logic", "AND")
-        
-        results = []
-        for condition in conditions:
-            result = self._evaluate_condition(condition, stock_code, data)
-            results.append(result)
-            
-        if logic == "AND":
-            return all(results)
-        elif logic == "OR":
-            return any(results)
-        else:
-            raise ValueError(f"Unsupported logic operator: {logic}")
-            
-    def _evaluate_condition(self, condition: Dict[str, Any], stock_code: str, data: Dict[str, Any]) -> bool:
-        """
-        评估单个条件
+        matrix = build_feature_matrix([{"id": stock_code, **data}]).to_numpy()
+        return bool(compile_rule(rule)(matrix)[0])
+
+    def evaluate_rules(self, rules: List[AnalysisRule], features: pd.DataFrame) -> Dict[int, List[Any]]:
         """
-        indicator = condition.get("indicator")
-        operator = condition.get("operator")
-        value = condition.get("value")
-        
-        if indicator == "price":
-            return self._compare(data.get("price", 0), operator, value)
-        elif indicator == "volume":
-            return self._compare(data.get("volume", 0), operator, value)
-        elif indicator == "ma20":
-            return self._compare(data.get("ma20", 0), operator, value)
-        elif indicator == "pe":
-            return self._compare(data.get("pe", 0), operator, value)
-        elif indicator == "roe":
-            return self._compare(data.get("roe", 0), operator, value)
-        elif indicator == "eps":
-            return self._compare(data.get("eps", 0), operator, value)
-        elif indicator == "dividend_yield":
-            return self._compare(data.get("dividend_yield", 0), operator, value)
-        else:
-            raise ValueError(f"Unsupported indicator: {indicator}")
-            
-    def _compare(self, a: float, operator: str, b: float) -> bool:
-        """
-        比较操作
-        """
-        if operator == "gt":
-            return a > b
-        elif operator == "lt":
-            return a < b
-        elif operator == "gte":
-            return a >= b
-        elif operator == "lte":
-            return a <= b
-        elif operator == "eq":
-            return a == b
-        elif operator == "neq":
-            return a != b
-        else:
-            raise ValueError(f"Unsupported operator: {operator}")
-            
+        对全市场特征矩阵一次性评估多条规则（相同的指标/条件只计算一次），返回 规则 ID -> 命中的股票 ID 列表
+        """
+        matrix = features.reindex(columns=list(RULE_INDICATORS)).to_numpy(dtype="float64")
+        stock_ids = features.index.to_numpy()
+        masks = compile_rule_set(rules).evaluate(matrix)
+        return {rule.id: stock_ids[mask].tolist() for rule, mask in zip(rules, masks)}
+
+    def evaluate_enabled_rules(self, features: Optional[pd.DataFrame] = None) -> Dict[int, List[Any]]:
+        """
+        用所有启用的规则筛选特征矩阵，未指定时加载全市场特征快照
+        """
+        if features is None:
+            features = load_feature_snapshot(self.db)
+        return self.evaluate_rules(self.get_enabled_rules(), features)
+
+    def evaluate_incremental(self, features: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+        """
+        增量评估启用的规则：只重新评估依赖指标有变化的股票，保存命中状态的变化
+        """
+        from .incremental_rule_engine import IncrementalRuleEvaluator
+        return IncrementalRuleEvaluator(self.db).run(features)
+
     def get_enabled_rules(self) -> List[AnalysisRule]:
         """
         获取所有启用的规则
@@ -79,45 +265,34 @@ class RuleEngine:
         
     def get_stocks_to_analyze(self) -> List[Dict[str, Any]]:
         """
-        获取需要分析的股票数据
+        获取需要分析的股票（全部上市股票）
         """
-        # 这里可以根据需要获取需要分析的股票列表
-        # 目前简单返回所有股票
-        from models import Stock
-        stocks = self.db.query(Stock).all()
-        return [{"id": stock.id, "code": stock.code} for stock in stocks]
-        
+        stocks = self.db.query(Stock.id, Stock.ts_code, Stock.name).filter(Stock.list_status == "L").all()
+        return [{"id": stock.id, "ts_code": stock.ts_code, "name": stock.name} for stock in stocks]
+
     def get_stock_analysis_data(self, stock_id: int) -> Dict[str, Any]:
         """
-        获取股票分析数据
+        获取股票分析数据（特征快照中的一行，缺失指标为 None）
         """
-        # 这里应该从数据库或API获取股票数据
-        # 目前返回模拟数据
-        return {
-            "price": 100.50,
-            "volume": 1000000,
-            "ma20": 98.20,
-            "pe": 15.5,
-            "roe": 12.3,
-            "eps": 6.5,
-            "dividend_yield": 2.5
-        }
-        
+        records = snapshot_records(load_feature_snapshot(self.db, stock_ids=[stock_id]))
+        return {key: value for key, value in records[0].items() if key in RULE_INDICATORS}
+
     def save_analysis_results(self, results: List[Dict[str, Any]]):
         """
-        保存分析结果
+        保存分析结果：按规则合并命中的股票，每条规则一行批量写入（未命中的结果不保存）
         """
-        # 这里应该保存分析结果到数据库
-        from models import AnalysisResult
+        matches: Dict[int, List[Any]] = {}
         for result in results:
-            db_result = AnalysisResult(
-                rule_id=result["rule_id"],
-                stock_id=result["stock_id"],
-                timestamp=result["timestamp"],
-                data=result["data"],
-                matched=result.get("matched", True)
-            )
-            self.db.add(db_result)
+            stock_ids = matches.setdefault(result["rule_id"], [])
+            if result.get("matched", True):
+                stock_ids.append(result["stock_id"])
+        self.save_rule_matches(matches)
+
+    def save_rule_matches(self, matches: Dict[int, List[Any]], run_at: Optional[datetime] = None):
+        """
+        保存 evaluate_rules 的结果（规则 ID -> 命中的股票 ID 列表）
+        """
+        save_rule_runs(self.db, matches, source="rule_engine", run_at=run_at)
         self.db.commit()
         
     def send_analysis_notifications(self, results: List[Dict[str, Any]]):
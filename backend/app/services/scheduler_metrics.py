@@ -0,0 +1,329 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+from apscheduler.events import (
+    EVENT_JOB_SUBMITTED, EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED, EVENT_JOB_MAX_INSTANCES
+)
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.scheduler_job_run import SchedulerJobRun
+from .sync_telemetry import percentile
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_METRIC_EVENTS = (
+    EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES
+)
+
+# 计算合并次数时最多向后数的触发次数
+MAX_COALESCE_COUNT = 1000
+
+# 运行记录在内存中缓冲，由后台线程按间隔批量写入（秒）
+FLUSH_INTERVAL = 5
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """运行记录统一按 UTC 存储（不带时区），与服务器本地时区和调度器时区无关"""
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value else None
+
+
+class SchedulerMetrics:
+    """调度器运行指标 - 监听 APScheduler 事件，记录每次触发的延迟、排队、耗时及错过/重叠/合并
+
+    作业函数经 instrument 包装后在真正开始执行时打点，因此能区分执行器排队时间与运行耗时。
+    每次运行记录先放入内存缓冲，由后台线程批量写入 scheduler_job_runs 表（监听器运行在事件循环上，不做数据库写入）；
+    进程内另维护执行器排队/运行中数量的实时值。
+    """
+
+    def __init__(self, scheduler: Any, holder: Optional[str] = None):
+        self.scheduler = scheduler
+        self.holder = holder
+        self.queued = 0
+        self.running = 0
+        self.peak_queued = 0
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._last_scheduled: Dict[str, datetime] = {}
+        self._pruned_at = 0.0
+        self._lock = threading.Lock()
+        self._buffer: List[Dict[str, Any]] = []
+        self._buffer_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        scheduler.add_listener(self._on_event, SCHEDULER_METRIC_EVENTS)
+
+    def instrument(self, job_id: str, func: Callable) -> Callable:
+        """包装作业函数，在执行器真正开始执行时记录开始时间"""
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                self._mark_started(job_id)
+                return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self._mark_started(job_id)
+            return func(*args, **kwargs)
+        return wrapper
+
+    def _now(self) -> datetime:
+        return datetime.now(self.scheduler.timezone)
+
+    def _mark_started(self, job_id: str) -> None:
+        with self._lock:
+            pending = self._pending.get(job_id)
+            if pending is None or "started" in pending:
+                # 手动触发等不经过调度器提交的执行不计入
+                return
+            pending["started"] = self._now()
+            self.queued -= 1
+            self.running += 1
+
+    def _on_event(self, event: Any) -> None:
+        try:
+            if event.code == EVENT_JOB_SUBMITTED:
+                self._on_submitted(event.job_id, event.scheduled_run_times)
+            elif event.code in (EVENT_JOB_EXECUTED, EVENT_JOB_ERROR):
+                self._on_finished(event.job_id, event.scheduled_run_time, event.exception)
+            elif event.code == EVENT_JOB_MISSED:
+                self._on_missed(event.job_id, event.scheduled_run_time)
+            elif event.code == EVENT_JOB_MAX_INSTANCES:
+                # 上一次运行尚未结束，本次触发被跳过
+                for run_time in event.scheduled_run_times:
+                    self._last_scheduled[event.job_id] = run_time
+                    self._record(event.job_id, "skipped", run_time)
+        except Exception as e:
+            logger.warning(f"[调度指标] ⚠ 处理调度事件失败: {str(e)}")
+
+    def _on_submitted(self, job_id: str, run_times: List[datetime]) -> None:
+        scheduled = run_times[-1]
+        coalesced = len(run_times) - 1 + self._count_coalesced(job_id, scheduled)
+        with self._lock:
+            self._pending[job_id] = {
+                "scheduled": scheduled,
+                "submitted": self._now(),
+                "coalesced": coalesced,
+                "queue_depth": self.queued,
+            }
+            self._last_scheduled[job_id] = scheduled
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+
+    def _count_coalesced(self, job_id: str, scheduled: datetime) -> int:
+        """上次计划时间与本次之间被合并掉（未单独执行）的触发次数"""
+        last = self._last_scheduled.get(job_id)
+        job = self.scheduler.get_job(job_id)
+        if last is None or job is None:
+            return 0
+        count = 0
+        fire_time = job.trigger.get_next_fire_time(last, last)
+        while fire_time is not None and fire_time < scheduled and count < MAX_COALESCE_COUNT:
+            count += 1
+            fire_time = job.trigger.get_next_fire_time(fire_time, fire_time)
+        return count
+
+    def _on_missed(self, job_id: str, scheduled: datetime) -> None:
+        """执行器开始执行时已超过容错时间，本次触发不执行"""
+        with self._lock:
+            pending = self._pending.get(job_id)
+            if pending and "started" not in pending and pending["scheduled"] == scheduled:
+                del self._pending[job_id]
+                self.queued -= 1
+        self._record(job_id, "missed", scheduled, submitted=(pending or {}).get("submitted"))
+
+    def _on_finished(self, job_id: str, scheduled: datetime, exception: Optional[BaseException]) -> None:
+        with self._lock:
+            pending = self._pending.pop(job_id, None)
+            if pending and "started" in pending:
+                self.running -= 1
+            elif pending:
+                self.queued -= 1
+        pending = pending or {}
+        self._record(
+            job_id,
+            "error" if exception else "success",
+            pending.get("scheduled", scheduled),
+            submitted=pending.get("submitted"),
+            started=pending.get("started"),
+            finished=self._now(),
+            coalesced=pending.get("coalesced", 0),
+            queue_depth=pending.get("queue_depth", 0),
+            error=str(exception) if exception else None,
+        )
+
+    def _record(self, job_id: str, status: str, scheduled: datetime, submitted: Optional[datetime] = None,
+                started: Optional[datetime] = None, finished: Optional[datetime] = None, coalesced: int = 0,
+                queue_depth: int = 0, error: Optional[str] = None) -> None:
+        def ms(later: Optional[datetime], earlier: Optional[datetime]) -> Optional[float]:
+            if later is None or earlier is None:
+                return None
+            return round((later - earlier).total_seconds() * 1000, 1)
+
+        with self._buffer_lock:
+            self._buffer.append({
+                "job_id": job_id,
+                "holder": self.holder,
+                "status": status,
+                "scheduled_at": _utc(scheduled),
+                "submitted_at": _utc(submitted),
+                "started_at": _utc(started),
+                "finished_at": _utc(finished),
+                "lag_ms": ms(started, scheduled),
+                "wait_ms": ms(started, submitted),
+                "duration_ms": ms(finished, started),
+                "coalesced": coalesced,
+                "queue_depth": queue_depth,
+                "error": error,
+            })
+        self._ensure_writer()
+
+        if status in ("missed", "skipped"):
+            logger.warning(f"[调度指标] ⚠ 作业 {job_id} 计划 {scheduled.astimezone(self.scheduler.timezone)} 的触发被跳过: {status}")
+
+    def _ensure_writer(self) -> None:
+        with self._buffer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._stop.clear()
+                self._writer = threading.Thread(target=self._writer_loop, name="scheduler-metrics-writer", daemon=True)
+                self._writer.start()
+
+    def _writer_loop(self) -> None:
+        while not self._stop.wait(FLUSH_INTERVAL):
+            self.flush()
+        self.flush()
+
+    def flush(self) -> int:
+        """把缓冲的运行记录一次性写入数据库，返回写入条数"""
+        with self._buffer_lock:
+            records, self._buffer = self._buffer, []
+        if not records:
+            return 0
+
+        from ..database import SessionLocal
+        db = SessionLocal()
+        try:
+            db.bulk_insert_mappings(SchedulerJobRun, records)
+            self._prune(db)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"[调度指标] ⚠ {len(records)} 条运行记录写入失败: {str(e)}")
+            return 0
+        finally:
+            db.close()
+        return len(records)
+
+    def close(self) -> None:
+        """停止后台写入线程并写入剩余记录"""
+        self._stop.set()
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            writer.join(timeout=FLUSH_INTERVAL * 2)
+        self.flush()
+
+    def _prune(self, db: Session) -> None:
+        """每小时清理一次超过保留天数的运行记录"""
+        now = time.monotonic()
+        if now - self._pruned_at < 3600:
+            return
+        self._pruned_at = now
+        cutoff = datetime.utcnow() - timedelta(days=settings.SCHEDULER_METRICS_RETENTION_DAYS)
+        db.query(SchedulerJobRun).filter(SchedulerJobRun.scheduled_at < cutoff).delete(synchronize_session=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"queued": self.queued, "running": self.running, "peak_queued": self.peak_queued}
+
+
+def _distribution(values: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": round(max(values), 1) if values else None,
+    }
+
+
+def aggregate_scheduler_metrics(db: Session, hours: int = 24, job_id: Optional[str] = None) -> Dict[str, Any]:
+    """按作业汇总最近 hours 小时的触发延迟、排队时间、运行耗时百分位（毫秒）及错过/重叠/合并次数"""
+    from ..models.sync_task import SyncTask
+
+    since = datetime.utcnow() - timedelta(hours=hours)
+    query = db.query(SchedulerJobRun).filter(SchedulerJobRun.scheduled_at >= since)
+    if job_id:
+        query = query.filter(SchedulerJobRun.job_id == job_id)
+
+    grouped: Dict[str, List[SchedulerJobRun]] = {}
+    for run in query.order_by(SchedulerJobRun.scheduled_at):
+        grouped.setdefault(run.job_id, []).append(run)
+
+    task_ids = [int(name) for name in grouped if name.isdigit()]
+    task_names = dict(db.query(SyncTask.id, SyncTask.task_name).filter(SyncTask.id.in_(task_ids))) if task_ids else {}
+
+    jobs = {}
+    for name, runs in grouped.items():
+        statuses: Dict[str, int] = {}
+        for run in runs:
+            statuses[run.status] = statuses.get(run.status, 0) + 1
+        jobs[name] = {
+            "name": task_names.get(int(name)) if name.isdigit() else name,
+            "runs": len(runs),
+            "statuses": statuses,
+            "coalesced": sum(run.coalesced or 0 for run in runs),
+            "lag_ms": _distribution([run.lag_ms for run in runs if run.lag_ms is not None]),
+            "wait_ms": _distribution([run.wait_ms for run in runs if run.wait_ms is not None]),
+            "duration_ms": _distribution([run.duration_ms for run in runs if run.duration_ms is not None]),
+            "max_queue_depth": max(run.queue_depth or 0 for run in runs),
+            "last_run_at": runs[-1].started_at or runs[-1].scheduled_at,
+            "last_status": runs[-1].status,
+        }
+    return {"hours": hours, "jobs": jobs}
+
+
+def render_prometheus(metrics: Dict[str, Any], live: Optional[Dict[str, Any]] = None) -> str:
+    """把汇总结果渲染为 Prometheus 文本格式（summary 的分位数单位为秒）"""
+    lines: List[str] = []
+
+    def label(job: str, **extra: str) -> str:
+        pairs = [f'job_id="{job}"'] + [f'{key}="{value}"' for key, value in extra.items()]
+        return "{" + ",".join(pairs) + "}"
+
+    for metric, field, help_text in (
+        ("scheduler_job_lag_seconds", "lag_ms", "计划触发到实际开始的延迟"),
+        ("scheduler_job_wait_seconds", "wait_ms", "执行器排队时间"),
+        ("scheduler_job_duration_seconds", "duration_ms", "作业运行耗时"),
+    ):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} summary")
+        for job, values in metrics["jobs"].items():
+            for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+                value = values[field][key]
+                if value is not None:
+                    lines.append(f"{metric}{label(job, quantile=quantile)} {value / 1000:.4f}")
+
+    lines.append("# HELP scheduler_job_runs_total 最近窗口内按状态统计的触发次数")
+    lines.append("# TYPE scheduler_job_runs_total gauge")
+    for job, values in metrics["jobs"].items():
+        for status, count in values["statuses"].items():
+            lines.append(f"scheduler_job_runs_total{label(job, status=status)} {count}")
+
+    lines.append("# HELP scheduler_job_coalesced_total 最近窗口内被合并的错过触发次数")
+    lines.append("# TYPE scheduler_job_coalesced_total gauge")
+    for job, values in metrics["jobs"].items():
+        lines.append(f"scheduler_job_coalesced_total{label(job)} {values['coalesced']}")
+
+    if live:
+        for metric, key, help_text in (
+            ("scheduler_executor_queued", "queued", "已提交执行器但未开始的作业数"),
+            ("scheduler_executor_running", "running", "正在执行的作业数"),
+            ("scheduler_executor_peak_queued", "peak_queued", "进程启动以来执行器排队峰值"),
+            ("scheduler_is_leader", "is_leader", "本进程是否为调度 leader"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {int(live.get(key) or 0)}")
+    return "\n".join(lines) + "\n"
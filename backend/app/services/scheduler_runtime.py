@@ -0,0 +1,219 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from apscheduler.triggers.interval import IntervalTrigger
+from ..core.config import settings
+from ..database import SessionLocal
+from ..models.sync_task import SyncTask
+from .dynamic_scheduler import DynamicScheduler
+from .leader_election import LeaderElector
+from .trading_day_trigger import TradingDayTrigger, prepare_trading_calendar
+from .data_sync_scheduler import (
+    sync_stock_data_task, sync_financial_data_task, evaluate_rules_task, analysis_result_retention_task,
+    data_change_log_retention_task
+)
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "scheduler"
+
+# 系统内置作业：作业 ID -> (执行函数, 触发器工厂)
+SYSTEM_JOBS: Dict[str, Tuple[Callable[[], None], Callable[[Any], Any]]] = {
+    # 每个交易日收盘后同步自选股，周末和节假日没有新数据不触发
+    "system:daily_stock_sync": (sync_stock_data_task, lambda tz: TradingDayTrigger(time="18:30", timezone=tz)),
+    # 每周同步财务数据
+    "system:weekly_financial_sync": (sync_financial_data_task, lambda tz: IntervalTrigger(days=7, timezone=tz)),
+    # 收盘数据同步后增量评估分析规则
+    "system:rule_evaluation": (evaluate_rules_task, lambda tz: TradingDayTrigger(time="19:00", timezone=tz)),
+    # 每天压缩/清理分析结果
+    "system:analysis_result_retention": (analysis_result_retention_task, lambda tz: IntervalTrigger(days=1, timezone=tz)),
+    # 每天清理过期的数据变更日志
+    "system:data_change_log_retention": (data_change_log_retention_task, lambda tz: IntervalTrigger(days=1, timezone=tz)),
+}
+
+
+class SchedulerRuntime:
+    """统一调度运行时 - 同步任务（sync_tasks 表）与系统作业由同一个调度器触发
+
+    每个进程都启动一个暂停状态的调度器；参与选主的进程周期性续约数据库租约，
+    只有 leader 恢复触发，并在每次续约时把 sync_tasks 表的变更对齐到调度器。
+    leader 退出或失联后租约过期，其他进程在下一次检查时接管。
+    """
+
+    def __init__(self, participate: bool = True, timezone: str = "Asia/Shanghai"):
+        self.scheduler = DynamicScheduler(timezone=timezone)
+        self.participate = participate
+        self.elector = LeaderElector(LEASE_NAME, settings.SCHEDULER_LEASE_TTL)
+        self.scheduler.metrics.holder = self.elector.holder
+        self.is_leader = False
+        self.leader_since: Optional[datetime] = None
+        self._task_signatures: Dict[str, str] = {}
+        self._lease_task: Optional[asyncio.Task] = None
+        self._registry = None
+
+    async def start(self) -> None:
+        self.scheduler.start(paused=True)
+        for job_id, (func, trigger_factory) in SYSTEM_JOBS.items():
+            self.scheduler.add_system_job(job_id, func, trigger_factory(self.scheduler.scheduler.timezone))
+
+        # 所有进程都加载任务定义，便于查询下次执行时间及在本进程内增删改任务
+        db = SessionLocal()
+        try:
+            await self.reconcile_tasks(db)
+        finally:
+            db.close()
+
+        if self.participate:
+            logger.info(f"[调度运行时] 参与选主，持有者标识 {self.elector.holder}")
+            await self.tick()
+            self._lease_task = asyncio.create_task(self._lease_loop())
+        else:
+            logger.info("[调度运行时] 不参与选主，仅维护任务定义（由独立调度进程触发）")
+
+    async def shutdown(self) -> None:
+        from .sync_task_manager import cancel_pending_retries
+
+        if self._lease_task:
+            self._lease_task.cancel()
+            self._lease_task = None
+        await cancel_pending_retries()
+        if self.is_leader:
+            db = SessionLocal()
+            try:
+                self.elector.release(db)
+                logger.info("[调度运行时] 已释放 leader 租约")
+            except Exception as e:
+                logger.warning(f"[调度运行时] ⚠ 释放租约失败: {str(e)}")
+            finally:
+                db.close()
+            self.is_leader = False
+        self.scheduler.shutdown()
+
+    async def _lease_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.SCHEDULER_LEASE_RENEW_INTERVAL)
+            await self.tick()
+
+    async def tick(self) -> None:
+        """续约/竞选一次，并根据结果切换触发状态；leader 同时对齐任务定义"""
+        db = SessionLocal()
+        try:
+            try:
+                leader = self.elector.try_acquire(db)
+            except Exception as e:
+                # 无法确认租约时宁可停止触发，避免多个进程同时触发
+                logger.error(f"[调度运行时] ✗ 续约失败: {str(e)}")
+                db.rollback()
+                leader = False
+
+            if leader:
+                # 只有 leader 需要按交易日历触发；已缓存或失败退避期内不会请求上游
+                await self._prepare_calendar(db)
+
+            if leader and not self.is_leader:
+                logger.info(f"[调度运行时] ✓ 成为 leader: {self.elector.holder}")
+                self.is_leader = True
+                self.leader_since = datetime.now()
+                await self.reconcile_tasks(db)
+                self.scheduler.resume_all()
+            elif not leader and self.is_leader:
+                logger.warning(f"[调度运行时] ⚠ 失去 leader 身份，暂停触发")
+                self.is_leader = False
+                self.leader_since = None
+                self.scheduler.pause_all()
+            elif leader:
+                await self.reconcile_tasks(db)
+        finally:
+            db.close()
+
+    async def _prepare_calendar(self, db) -> None:
+        """交易日触发器在计算下次触发时间时同步查询日历，这里提前备好本月和下月"""
+        from .tushare_interface_registry import TushareInterfaceRegistry
+
+        if self._registry is None:
+            self._registry = TushareInterfaceRegistry(settings.TUSHARE_API_TOKEN)
+        await prepare_trading_calendar(db, self._registry)
+
+    async def reconcile_tasks(self, db) -> None:
+        """把 sync_tasks 表中的活动任务对齐到调度器：新增/变更的重新添加，删除或暂停的移除"""
+        from .sync_task_manager import SyncTaskManager
+
+        manager = SyncTaskManager(db, self.scheduler)
+        active: Dict[str, SyncTask] = {
+            str(task.id): task for task in db.query(SyncTask).filter(SyncTask.status == "active").all()
+        }
+        scheduled = set(self.scheduler.task_job_ids())
+
+        for task_id, task in active.items():
+            signature = json.dumps([task.schedule_type, task.schedule_config], sort_keys=True, default=str)
+            if task_id in scheduled and self._task_signatures.get(task_id) == signature:
+                continue
+            self.scheduler.register_task_function(task_id, manager._execute_task_wrapper(task.id))
+            try:
+                await self.scheduler.add_task(task.id, task.schedule_type, task.schedule_config)
+                self._task_signatures[task_id] = signature
+            except Exception as e:
+                logger.error(f"[调度运行时] ✗ 任务 ID {task_id} 调度失败: {str(e)}")
+
+        for task_id in scheduled - set(active):
+            await self.scheduler.remove_task(int(task_id))
+            self._task_signatures.pop(task_id, None)
+
+    def next_run_time(self, job_id: str) -> Optional[datetime]:
+        """作业的下次触发时间（非 leader 进程按触发器计算）"""
+        job = self.scheduler.scheduler.get_job(job_id)
+        if not job:
+            return None
+        return job.next_run_time or job.trigger.get_next_fire_time(None, datetime.now(self.scheduler.scheduler.timezone))
+
+    def status(self) -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            lease = self.elector.current(db)
+        finally:
+            db.close()
+        return {
+            "participating": self.participate,
+            "holder": self.elector.holder,
+            "is_leader": self.is_leader,
+            "leader_since": self.leader_since,
+            "leader": lease.holder if lease and lease.expires_at > datetime.utcnow() else None,
+            "lease_expires_at": lease.expires_at if lease else None,
+            "executor": self.scheduler.metrics.snapshot(),
+            "jobs": [
+                {"id": job.id, "next_run_time": self.next_run_time(job.id), "trigger": str(job.trigger)}
+                for job in self.scheduler.scheduler.get_jobs()
+            ],
+        }
+
+
+_runtime: Optional[SchedulerRuntime] = None
+
+
+def get_scheduler_runtime() -> Optional[SchedulerRuntime]:
+    return _runtime
+
+
+async def start_scheduler_runtime(participate: bool = True) -> SchedulerRuntime:
+    """启动进程内唯一的调度运行时"""
+    global _runtime
+    if _runtime is None:
+        _runtime = SchedulerRuntime(participate=participate)
+        await _runtime.start()
+    return _runtime
+
+
+async def stop_scheduler_runtime() -> None:
+    global _runtime
+    if _runtime is not None:
+        await _runtime.shutdown()
+        _runtime = None
+
+
+def scheduled_job_next_runs() -> List[Optional[datetime]]:
+    """系统作业的下次触发时间"""
+    if _runtime is None:
+        return []
+    return [_runtime.next_run_time(job_id) for job_id in SYSTEM_JOBS]
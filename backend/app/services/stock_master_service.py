@@ -0,0 +1,109 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional
+import pandas as pd
+from sqlalchemy.orm import Session
+from ..models.stock import Stock
+from .data_transform import get_model_mapping, transform_records, frame_to_records
+
+logger = logging.getLogger(__name__)
+
+# stock_basic 接口提供、需要与本地比对的字段
+STOCK_MASTER_FIELDS = [
+    "symbol", "name", "area", "industry", "fullname", "enname", "cnspell", "market",
+    "exchange", "curr_type", "list_status", "list_date", "delist_date", "is_hs",
+    "act_name", "act_ent_type",
+]
+
+
+# 接口返回为空时保留本地已有值的字段（与逐行保存时的行为一致）
+KEEP_EXISTING_WHEN_EMPTY = ["list_date", "delist_date"]
+
+
+def _load_existing_stocks(db: Session) -> pd.DataFrame:
+    """加载全部市场的股票：ts_code 唯一，按市场筛选会把其他市场下已存在的股票误判为新增"""
+    columns = ["id", "ts_code"] + STOCK_MASTER_FIELDS
+    query = db.query(*[getattr(Stock, column) for column in columns])
+    return pd.DataFrame.from_records(query.all(), columns=columns)
+
+
+def _changed_fields(merged: pd.DataFrame, fields: List[str]) -> pd.DataFrame:
+    """逐列比较新旧值（两边都为空视为相同），返回 行 × 字段 的变化掩码"""
+    changed = {}
+    for field in fields:
+        new, old = merged[field], merged[f"{field}_old"]
+        changed[field] = ~((new == old) | (new.isna() & old.isna()))
+    return pd.DataFrame(changed, index=merged.index)
+
+
+def reconcile_stock_master(
+    db: Session,
+    records: List[Dict[str, Any]],
+    list_status: str = "L",
+    market: Optional[str] = None,
+    chunk_size: int = 1000
+) -> Dict[str, Any]:
+    """将 stock_basic 全量结果与 stocks 表在内存中比对，新增/更新/退市在同一事务中分块写入"""
+    started = time.perf_counter()
+    mapping = get_model_mapping(Stock, ("ts_code",))
+    fetched, skipped = transform_records(records, mapping)
+    for field in STOCK_MASTER_FIELDS:
+        if field not in fetched.columns:
+            fetched[field] = None
+    fetched["symbol"] = fetched["symbol"].fillna("")
+    fetched["name"] = fetched["name"].fillna("")
+    fetched = fetched[["ts_code"] + STOCK_MASTER_FIELDS]
+
+    existing = _load_existing_stocks(db)
+    merged = fetched.merge(existing, on="ts_code", how="outer", suffixes=("", "_old"), indicator=True)
+    for field in KEEP_EXISTING_WHEN_EMPTY:
+        merged[field] = merged[field].where(merged[field].notna(), merged[f"{field}_old"])
+
+    new_rows = merged[merged["_merge"] == "left_only"]
+    both = merged[merged["_merge"] == "both"]
+    changed = _changed_fields(both, STOCK_MASTER_FIELDS)
+    update_rows = both[changed.any(axis=1)]
+
+    # 只有拉取的是全部上市股票时，才能把本地“上市”但已不在列表中的股票判定为退市
+    delisted_rows = merged.iloc[0:0]
+    if list_status == "L" and len(fetched) > 0:
+        missing = merged[merged["_merge"] == "right_only"]
+        if market:
+            # 只拉取了单个市场时，其他市场的股票不在结果中是正常的
+            missing = missing[missing["market_old"] == market]
+        delisted_rows = missing[missing["list_status_old"] == "L"]
+
+    inserts = frame_to_records(new_rows[["ts_code"] + STOCK_MASTER_FIELDS])
+    updates = frame_to_records(update_rows[["id"] + STOCK_MASTER_FIELDS].astype({"id": "int64"}))
+    delists = [{"id": int(stock_id), "list_status": "D"} for stock_id in delisted_rows["id"]]
+
+    try:
+        for start in range(0, len(inserts), chunk_size):
+            db.bulk_insert_mappings(Stock, inserts[start:start + chunk_size])
+        for start in range(0, len(updates), chunk_size):
+            db.bulk_update_mappings(Stock, updates[start:start + chunk_size])
+        for start in range(0, len(delists), chunk_size):
+            db.bulk_update_mappings(Stock, delists[start:start + chunk_size])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    updated = [
+        {"ts_code": ts_code, "fields": [field for field in STOCK_MASTER_FIELDS if row[field]]}
+        for ts_code, (_, row) in zip(update_rows["ts_code"], changed[changed.any(axis=1)].iterrows())
+    ]
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"[股票主数据] ✓ 比对完成: 拉取 {len(fetched)} 条, 新增 {len(inserts)}, 更新 {len(updates)}, "
+        f"退市 {len(delists)}, 未变化 {len(both) - len(updates)}, 无效 {skipped}, 耗时 {elapsed:.2f}s"
+    )
+    return {
+        "fetched": len(fetched),
+        "inserted": new_rows["ts_code"].tolist(),
+        "updated": updated,
+        "delisted": delisted_rows["ts_code"].tolist(),
+        "unchanged": len(both) - len(updates),
+        "invalid": skipped,
+        "elapsed_seconds": round(elapsed, 3),
+    }
@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy.orm import Session
+from ..models.sync_job import SyncJob
+from ..crud.sync_job import (
+    get_sync_job,
+    get_active_sync_jobs,
+    find_active_sync_job,
+    get_last_finished_sync_job,
+    create_sync_job,
+    heartbeat_sync_jobs,
+    fail_interrupted_sync_jobs,
+)
+from ..core.config import settings
+from .data_sync_service import DataSyncService
+from .leader_election import make_holder_id
+from .request_queue import Priority, request_priority
+
+logger = logging.getLogger(__name__)
+
+
+class JobProgress:
+    """作业进度 - 同步过程中累计计数，按间隔写回 sync_jobs 表（独立会话，不影响同步事务）"""
+
+    def __init__(self, job_id: int, flush_interval: float = 1.0):
+        self.job_id = job_id
+        self.flush_interval = flush_interval
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self._flushed_at = 0.0
+        self._lock = threading.Lock()
+
+    def set_total(self, total: int) -> None:
+        with self._lock:
+            self.total = total
+        self.flush(force=True)
+
+    def advance(self, failed: bool = False) -> None:
+        with self._lock:
+            self.done += 1
+            if failed:
+                self.failed += 1
+        self.flush()
+
+    def flush(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._flushed_at < self.flush_interval:
+            return
+        self._flushed_at = now
+
+        from ..database import SessionLocal
+        db = SessionLocal()
+        try:
+            db.query(SyncJob).filter(SyncJob.id == self.job_id).update(
+                {"total": self.total, "done": self.done, "failed": self.failed},
+                synchronize_session=False
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"[同步作业] ⚠ 作业 ID {self.job_id} 进度写入失败: {str(e)}")
+        finally:
+            db.close()
+
+
+def _run_stocks(db: Session, params: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    return DataSyncService(db).sync_stock_data(params, progress=progress)
+
+
+def _run_financials(db: Session, params: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    service = DataSyncService(db)
+    # 多个用户关注同一股票时只同步一次
+    stock_codes = list(dict.fromkeys(params.get("stock_codes") or [stock["code"] for stock in service.get_all_user_stocks()]))
+    return asyncio.run(service.sync_financial_data_batch(stock_codes, progress=progress))
+
+
+def _run_all_stocks(db: Session, params: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    progress.set_total(1)
+    result = DataSyncService(db).sync_all_chinese_stocks(**params)
+    progress.advance(failed=not result["success"])
+    return result
+
+
+# 作业类型 -> 执行函数 (db, params, progress) -> SyncResult 字典
+SYNC_JOB_HANDLERS: Dict[str, Callable[[Session, Dict[str, Any], JobProgress], Dict[str, Any]]] = {
+    "stocks": _run_stocks,
+    "financials": _run_financials,
+    "all_stocks": _run_all_stocks,
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+# 本进程的作业归属标识，心跳线程只续期本进程执行的作业
+_owner = make_holder_id()
+_heartbeat_thread: Optional[threading.Thread] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _heartbeat_thread
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.SYNC_JOB_WORKERS, thread_name_prefix="sync-job")
+            _heartbeat_thread = threading.Thread(target=_heartbeat_loop, name="sync-job-heartbeat", daemon=True)
+            _heartbeat_thread.start()
+        return _executor
+
+
+def _heartbeat_loop() -> None:
+    """周期性续期本进程排队中和执行中的作业，其他进程据此判断作业是否仍有人执行"""
+    from ..database import SessionLocal
+
+    while True:
+        time.sleep(settings.SYNC_JOB_HEARTBEAT_INTERVAL)
+        db = SessionLocal()
+        try:
+            heartbeat_sync_jobs(db, _owner)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"[同步作业] ⚠ 心跳写入失败: {str(e)}")
+        finally:
+            db.close()
+
+
+def fail_stale_sync_jobs(db: Session) -> int:
+    """把执行进程已退出（心跳超时）的作业标记为失败，返回标记的数量"""
+    stale_before = datetime.utcnow() - timedelta(seconds=settings.SYNC_JOB_TIMEOUT)
+    count = fail_interrupted_sync_jobs(db, stale_before)
+    if count:
+        logger.warning(f"[同步作业] ⚠ {count} 个作业的执行进程已退出，标记为失败")
+    return count
+
+
+def submit_sync_job(db: Session, job_type: str, params: Dict[str, Any], created_by: Optional[int] = None) -> SyncJob:
+    """提交后台同步作业并立即返回；相同参数的作业仍在排队或执行时直接返回该作业"""
+    if job_type not in SYNC_JOB_HANDLERS:
+        raise ValueError(f"未知的同步作业类型: {job_type}")
+
+    # 执行进程已退出的作业不能再被复用
+    fail_stale_sync_jobs(db)
+    existing = find_active_sync_job(db, job_type, params)
+    if existing:
+        logger.info(f"[同步作业] 作业 ID {existing.id} ({job_type}) 已在进行中，复用")
+        return existing
+
+    job = create_sync_job(db, job_type, params, created_by=created_by, owner=_owner)
+    _get_executor().submit(_run_job, job.id)
+    logger.info(f"[同步作业] 已提交作业 ID {job.id}: {job_type} {params}")
+    return job
+
+
+def _run_job(job_id: int) -> None:
+    """在工作线程中执行作业，使用独立会话"""
+    from ..database import SessionLocal
+
+    db = SessionLocal()
+    job = None
+    progress = JobProgress(job_id)
+    try:
+        job = get_sync_job(db, job_id)
+        if not job:
+            logger.error(f"[同步作业] ✗ 作业 ID {job_id} 未找到")
+            return
+        job.status = "running"
+        job.started_at = datetime.now()
+        db.commit()
+        logger.info(f"[同步作业] ========== 开始执行作业 ID {job_id}: {job.job_type} ==========")
+
+        handler = SYNC_JOB_HANDLERS[job.job_type]
+        with request_priority(Priority.INTERACTIVE):
+            result = handler(db, dict(job.params or {}), progress)
+
+        job = get_sync_job(db, job_id)
+        job.status = "completed" if result.get("success") else "failed"
+        job.message = result.get("message")
+        job.result = result
+        logger.info(f"[同步作业] ✓ 作业 ID {job_id} 结束: {job.status}, {job.message}")
+    except Exception as e:
+        db.rollback()
+        job = get_sync_job(db, job_id)
+        if job:
+            job.status = "failed"
+            job.message = str(e)
+        logger.error(f"[同步作业] ✗ 作业 ID {job_id} 执行失败: {str(e)}")
+    finally:
+        if job:
+            job.total = max(progress.total, progress.done)
+            job.done = progress.done
+            job.failed = progress.failed
+            job.finished_at = datetime.now()
+            db.commit()
+        db.close()
+
+
+def describe_sync_job(job: SyncJob, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """作业状态及进度：已完成/总数、速率（项/秒）、预计剩余秒数"""
+    rate = None
+    eta_seconds = None
+    if job.started_at:
+        end = job.finished_at or now or datetime.now(job.started_at.tzinfo)
+        elapsed = (end - job.started_at).total_seconds()
+        if elapsed > 0 and job.done:
+            rate = round(job.done / elapsed, 3)
+            if job.status == "running" and job.total:
+                eta_seconds = round(max(0, job.total - job.done) / rate, 1)
+
+    return {
+        "id": job.id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "params": job.params or {},
+        "total": job.total or 0,
+        "done": job.done or 0,
+        "failed": job.failed or 0,
+        "percent": round(job.done / job.total * 100, 1) if job.total else None,
+        "rate": rate,
+        "eta_seconds": eta_seconds,
+        "message": job.message,
+        "result": job.result,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def get_sync_status(db: Session) -> Dict[str, Any]:
+    """整体同步状态：进行中的作业及进度、上次完成时间、定时同步的下次执行时间"""
+    from .scheduler_runtime import scheduled_job_next_runs
+
+    next_runs = [run for run in scheduled_job_next_runs() if run is not None]
+    active = get_active_sync_jobs(db)
+    last_finished = get_last_finished_sync_job(db)
+    running = [job for job in active if job.status == "running"]
+    return {
+        "last_sync_time": last_finished.finished_at if last_finished else None,
+        "next_sync_time": min(next_runs) if next_runs else None,
+        "syncing": bool(active),
+        "status": "syncing" if running else ("queued" if active else "idle"),
+        "jobs": [describe_sync_job(job) for job in active],
+    }
@@ -1,12 +1,24 @@
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Set
 from datetime import datetime, timedelta
+import asyncio
 import logging
+import random
+import time
+import uuid
 from ..models.sync_interface import SyncInterface
 from ..models.sync_task import SyncTask
 from ..models.sync_execution_log import SyncExecutionLog
 from ..models.user_stock import UserStock
 from ..models.stock import Stock
+from ..models.stock_daily import StockDaily
+from ..models.stock_daily_basic import StockDailyBasic
+from ..models.stock_moneyflow import StockMoneyflow
+from ..models.index_basic import IndexBasic
+from ..models.index_daily import IndexDaily
+from ..models.trade_calendar import TradeCalendar
+from ..models.moneyflow_hsgt import MoneyflowHsgt
+from ..models.top_list import TopList
 from ..crud.sync_management import (
     create_sync_task,
     update_sync_task,
@@ -16,11 +28,68 @@ from ..crud.sync_management import (
 )
 from ..services.tushare_interface_registry import TushareInterfaceRegistry
 from ..services.dynamic_scheduler import DynamicScheduler
+from ..services.change_feed import change_feed, ChangeCollector
+from ..services.data_transform import get_model_mapping, transform_records
+from ..crud.bulk import bulk_upsert, BulkWriteResult
+from ..crud.sync_watermark import get_sync_watermarks, frame_watermarks, advance_sync_watermarks, incremental_start_date
+from ..services.trading_calendar import trading_calendar
+from ..services.trading_day_trigger import prepare_trading_calendar
+from ..services.gap_detector import GAP_TARGETS, DATE_GAP_TARGETS, find_gaps, find_missing_dates, plan_fetches, empty_pairs
+from ..crud.sync_empty_fetch import MARKET_TS_CODE, record_empty_fetches
+from ..services.sync_telemetry import start_telemetry, stop_telemetry, telemetry_stage
+from ..services.request_queue import Priority, request_priority
 from ..core.config import settings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 接口名称 -> (目标模型, 日志名称, 业务键)
+SYNC_SAVE_TARGETS = {
+    "daily": (StockDaily, "日线数据", ("ts_code", "trade_date")),
+    "daily_basic": (StockDailyBasic, "每日指标数据", ("ts_code", "trade_date")),
+    "moneyflow": (StockMoneyflow, "资金流数据", ("ts_code", "trade_date")),
+    "index_basic": (IndexBasic, "指数基本信息", ("ts_code",)),
+    "index_daily": (IndexDaily, "指数日线数据", ("ts_code", "trade_date")),
+    "trade_cal": (TradeCalendar, "交易日历", ("exchange", "cal_date")),
+    "moneyflow_hsgt": (MoneyflowHsgt, "沪深港通资金流向", ("trade_date",)),
+    "top_list": (TopList, "龙虎榜数据", ("ts_code", "trade_date", "reason")),
+}
+
+
+# 非 leader 进程内等待中的延迟重试，进程退出前统一取消并等待结束
+_pending_retries: Set[asyncio.Task] = set()
+
+
+async def _delayed_retry(task_id: int, run_id: str, delay_seconds: float, retry_func) -> None:
+    await asyncio.sleep(delay_seconds)
+    try:
+        await retry_func()
+    except Exception as e:
+        logger.error(f"[任务重试] ✗ 任务 ID {task_id} 运行 {run_id[:8]} 重试执行失败: {str(e)}")
+
+
+def _forget_retry(handle: asyncio.Task) -> None:
+    _pending_retries.discard(handle)
+    if not handle.cancelled() and handle.exception() is not None:
+        logger.error(f"[任务重试] ✗ 延迟重试异常结束: {handle.exception()}")
+
+
+async def cancel_pending_retries() -> int:
+    """取消本进程内尚未执行的延迟重试并等待其结束，返回取消的数量"""
+    handles = list(_pending_retries)
+    for handle in handles:
+        handle.cancel()
+    if handles:
+        await asyncio.gather(*handles, return_exceptions=True)
+        logger.warning(f"[任务重试] ⚠ 进程退出，取消 {len(handles)} 个未执行的延迟重试")
+    return len(handles)
+
+
+def supports_watermark(interface_name: str) -> bool:
+    """每个 (ts_code, trade_date) 一行的接口维护同步水位线"""
+    target = SYNC_SAVE_TARGETS.get(interface_name)
+    return bool(target) and tuple(target[2]) == ("ts_code", "trade_date")
+
 
 class SyncTaskManager:
     """同步任务管理器 - 管理任务生命周期"""
@@ -34,6 +103,8 @@ class SyncTaskManager:
         """创建新任务并添加到调度器"""
         logger.info(f"[任务创建] 开始创建任务: {task_data.get('task_name', 'Unknown')}")
         db_task = create_sync_task(self.db, task_data)
+        if db_task.schedule_type == "trading_day":
+            await prepare_trading_calendar(self.db, self.tushare_registry)
         self.scheduler.register_task_function(db_task.id, self._execute_task_wrapper(db_task.id))
         await self.scheduler.add_task(
             db_task.id,
@@ -47,6 +118,8 @@ class SyncTaskManager:
         """更新任务配置并重新调度"""
         logger.info(f"[任务更新] 开始更新任务 ID: {task_id}")
         db_task = update_sync_task(self.db, task_id, task_data)
+        if db_task.schedule_type == "trading_day":
+            await prepare_trading_calendar(self.db, self.tushare_registry)
         await self.scheduler.update_task(
             db_task.id,
             db_task.schedule_type,
@@ -107,28 +180,41 @@ class SyncTaskManager:
             logger.error(f"[任务触发] ✗ {error_msg}")
             raise ValueError(error_msg)
 
-        task_id_str = str(task_id)
-        if task_id_str not in self.scheduler.task_functions:
-            logger.info(f"[任务触发] 任务函数未注册，正在注册...")
-            self.scheduler.register_task_function(task_id_str, self._execute_task_wrapper(task_id, execution_type="manual"))
-
-        await self.scheduler.trigger_task(task_id)
+        # 不复用调度器中登记的定时执行函数：手动触发需保持 manual 类型，
+        # 启用作业队列时以交互优先级入队，且不与排队中的定时执行去重合并
+        # 手动触发的任务优先于定时任务和回填占用上游请求槽位
+        with request_priority(Priority.INTERACTIVE):
+            try:
+                await self._execute_task_wrapper(task_id, execution_type="manual")()
+                logger.info(f"[任务触发] ✓ 任务 ID {task_id} 已触发")
+            except Exception as e:
+                logger.error(f"[任务触发] ✗ 任务 ID {task_id} 执行失败: {str(e)}")
 
-    def _execute_task_wrapper(self, task_id: int, execution_type: str = "scheduled"):
+    def _execute_task_wrapper(self, task_id: int, execution_type: str = "scheduled", run_id: Optional[str] = None, attempt: int = 0):
         """包装任务执行函数供调度器调用"""
         async def wrapper():
             from ..database import SessionLocal
             db = SessionLocal()
             try:
-                await self._execute_task(db, task_id, execution_type=execution_type)
+                if settings.JOB_QUEUE_ENABLED and execution_type in ("scheduled", "manual"):
+                    # 定时/手动触发只负责入队，由工作进程执行；手动触发以交互优先级入队
+                    from .job_queue import enqueue_sync_task
+                    enqueue_sync_task(db, task_id, execution_type=execution_type)
+                else:
+                    await self._execute_task(db, task_id, execution_type=execution_type, run_id=run_id, attempt=attempt)
             finally:
                 db.close()
         return wrapper
 
-    async def _execute_task(self, db: Session, task_id: int, execution_type: str = "scheduled") -> None:
-        """执行同步任务的核心逻辑"""
+    async def _execute_task(self, db: Session, task_id: int, execution_type: str = "scheduled",
+                            run_id: Optional[str] = None, attempt: int = 0) -> None:
+        """执行同步任务的核心逻辑
+
+        run_id 标识一次运行及其后续重试，attempt 为该运行内的重试序号（首次执行为 0）
+        """
+        run_id = run_id or uuid.uuid4().hex
         logger.info(f"[任务执行] ========== 开始执行任务 ID: {task_id} ==========")
-        logger.info(f"[任务执行] 执行类型: {execution_type}, 时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        logger.info(f"[任务执行] 执行类型: {execution_type}, 运行 {run_id[:8]} 第 {attempt} 次重试, 时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
         task = db.query(SyncTask).filter(SyncTask.id == task_id).first()
 
@@ -161,6 +247,9 @@ class SyncTaskManager:
             }
         )
 
+        telemetry = start_telemetry(interface.interface_name)
+        resolve_started = time.perf_counter()
+
         try:
             task.last_run_status = "running"
             db.commit()
@@ -168,6 +257,8 @@ class SyncTaskManager:
             merged_params = {**interface.interface_params, **task.task_params}
 
             index_ts_codes = None
+            gap_mode = False
+            incremental_mode = False
             if interface.interface_name == "index_daily":
                 logger.info(f"[任务执行] index_daily 接口：检查参数")
 
@@ -185,18 +276,11 @@ class SyncTaskManager:
                     logger.info(f"[任务执行] index_daily 接口：获取到 {len(index_ts_codes)} 个综合指数代码")
                     logger.info(f"[任务执行] index_daily 接口：指数代码: {', '.join(index_ts_codes)}")
 
-                current_hour = datetime.now().hour
-                if "trade_date" not in merged_params or not merged_params.get("trade_date"):
-                    logger.info(f"[任务执行] index_daily 接口：无 trade_date 参数，根据当前时间判断")
-
-                    if current_hour >= 16:
-                        today = datetime.now().date()
-                        merged_params["trade_date"] = today.strftime("%Y%m%d")
-                        logger.info(f"[任务执行] index_daily 接口：16点后，同步当天数据: {merged_params['trade_date']}")
-                    else:
-                        yesterday = (datetime.now() - timedelta(days=1)).date()
-                        merged_params["trade_date"] = yesterday.strftime("%Y%m%d")
-                        logger.info(f"[任务执行] index_daily 接口：16点前，同步前一天数据: {merged_params['trade_date']}")
+                if merged_params.get("start_date"):
+                    logger.info(f"[任务执行] index_daily 接口：使用指定日期区间: {merged_params.get('start_date')} ~ {merged_params.get('end_date', '')}")
+                elif not merged_params.get("trade_date"):
+                    logger.info(f"[任务执行] index_daily 接口：无日期参数，按交易日历检测缺口")
+                    gap_mode = True
                 else:
                     logger.info(f"[任务执行] index_daily 接口：使用指定日期: {merged_params.get('trade_date')}")
 
@@ -221,23 +305,42 @@ class SyncTaskManager:
                     logger.info(f"[任务执行] daily 接口：从 user_stocks 获取到 {len(ts_codes)} 个股票代码")
                     logger.info(f"[任务执行] daily 接口：股票代码: {merged_params['ts_code']}")
 
-                current_hour = datetime.now().hour
-                if "trade_date" not in merged_params or not merged_params.get("trade_date"):
-                    logger.info(f"[任务执行] daily 接口：无 trade_date 参数，根据当前时间判断")
-
-                    if current_hour >= 16:
-                        today = datetime.now().date()
-                        merged_params["trade_date"] = today.strftime("%Y%m%d")
-                        logger.info(f"[任务执行] daily 接口：16点后，同步当天数据: {merged_params['trade_date']}")
-                    else:
-                        yesterday = (datetime.now() - timedelta(days=1)).date()
-                        merged_params["trade_date"] = yesterday.strftime("%Y%m%d")
-                        logger.info(f"[任务执行] daily 接口：16点前，同步前一天数据: {merged_params['trade_date']}")
+                if merged_params.get("start_date"):
+                    logger.info(f"[任务执行] daily 接口：使用指定日期区间: {merged_params.get('start_date')} ~ {merged_params.get('end_date', '')}")
+                elif not merged_params.get("trade_date"):
+                    logger.info(f"[任务执行] daily 接口：无日期参数，按交易日历检测缺口")
+                    gap_mode = True
                 else:
                     logger.info(f"[任务执行] daily 接口：使用指定日期: {merged_params.get('trade_date')}")
 
+            elif (
+                interface.interface_name in DATE_GAP_TARGETS
+                and not merged_params.get("trade_date")
+                and not merged_params.get("start_date")
+            ):
+                logger.info(f"[任务执行] {interface.interface_name} 接口：无日期参数，按交易日历补齐缺失的交易日")
+                gap_mode = True
+
+            elif (
+                supports_watermark(interface.interface_name)
+                and merged_params.get("ts_code")
+                and not merged_params.get("trade_date")
+                and not merged_params.get("start_date")
+            ):
+                logger.info(f"[任务执行] {interface.interface_name} 接口：无日期参数，按水位线增量同步")
+                incremental_mode = True
+
+            telemetry.add_stage("resolve_params", time.perf_counter() - resolve_started)
+            fetch_started = time.perf_counter()
+
+            if gap_mode:
+                gap_codes = index_ts_codes or [code for code in str(merged_params.get("ts_code", "")).split(",") if code]
+                data = await self._fetch_missing(db, interface.interface_name, gap_codes, merged_params)
+            elif incremental_mode:
+                codes = [code for code in str(merged_params["ts_code"]).split(",") if code]
+                data = await self._fetch_incremental(db, interface.interface_name, codes, merged_params)
             # Check if we need to loop for index_daily (ts_code doesn't support comma-separated values)
-            if interface.interface_name == "index_daily" and index_ts_codes and len(index_ts_codes) > 1:
+            elif interface.interface_name == "index_daily" and index_ts_codes and len(index_ts_codes) > 1:
                 logger.info(f"[任务执行] index_daily 接口：需要循环获取 {len(index_ts_codes)} 个指数数据")
                 data = []
 
@@ -266,12 +369,16 @@ class SyncTaskManager:
                 )
                 logger.info(f"[任务执行] 数据获取成功，开始保存...")
 
-            print(f"[任务执行] 数据获取成功 {data}")
+            telemetry.add_stage("fetch", time.perf_counter() - fetch_started)
+            logger.debug(f"[任务执行] 数据获取成功，记录数: {len(data) if isinstance(data, list) else 1}")
 
-            self._save_synced_data(db, interface, data)
+            # 只有按水位线逐代码连续拉取的结果才推进水位线；按交易日、日期区间或补缺口写入的数据
+            # 不代表该代码更早的历史已经入库
+            self._save_synced_data(db, interface.interface_name, data, advance_watermark=incremental_mode)
 
             log.status = "success"
             log.records_processed = len(data) if isinstance(data, list) else 1
+            log.output_summary = {**telemetry.to_summary(log.records_processed), "run_id": run_id, "attempt": attempt}
             log.finished_at = datetime.now()
             task.last_run_status = "success"
             task.last_run_at = datetime.now()
@@ -282,290 +389,178 @@ class SyncTaskManager:
         except Exception as e:
             log.status = "failed"
             log.error_message = str(e)
+            log.output_summary = {**telemetry.to_summary(0), "run_id": run_id, "attempt": attempt}
             log.finished_at = datetime.now()
             task.last_run_status = "failed"
             task.last_error_message = str(e)
-            task.status = "error"
 
             logger.error(f"[任务执行] ✗ 任务 ID {task_id} 执行失败: {str(e)}")
             import traceback
             logger.error(f"[任务执行] 错误堆栈:\n{traceback.format_exc()}")
 
-            if self._should_retry(task):
-                logger.info(f"[任务执行] 准备重试任务 ID {task_id}")
-                await self._schedule_retry(db, task)
+            if self._should_retry(task, attempt):
+                self._schedule_retry(db, task, run_id, attempt + 1)
+            else:
+                # 本次运行的重试预算已用完
+                task.status = "error"
 
         finally:
+            stop_telemetry()
             db.commit()
             logger.info(f"[任务执行] ========== 任务 ID {task_id} 执行完成 ==========")
 
-    def _save_synced_data(self, db: Session, interface: SyncInterface, data: Any) -> None:
-        """根据接口配置保存同步数据"""
-        logger.info(f"[数据保存] 接口类型: {interface.interface_name}")
-
-        if interface.interface_name == "daily":
-            logger.info(f"[数据保存] 开始保存日线数据，数据条数: {len(data) if isinstance(data, list) else 1}")
-            self._save_daily_data(db, data)
-        elif interface.interface_name == "daily_basic":
-            logger.info(f"[数据保存] 开始保存每日指标数据，数据条数: {len(data) if isinstance(data, list) else 1}")
-            self._save_daily_basic_data(db, data)
-        elif interface.interface_name == "moneyflow":
-            logger.info(f"[数据保存] 开始保存资金流向数据，数据条数: {len(data) if isinstance(data, list) else 1}")
-            self._save_moneyflow_data(db, data)
-        elif interface.interface_name == "index_basic":
-            logger.info(f"[数据保存] 开始保存指数基本信息，数据条数: {len(data) if isinstance(data, list) else 1}")
-            self._save_index_basic_data(db, data)
-        elif interface.interface_name == "index_daily":
-            logger.info(f"[数据保存] 开始保存指数日线数据，数据条数: {len(data) if isinstance(data, list) else 1}")
-            self._save_index_daily_data(db, data)
+    async def _fetch_missing(self, db: Session, interface_name: str, ts_codes: list, base_params: Dict[str, Any],
+                             lookback_days: Optional[int] = None) -> list:
+        """按交易日历检测最近 lookback_days 个交易日的缺口，只拉取缺失的 (代码, 日期)
+
+        拉取成功但上游没有数据的 (代码, 日期)（停牌、休市）记录下来，之后的缺口检测不再重复拉取。
+        """
+        lookback_days = lookback_days or settings.SYNC_GAP_LOOKBACK_DAYS
+        today = datetime.now().date()
+        # 自然日窗口放宽一倍，保证覆盖足够的交易日
+        await trading_calendar.ensure(db, today - timedelta(days=lookback_days * 2 + 14), today, self.tushare_registry)
+        trading_days = trading_calendar.recent_trading_days(lookback_days)
+
+        if interface_name in DATE_GAP_TARGETS:
+            missing_dates = find_missing_dates(db, DATE_GAP_TARGETS[interface_name], trading_days, interface_name=interface_name)
+            gaps = {MARKET_TS_CODE: missing_dates}
+            plans = [{"trade_date": day.strftime("%Y%m%d")} for day in missing_dates]
+            logger.info(
+                f"[缺口检测] {interface_name}: {len(trading_days)} 个交易日, 缺失 {len(missing_dates)} 天, 计划调用 {len(plans)} 次"
+            )
         else:
-            logger.warning(f"[数据保存] ⚠ 接口类型 {interface.interface_name} 未实现数据保存")
-
-    def _save_daily_data(self, db: Session, data: list) -> None:
-        """保存日线数据"""
-        from ..models.stock_daily import StockDaily
-        from datetime import datetime
-
-        logger.info(f"[日线数据保存] 开始处理日线数据，总条数: {len(data)}")
-
-        new_count = 0
-        update_count = 0
-        error_count = 0
-
-        for item in data:
-            ts_code = item.get("ts_code")
-            trade_date_str = item.get("trade_date")
-            if not ts_code or not trade_date_str:
-                logger.debug(f"[日线数据保存] 跳过记录: ts_code={ts_code}, trade_date={trade_date_str}")
-                continue
-
-            # Convert string date (YYYYMMDD) to datetime.date object
-            try:
-                trade_date = datetime.strptime(str(trade_date_str), "%Y%m%d").date()
-                item["trade_date"] = trade_date
-            except (ValueError, TypeError) as e:
-                error_count += 1
-                logger.error(f"[日线数据保存] 交易日期格式错误: {trade_date_str}, 错误: {str(e)}")
-                continue
-
-            existing = db.query(StockDaily).filter(
-                StockDaily.ts_code == ts_code,
-                StockDaily.trade_date == trade_date
-            ).first()
-
-            if existing:
-                for key, value in item.items():
-                    if hasattr(existing, key):
-                        setattr(existing, key, value)
-                update_count += 1
-            else:
-                db.add(StockDaily(**item))
-                new_count += 1
-
-        db.commit()
-        logger.info(f"[日线数据保存] ✓ 保存完成: 新增 {new_count} 条, 更新 {update_count} 条, 失败 {error_count} 条")
-
-    def _save_daily_basic_data(self, db: Session, data: list) -> None:
-        """保存每日指标数据"""
-        from ..models.stock_daily_basic import StockDailyBasic
-        from datetime import datetime
-
-        logger.info(f"[每日指标数据保存] 开始处理每日指标数据，总条数: {len(data)}")
-
-        new_count = 0
-        update_count = 0
-        error_count = 0
-
-        for item in data:
-            ts_code = item.get("ts_code")
-            trade_date_str = item.get("trade_date")
-            if not ts_code or not trade_date_str:
-                logger.debug(f"[每日指标数据保存] 跳过记录: ts_code={ts_code}, trade_date={trade_date_str}")
-                continue
-
-            # Convert string date (YYYYMMDD) to datetime.date object
-            try:
-                trade_date = datetime.strptime(str(trade_date_str), "%Y%m%d").date()
-                item["trade_date"] = trade_date
-            except (ValueError, TypeError) as e:
-                error_count += 1
-                logger.error(f"[每日指标数据保存] 交易日期格式错误: {trade_date_str}, 错误: {str(e)}")
-                continue
-
-            existing = db.query(StockDailyBasic).filter(
-                StockDailyBasic.ts_code == ts_code,
-                StockDailyBasic.trade_date == trade_date
-            ).first()
-
-            if existing:
-                for key, value in item.items():
-                    if hasattr(existing, key):
-                        setattr(existing, key, value)
-                update_count += 1
-            else:
-                db.add(StockDailyBasic(**item))
-                new_count += 1
-
-        db.commit()
-        logger.info(f"[每日指标数据保存] ✓ 保存完成: 新增 {new_count} 条, 更新 {update_count} 条, 失败 {error_count} 条")
-
-    def _save_moneyflow_data(self, db: Session, data: list) -> None:
-        """保存资金流向数据"""
-        from ..models.stock_moneyflow import StockMoneyflow
-        from datetime import datetime
-
-        logger.info(f"[资金流数据保存] 开始处理资金流向数据，总条数: {len(data)}")
-
-        new_count = 0
-        update_count = 0
-        error_count = 0
-
-        for item in data:
-            ts_code = item.get("ts_code")
-            trade_date_str = item.get("trade_date")
-            if not ts_code or not trade_date_str:
-                logger.debug(f"[资金流数据保存] 跳过记录: ts_code={ts_code}, trade_date={trade_date_str}")
-                continue
-
-            # Convert string date (YYYYMMDD) to datetime.date object
-            try:
-                trade_date = datetime.strptime(str(trade_date_str), "%Y%m%d").date()
-                item["trade_date"] = trade_date
-            except (ValueError, TypeError) as e:
-                error_count += 1
-                logger.error(f"[资金流数据保存] 交易日期格式错误: {trade_date_str}, 错误: {str(e)}")
-                continue
-
-            existing = db.query(StockMoneyflow).filter(
-                StockMoneyflow.ts_code == ts_code,
-                StockMoneyflow.trade_date == trade_date
-            ).first()
-
-            if existing:
-                for key, value in item.items():
-                    if hasattr(existing, key):
-                        setattr(existing, key, value)
-                update_count += 1
-            else:
-                db.add(StockMoneyflow(**item))
-                new_count += 1
-
-        db.commit()
-        logger.info(f"[资金流数据保存] ✓ 保存完成: 新增 {new_count} 条, 更新 {update_count} 条, 失败 {error_count} 条")
-
-    def _save_index_basic_data(self, db: Session, data: list) -> None:
-        from ..models.index_basic import IndexBasic
-        from datetime import datetime
-
-        logger.info(f"[指数基本信息保存] 开始处理指数基本信息，总条数: {len(data)}")
-
-        new_count = 0
-        update_count = 0
-        error_count = 0
-
-        for item in data:
-            ts_code = item.get("ts_code")
-            if not ts_code:
-                logger.debug(f"[指数基本信息保存] 跳过记录: ts_code={ts_code}")
-                continue
-
-            date_fields = ["base_date", "list_date", "exp_date"]
-            for date_field in date_fields:
-                date_str = item.get(date_field)
-                if date_str:
-                    try:
-                        date_value = datetime.strptime(str(date_str), "%Y%m%d").date() if len(str(date_str)) == 8 else None
-                        item[date_field] = date_value
-                    except (ValueError, TypeError):
-                        item[date_field] = None
-
-            existing = db.query(IndexBasic).filter(IndexBasic.ts_code == ts_code).first()
-
-            if existing:
-                for key, value in item.items():
-                    if hasattr(existing, key):
-                        setattr(existing, key, value)
-                update_count += 1
-            else:
-                db.add(IndexBasic(**item))
-                new_count += 1
-
-        db.commit()
-        logger.info(f"[指数基本信息保存] ✓ 保存完成: 新增 {new_count} 条, 更新 {update_count} 条, 失败 {error_count} 条")
-
-    def _save_index_daily_data(self, db: Session, data: list) -> None:
-        from ..models.index_daily import IndexDaily
-        from datetime import datetime
-
-        logger.info(f"[指数日线数据保存] 开始处理指数日线数据，总条数: {len(data)}")
-
-        new_count = 0
-        update_count = 0
-        error_count = 0
-
-        for item in data:
-            ts_code = item.get("ts_code")
-            trade_date_str = item.get("trade_date")
-            if not ts_code or not trade_date_str:
-                logger.debug(f"[指数日线数据保存] 跳过记录: ts_code={ts_code}, trade_date={trade_date_str}")
-                continue
-
-            try:
-                trade_date = datetime.strptime(str(trade_date_str), "%Y%m%d").date()
-                item["trade_date"] = trade_date
-            except (ValueError, TypeError) as e:
-                error_count += 1
-                logger.error(f"[指数日线数据保存] 交易日期格式错误: {trade_date_str}, 错误: {str(e)}")
+            model, by_date, multi_code = GAP_TARGETS[interface_name]
+            gaps = find_gaps(db, model, ts_codes, trading_days, interface_name=interface_name)
+            plans = plan_fetches(gaps, trading_days, by_date=by_date, multi_code=multi_code)
+            missing = sum(len(days) for days in gaps.values())
+            logger.info(
+                f"[缺口检测] {interface_name}: {len(ts_codes)} 个代码 × {len(trading_days)} 个交易日, "
+                f"缺失 {missing} 条, 计划调用 {len(plans)} 次"
+            )
+
+        data = []
+        empty = set()
+        for plan in plans:
+            params = {key: value for key, value in base_params.items() if key not in ("ts_code", "trade_date", "start_date", "end_date")}
+            params.update(plan)
+            result = await self.tushare_registry.execute(interface_name, params)
+            if isinstance(result, list):
+                data.extend(result)
+                empty |= empty_pairs(plan, gaps, result, trading_days[-1])
+        if empty:
+            recorded = record_empty_fetches(db, interface_name, empty)
+            db.commit()
+            logger.info(f"[缺口检测] {interface_name}: {recorded} 个 (代码, 日期) 上游无数据，之后不再视为缺口")
+        return data
+
+    async def _fetch_incremental(self, db: Session, interface_name: str, ts_codes: list, base_params: Dict[str, Any]) -> list:
+        """按水位线增量拉取：每个代码只请求 start_date = 水位线 + 1，已同步到最新交易日的代码跳过"""
+        today = datetime.now().date()
+        await trading_calendar.ensure(db, today - timedelta(days=30), today, self.tushare_registry)
+        latest = trading_calendar.latest_trading_day()
+        watermarks = get_sync_watermarks(db, interface_name, ts_codes)
+
+        plans = []
+        up_to_date = 0
+        for ts_code in ts_codes:
+            watermark = watermarks.get(ts_code)
+            if watermark is not None and latest is not None and watermark >= latest:
+                up_to_date += 1
                 continue
+            plan = {"ts_code": ts_code}
+            start_date = incremental_start_date(watermark)
+            if start_date:
+                plan["start_date"] = start_date
+            plans.append(plan)
+        logger.info(
+            f"[增量同步] {interface_name}: {len(ts_codes)} 个代码, 已是最新 {up_to_date} 个, "
+            f"无水位线 {sum(1 for plan in plans if 'start_date' not in plan)} 个, 计划调用 {len(plans)} 次"
+        )
 
-            existing = db.query(IndexDaily).filter(
-                IndexDaily.ts_code == ts_code,
-                IndexDaily.trade_date == trade_date
-            ).first()
-
-            if existing:
-                for key, value in item.items():
-                    if hasattr(existing, key):
-                        setattr(existing, key, value)
-                update_count += 1
-            else:
-                db.add(IndexDaily(**item))
-                new_count += 1
-
-        db.commit()
-        logger.info(f"[指数日线数据保存] ✓ 保存完成: 新增 {new_count} 条, 更新 {update_count} 条, 失败 {error_count} 条")
+        data = []
+        for plan in plans:
+            params = {key: value for key, value in base_params.items() if key not in ("ts_code", "trade_date", "start_date", "end_date")}
+            params.update(plan)
+            result = await self.tushare_registry.execute(interface_name, params)
+            if isinstance(result, list):
+                data.extend(result)
+        return data
+
+    def _save_synced_data(self, db: Session, interface_name: str, data: Any,
+                          advance_watermark: bool = False) -> Optional[BulkWriteResult]:
+        """根据接口名称保存同步数据；advance_watermark 仅用于每个代码从水位线（或全部历史）起连续拉取的数据"""
+        logger.info(f"[数据保存] 接口类型: {interface_name}")
+
+        target = SYNC_SAVE_TARGETS.get(interface_name)
+        if not target:
+            logger.warning(f"[数据保存] ⚠ 接口类型 {interface_name} 未实现数据保存")
+            return None
+
+        model, label, key_columns = target
+        logger.info(f"[数据保存] 开始保存{label}，数据条数: {len(data) if isinstance(data, list) else 1}")
+        return self._bulk_save(db, interface_name, model, label, key_columns, data, advance_watermark)
+
+    def _bulk_save(self, db: Session, interface_name: str, model: Any, label: str, key_columns: tuple, data: Any,
+                   advance_watermark: bool = False) -> BulkWriteResult:
+        """列式转换后批量写入，并在同一事务内登记变更、按需推进水位线"""
+        mapping = get_model_mapping(model, key_columns)
+        with telemetry_stage("transform"):
+            frame, skipped = transform_records(data, mapping)
+
+        with telemetry_stage("write"):
+            result = bulk_upsert(db, mapping, frame)
+            if tuple(key_columns[:2]) == ("ts_code", "trade_date"):
+                changes = ChangeCollector(model.__tablename__, source=interface_name)
+                changes.add_many([(key[0], key[1]) for key in result.inserted], "insert")
+                changes.add_many([(key[0], key[1]) for key in result.updated], "update")
+                change_feed.stage(db, changes)
+            if advance_watermark and supports_watermark(interface_name):
+                advance_sync_watermarks(db, interface_name, frame_watermarks(frame))
+
+        with telemetry_stage("commit"):
+            db.commit()
+        logger.info(f"[{label}保存] ✓ 保存完成: 新增 {len(result.inserted)} 条, 更新 {len(result.updated)} 条, 失败 {skipped} 条")
+        return result
 
-    def _should_retry(self, task: SyncTask) -> bool:
-        """判断是否应该重试"""
+    def _should_retry(self, task: SyncTask, attempt: int) -> bool:
+        """判断本次运行是否还有重试预算（只统计当前运行，不看历史失败）"""
         retry_policy = task.retry_policy or {}
         max_retries = retry_policy.get("max_retries", 3)
-        
-        recent_failures = self.db.query(SyncExecutionLog).filter(
-            SyncExecutionLog.task_id == task.id,
-            SyncExecutionLog.status == "failed"
-        ).count()
-
-        return recent_failures < max_retries
+        return attempt < max_retries
 
-    async def _schedule_retry(self, db: Session, task: SyncTask) -> None:
-        """调度重试"""
+    def _retry_delay(self, task: SyncTask, attempt: int) -> float:
+        """指数退避 + 抖动：base * factor^(attempt-1)，不超过 max_delay，再乘以 [0.5, 1) 的随机系数"""
         retry_policy = task.retry_policy or {}
+        base_delay = retry_policy.get("retry_delay", 60)
         backoff_factor = retry_policy.get("backoff_factor", 2)
-        delay_seconds = 60 * backoff_factor
-
-        log = create_sync_execution_log(
-            db,
-            {
-                "task_id": task.id,
-                "execution_type": "retry",
-                "status": "running"
-            }
-        )
-        db.commit()
-
-        import asyncio
-        await asyncio.sleep(delay_seconds)
-        await self._execute_task(db, task.id)
+        max_delay = retry_policy.get("max_delay", 3600)
+        delay = min(max_delay, base_delay * backoff_factor ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _schedule_retry(self, db: Session, task: SyncTask, run_id: str, attempt: int) -> None:
+        """以一次性调度任务的形式延迟重试，等待期间不占用数据库会话和执行槽位"""
+        delay_seconds = self._retry_delay(task, attempt)
+        retry_func = self._execute_task_wrapper(task.id, execution_type="retry", run_id=run_id, attempt=attempt)
+        logger.info(f"[任务重试] 任务 ID {task.id} 运行 {run_id[:8]} 将在 {delay_seconds:.1f}s 后进行第 {attempt} 次重试")
+
+        if settings.JOB_QUEUE_ENABLED:
+            # 延迟重试作为作业入队，由任一工作进程在到期后认领
+            from .job_queue import enqueue_sync_task
+            enqueue_sync_task(db, task.id, execution_type="retry", run_id=run_id, attempt=attempt, delay_seconds=delay_seconds)
+        # 只有正在触发的调度器（leader）才会执行一次性任务，否则在本进程事件循环中延迟执行
+        elif self.scheduler is not None and self.scheduler.is_active:
+            self.scheduler.add_one_shot_job(
+                f"{task.id}:retry:{run_id}",
+                retry_func,
+                datetime.now(self.scheduler.scheduler.timezone) + timedelta(seconds=delay_seconds)
+            )
+        else:
+            # 保留任务句柄：异常会被记录，进程退出时由 cancel_pending_retries 取消并等待
+            handle = asyncio.create_task(
+                _delayed_retry(task.id, run_id, delay_seconds, retry_func), name=f"sync-retry:{task.id}:{run_id[:8]}"
+            )
+            _pending_retries.add(handle)
+            handle.add_done_callback(_forget_retry)
 
     async def load_and_schedule_all_tasks(self) -> None:
         """启动时加载并调度所有活动任务"""
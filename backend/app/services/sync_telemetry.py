@@ -0,0 +1,185 @@
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+from sqlalchemy.orm import Session
+from ..models.sync_execution_log import SyncExecutionLog
+
+# 单次执行保存的 API 调用耗时样本上限，避免 output_summary 过大
+MAX_LATENCY_SAMPLES = 500
+
+_current: ContextVar[Optional["SyncTelemetry"]] = ContextVar("sync_telemetry", default=None)
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """最近秩百分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return round(ordered[index], 4)
+
+
+class SyncTelemetry:
+    """单次同步执行的分阶段耗时与吞吐统计"""
+
+    def __init__(self, interface_name: str):
+        self.interface_name = interface_name
+        self.started_at = time.perf_counter()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.api_calls = 0
+        self.api_errors = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.bytes_received = 0
+        self.latencies_ms: List[float] = []
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        stage = self.stages.setdefault(name, {"seconds": 0.0, "count": 0})
+        stage["seconds"] += seconds
+        stage["count"] += 1
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - started)
+
+    def record_api_call(self, seconds: float, success: bool = True) -> None:
+        self.api_calls += 1
+        if not success:
+            self.api_errors += 1
+        if len(self.latencies_ms) < MAX_LATENCY_SAMPLES:
+            self.latencies_ms.append(round(seconds * 1000, 2))
+
+    def record_coalesced(self, seconds: float, success: bool = True) -> None:
+        """与进行中的相同请求合并：计为一次调用（耗时为等待共享结果的时间），不重复计接收字节"""
+        self.coalesced += 1
+        self.record_api_call(seconds, success)
+
+    def record_retry(self) -> None:
+        self.retries += 1
+
+    def record_cache_hit(self) -> None:
+        self.cache_hits += 1
+
+    def record_bytes(self, size: int) -> None:
+        self.bytes_received += int(size)
+
+    def to_summary(self, rows: int) -> Dict[str, Any]:
+        total_seconds = time.perf_counter() - self.started_at
+        return {
+            "interface": self.interface_name,
+            "rows": rows,
+            "total_seconds": round(total_seconds, 4),
+            "rows_per_sec": round(rows / total_seconds, 2) if total_seconds > 0 else None,
+            "stages": {
+                name: {"seconds": round(stage["seconds"], 4), "count": stage["count"]}
+                for name, stage in self.stages.items()
+            },
+            "api": {
+                "calls": self.api_calls,
+                "errors": self.api_errors,
+                "retries": self.retries,
+                "cache_hits": self.cache_hits,
+                "coalesced": self.coalesced,
+                "bytes_received": self.bytes_received,
+                "latencies_ms": self.latencies_ms,
+            },
+        }
+
+
+def start_telemetry(interface_name: str) -> SyncTelemetry:
+    telemetry = SyncTelemetry(interface_name)
+    _current.set(telemetry)
+    return telemetry
+
+
+def current_telemetry() -> Optional[SyncTelemetry]:
+    """当前执行上下文的统计对象，不在同步任务中时返回 None"""
+    return _current.get()
+
+
+def stop_telemetry() -> None:
+    _current.set(None)
+
+
+@contextmanager
+def telemetry_stage(name: str) -> Iterator[None]:
+    """在当前统计对象上计时，没有统计对象时不做任何事"""
+    telemetry = _current.get()
+    if telemetry is None:
+        yield
+        return
+    with telemetry.stage(name):
+        yield
+
+
+def _distribution(values: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": round(max(values), 4) if values else None,
+    }
+
+
+def aggregate_sync_telemetry(db: Session, interface_name: Optional[str] = None, days: int = 7) -> Dict[str, Any]:
+    """按接口汇总最近 days 天的吞吐和各阶段耗时百分位，并按天给出趋势"""
+    since = datetime.now() - timedelta(days=days)
+    logs = db.query(SyncExecutionLog.started_at, SyncExecutionLog.output_summary).filter(
+        SyncExecutionLog.started_at >= since,
+        SyncExecutionLog.status == "success"
+    ).all()
+
+    grouped: Dict[str, List[Any]] = {}
+    for started_at, summary in logs:
+        if not summary or "stages" not in summary:
+            continue
+        if interface_name and summary.get("interface") != interface_name:
+            continue
+        grouped.setdefault(summary.get("interface"), []).append((started_at, summary))
+
+    result = {}
+    for name, items in grouped.items():
+        stage_seconds: Dict[str, List[float]] = {}
+        latencies: List[float] = []
+        by_day: Dict[str, Dict[str, float]] = {}
+        for started_at, summary in items:
+            for stage, values in summary["stages"].items():
+                stage_seconds.setdefault(stage, []).append(values["seconds"])
+            api = summary.get("api", {})
+            latencies.extend(api.get("latencies_ms", []))
+            day = by_day.setdefault(started_at.strftime("%Y-%m-%d"), {"executions": 0, "rows": 0, "seconds": 0.0})
+            day["executions"] += 1
+            day["rows"] += summary.get("rows", 0)
+            day["seconds"] += summary.get("total_seconds", 0)
+
+        result[name] = {
+            "executions": len(items),
+            "rows": sum(summary.get("rows", 0) for _, summary in items),
+            "api_calls": sum(summary.get("api", {}).get("calls", 0) for _, summary in items),
+            "retries": sum(summary.get("api", {}).get("retries", 0) for _, summary in items),
+            "cache_hits": sum(summary.get("api", {}).get("cache_hits", 0) for _, summary in items),
+            "coalesced": sum(summary.get("api", {}).get("coalesced", 0) for _, summary in items),
+            "bytes_received": sum(summary.get("api", {}).get("bytes_received", 0) for _, summary in items),
+            "rows_per_sec": _distribution([s["rows_per_sec"] for _, s in items if s.get("rows_per_sec") is not None]),
+            "total_seconds": _distribution([s.get("total_seconds", 0) for _, s in items]),
+            "api_latency_ms": _distribution(latencies),
+            "stages": {stage: _distribution(values) for stage, values in stage_seconds.items()},
+            "by_day": [
+                {
+                    "date": day,
+                    "executions": values["executions"],
+                    "rows": values["rows"],
+                    "rows_per_sec": round(values["rows"] / values["seconds"], 2) if values["seconds"] else None,
+                }
+                for day, values in sorted(by_day.items())
+            ],
+        }
+    return {"days": days, "interfaces": result}
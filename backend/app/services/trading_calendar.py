@@ -0,0 +1,109 @@
+import bisect
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, List, Optional
+from sqlalchemy.orm import Session
+from ..models.trade_calendar import TradeCalendar
+from ..crud.bulk import bulk_upsert
+from .data_transform import get_model_mapping, transform_records
+
+logger = logging.getLogger(__name__)
+
+# 日线数据在收盘后发布的时间点
+DAILY_DATA_READY_HOUR = 16
+
+
+class TradingCalendar:
+    """交易日历 - 本地 trade_calendar 表 + 内存缓存，缺失区间从 trade_cal 接口补齐"""
+
+    def __init__(self, exchange: str = "SSE"):
+        self.exchange = exchange
+        self._open_days: List[date] = []
+        self._covered_start: Optional[date] = None
+        self._covered_end: Optional[date] = None
+
+    def covers(self, start: date, end: date) -> bool:
+        return (
+            self._covered_start is not None
+            and self._covered_start <= start
+            and end <= self._covered_end
+        )
+
+    def load(self, db: Session, start: date, end: date) -> bool:
+        """从本地表加载区间，区间内每个自然日都有记录时才视为完整"""
+        rows = db.query(TradeCalendar.cal_date, TradeCalendar.is_open).filter(
+            TradeCalendar.exchange == self.exchange,
+            TradeCalendar.cal_date.between(start, end)
+        ).all()
+        if len(rows) < (end - start).days + 1:
+            return False
+
+        open_days = {row.cal_date for row in rows if row.is_open}
+        adjacent = (
+            self._covered_start is not None
+            and start <= self._covered_end + timedelta(days=1)
+            and end >= self._covered_start - timedelta(days=1)
+        )
+        if adjacent:
+            # 与已缓存区间相连时合并，否则替换，保证缓存区间连续
+            open_days.update(self._open_days)
+            start, end = min(start, self._covered_start), max(end, self._covered_end)
+        self._open_days = sorted(open_days)
+        self._covered_start, self._covered_end = start, end
+        return True
+
+    async def ensure(self, db: Session, start: date, end: date, registry: Any) -> None:
+        """确保区间已缓存：先查本地表，仍不完整时调用 trade_cal 接口拉取并入库"""
+        if self.covers(start, end) or self.load(db, start, end):
+            return
+
+        logger.info(f"[交易日历] 拉取 {self.exchange} {start} ~ {end}")
+        data = await registry.execute("trade_cal", {
+            "exchange": self.exchange,
+            "start_date": start.strftime("%Y%m%d"),
+            "end_date": end.strftime("%Y%m%d"),
+        })
+        mapping = get_model_mapping(TradeCalendar, ("exchange", "cal_date"))
+        frame, _ = transform_records(data, mapping)
+        bulk_upsert(db, mapping, frame)
+        db.commit()
+
+        if not self.load(db, start, end):
+            raise ValueError(f"交易日历 {self.exchange} {start} ~ {end} 不完整")
+
+    def _require(self, start: date, end: date) -> None:
+        if not self.covers(start, end):
+            raise ValueError(f"交易日历未加载 {start} ~ {end}，请先调用 ensure")
+
+    def trading_days(self, start: date, end: date) -> List[date]:
+        self._require(start, end)
+        left = bisect.bisect_left(self._open_days, start)
+        right = bisect.bisect_right(self._open_days, end)
+        return self._open_days[left:right]
+
+    def is_trading_day(self, day: date) -> bool:
+        self._require(day, day)
+        index = bisect.bisect_left(self._open_days, day)
+        return index < len(self._open_days) and self._open_days[index] == day
+
+    def previous_trading_day(self, day: date) -> Optional[date]:
+        """严格早于 day 的最近交易日"""
+        index = bisect.bisect_left(self._open_days, day)
+        return self._open_days[index - 1] if index > 0 else None
+
+    def latest_trading_day(self, now: Optional[datetime] = None) -> Optional[date]:
+        """最近一个已发布日线的交易日：当天为交易日且已过收盘发布时间才算当天"""
+        now = now or datetime.now()
+        candidate = now.date() if now.hour >= DAILY_DATA_READY_HOUR else now.date() - timedelta(days=1)
+        return self.previous_trading_day(candidate + timedelta(days=1))
+
+    def recent_trading_days(self, count: int, now: Optional[datetime] = None) -> List[date]:
+        """截至 latest_trading_day 的最近 count 个交易日"""
+        latest = self.latest_trading_day(now)
+        if latest is None:
+            return []
+        index = bisect.bisect_right(self._open_days, latest)
+        return self._open_days[max(0, index - count):index]
+
+
+trading_calendar = TradingCalendar()
@@ -0,0 +1,151 @@
+import calendar as month_calendar
+import logging
+import threading
+import time as monotonic_time
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Optional, Set, Tuple
+from apscheduler.triggers.base import BaseTrigger
+from apscheduler.util import astimezone, localize
+from sqlalchemy.orm import Session
+from .trading_calendar import TradingCalendar, trading_calendar
+
+logger = logging.getLogger(__name__)
+
+# A 股收盘时间
+MARKET_CLOSE = time(15, 0)
+
+# 交易日筛选: every 每个交易日, first_of_month/last_of_month 每月首/末个交易日, first_of_week/last_of_week 每周首/末个交易日
+TRADING_DAY_RULES = ("every", "first_of_month", "last_of_month", "first_of_week", "last_of_week")
+
+# 向后最多查找的天数，超过仍找不到符合条件的交易日时不再触发
+MAX_LOOKAHEAD_DAYS = 400
+
+# 本地没有某月日历时按工作日计算的结果缓存多久后再查本地表（秒）
+WEEKDAY_FALLBACK_TTL = 600
+
+# 预取交易日历失败后的重试间隔：从 PREFETCH_RETRY_BASE 起指数增长，最长 PREFETCH_RETRY_MAX（秒）
+PREFETCH_RETRY_BASE = 60
+PREFETCH_RETRY_MAX = 3600
+
+# (年, 月) -> (按工作日计算的开市日, 过期时间)
+_weekday_fallback: Dict[Tuple[int, int], Tuple[Set[date], float]] = {}
+_weekday_fallback_lock = threading.Lock()
+
+_prefetch_failures = 0
+_prefetch_retry_at = 0.0
+
+
+class TradingDayTrigger(BaseTrigger):
+    """交易日触发器 - 只在交易日（可限定每月/每周首末个交易日）的指定时间触发
+
+    schedule_config 示例:
+        {"after_close_minutes": 30}                  每个交易日收盘后 30 分钟
+        {"time": "18:30"}                            每个交易日 18:30
+        {"time": "09:00", "day": "first_of_month"}   每月第一个交易日 09:00
+
+    交易日按内存中的交易日历判断，未覆盖的月份从本地 trade_calendar 表加载；
+    本地表也没有该月日历时退化为周一至周五。
+    """
+
+    def __init__(self, time: Optional[str] = None, after_close_minutes: Optional[int] = None, day: str = "every",
+                 timezone: Any = None, calendar: Optional[TradingCalendar] = None):
+        if day not in TRADING_DAY_RULES:
+            raise ValueError(f"不支持的交易日规则: {day}，可选: {', '.join(TRADING_DAY_RULES)}")
+        if after_close_minutes is not None:
+            fire_at = datetime.combine(date.today(), MARKET_CLOSE) + timedelta(minutes=int(after_close_minutes))
+            if fire_at.date() != date.today():
+                raise ValueError("after_close_minutes 不能跨天")
+            self.fire_time = fire_at.time()
+        else:
+            self.fire_time = datetime.strptime(time or "15:30", "%H:%M").time()
+        self.day = day
+        self.timezone = astimezone(timezone) or astimezone("Asia/Shanghai")
+        self.calendar = calendar or trading_calendar
+
+    def get_next_fire_time(self, previous_fire_time: Optional[datetime], now: datetime) -> Optional[datetime]:
+        start = previous_fire_time + timedelta(microseconds=1) if previous_fire_time else now
+        start = start.astimezone(self.timezone)
+        day = start.date()
+        for _ in range(MAX_LOOKAHEAD_DAYS):
+            if self._matches(day):
+                fire_time = localize(datetime.combine(day, self.fire_time), self.timezone)
+                if fire_time >= start:
+                    return fire_time
+            day += timedelta(days=1)
+        return None
+
+    def _matches(self, day: date) -> bool:
+        open_days = self._month_open_days(day.year, day.month)
+        if day not in open_days:
+            return False
+        if self.day == "first_of_month":
+            return day == min(open_days)
+        if self.day == "last_of_month":
+            return day == max(open_days)
+        if self.day in ("first_of_week", "last_of_week"):
+            monday = day - timedelta(days=day.weekday())
+            week = [monday + timedelta(days=offset) for offset in range(7)]
+            # 跨月的一周需要相邻月份的日历
+            week_open = [d for d in week if d in (open_days if d.month == day.month else self._month_open_days(d.year, d.month))]
+            return day == (week_open[0] if self.day == "first_of_week" else week_open[-1])
+        return True
+
+    def _month_open_days(self, year: int, month: int) -> Set[date]:
+        first = date(year, month, 1)
+        last = date(year, month, month_calendar.monthrange(year, month)[1])
+        if self.calendar.covers(first, last):
+            return set(self.calendar.trading_days(first, last))
+
+        # 逐日查找时同一个月会被反复查询，本地没有日历时短时间内不再重复查表和告警
+        with _weekday_fallback_lock:
+            cached = _weekday_fallback.get((year, month))
+        if cached and cached[1] > monotonic_time.monotonic():
+            return cached[0]
+
+        from ..database import SessionLocal
+        db = SessionLocal()
+        try:
+            self.calendar.load(db, first, last)
+        except Exception as e:
+            logger.warning(f"[交易日触发器] ⚠ 加载交易日历 {year}-{month:02d} 失败: {str(e)}")
+        finally:
+            db.close()
+        if self.calendar.covers(first, last):
+            return set(self.calendar.trading_days(first, last))
+
+        logger.warning(f"[交易日触发器] ⚠ 本地无 {year}-{month:02d} 交易日历，按周一至周五计算")
+        weekdays = {first + timedelta(days=offset) for offset in range((last - first).days + 1)
+                    if (first + timedelta(days=offset)).weekday() < 5}
+        with _weekday_fallback_lock:
+            _weekday_fallback[(year, month)] = (weekdays, monotonic_time.monotonic() + WEEKDAY_FALLBACK_TTL)
+        return weekdays
+
+    def __str__(self) -> str:
+        return f"trading_day[{self.day} {self.fire_time.strftime('%H:%M')}]"
+
+    def __repr__(self) -> str:
+        return f"<TradingDayTrigger (day='{self.day}', time='{self.fire_time.strftime('%H:%M')}', timezone='{self.timezone}')>"
+
+
+async def prepare_trading_calendar(db: Session, registry: Any) -> None:
+    """预先拉取本月和下月的交易日历，供交易日触发器同步查询；拉取失败时触发器退化为工作日
+
+    已缓存时直接返回；失败后按指数退避，退避期内的调用直接跳过，不会每次都请求 trade_cal。
+    """
+    global _prefetch_failures, _prefetch_retry_at
+    today = date.today()
+    first = today.replace(day=1)
+    next_month = (first + timedelta(days=32)).replace(day=1)
+    last = date(next_month.year, next_month.month, month_calendar.monthrange(next_month.year, next_month.month)[1])
+    if trading_calendar.covers(first, last) or monotonic_time.monotonic() < _prefetch_retry_at:
+        return
+    try:
+        await trading_calendar.ensure(db, first, last, registry)
+        _prefetch_failures = 0
+        _prefetch_retry_at = 0.0
+    except Exception as e:
+        db.rollback()
+        _prefetch_failures += 1
+        delay = min(PREFETCH_RETRY_MAX, PREFETCH_RETRY_BASE * 2 ** (_prefetch_failures - 1))
+        _prefetch_retry_at = monotonic_time.monotonic() + delay
+        logger.warning(f"[交易日触发器] ⚠ 预取交易日历 {first} ~ {last} 失败（第 {_prefetch_failures} 次），{delay}s 后重试: {str(e)}")
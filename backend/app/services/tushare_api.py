@@ -1,6 +1,7 @@
 import tushare as ts
 from typing import Optional, Dict, Any, List
 from ..core.config import settings
+from .request_queue import request_queue, make_request_key
 
 
 class TushareAPI:
@@ -16,6 +17,11 @@ class TushareAPI:
         """Check if Tushare API is properly configured"""
         return self.pro is not None
 
+    def _query(self, endpoint: str, **params):
+        """经请求队列调用 pro 接口：按当前上下文优先级排队，相同请求合并为一次"""
+        method = getattr(self.pro, endpoint)
+        return request_queue.run_sync(make_request_key("tushare_api", endpoint, params), lambda: method(**params))
+
     def get_stock_basic(
         self,
         ts_code: str = None,
@@ -62,7 +68,7 @@ class TushareAPI:
             if is_hs:
                 params["is_hs"] = is_hs
 
-            df = self.pro.stock_basic(**params)
+            df = self._query("stock_basic", **params)
             if df is not None and not df.empty:
                 return df.to_dict(orient="records")
             return []
@@ -187,7 +193,7 @@ class TushareAPI:
             if trade_date:
                 params["trade_date"] = trade_date
 
-            df = self.pro.daily(**params)
+            df = self._query("daily", **params)
             if df is not None and not df.empty:
                 return df.to_dict(orient="records")
             return []
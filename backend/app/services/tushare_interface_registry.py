@@ -2,9 +2,11 @@ import asyncio
 import logging
 from typing import Dict, Any, Optional
 from ..core.config import settings
+from .request_queue import Priority, request_queue, make_request_key
 from .data_sources import (
     InterfaceRegistry,
     TushareAdapter,
+    FakeDataSourceAdapter,
     register_tushare_interfaces,
 )
 
@@ -17,16 +19,33 @@ class TushareInterfaceRegistry:
 
     def __init__(self, api_token: Optional[str] = None):
         token = api_token or settings.TUSHARE_API_TOKEN
-        self.adapter = TushareAdapter(token)
+        if settings.DATA_SOURCE == "fake":
+            logger.info("Using local fake data source")
+            self.adapter = FakeDataSourceAdapter(
+                symbols=settings.FAKE_SOURCE_SYMBOLS,
+                seed=settings.FAKE_SOURCE_SEED,
+                latency_ms=settings.FAKE_SOURCE_LATENCY_MS,
+                calls_per_minute=settings.FAKE_SOURCE_CALLS_PER_MINUTE,
+            )
+        else:
+            self.adapter = TushareAdapter(token)
         self.registry = InterfaceRegistry()
         logger.info("Initializing TushareInterfaceRegistry")
 
         register_tushare_interfaces(self.registry, self.adapter)
         logger.info(f"Registered {len(self.registry.list())} interfaces: {self.registry.list()}")
 
-    async def execute(self, interface_name: str, params: Dict[str, Any]) -> Any:
-        """执行指定的 Tushare 接口"""
+    async def execute(self, interface_name: str, params: Dict[str, Any], priority: Optional[Priority] = None) -> Any:
+        """执行指定的 Tushare 接口
+
+        经过请求队列：按优先级（默认取当前上下文的 request_priority）占用上游槽位，
+        相同接口和参数的请求正在进行时直接共享其结果
+        """
         logger.info(f"Executing interface: {interface_name}, params: {params}")
+        key = make_request_key("registry", interface_name, params)
+        return await request_queue.run(key, lambda: self._execute(interface_name, params), priority)
+
+    async def _execute(self, interface_name: str, params: Dict[str, Any]) -> Any:
 
         interface_data = self.registry.get(interface_name)
         if not interface_data:
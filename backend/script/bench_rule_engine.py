@@ -0,0 +1,125 @@
+"""
+规则引擎基准测试
+
+用随机生成的全市场特征（默认 5000 只股票 × 50 条规则）比较三种评估方式的耗时，并校验结果一致：
+    scalar      逐只股票、逐条件 if/elif 比较（旧实现）
+    per-rule    每条规则分别编译为布尔掩码，对特征矩阵整列比较
+    shared      全部规则编译为共享公共子表达式的 DAG，相同谓词只计算一次
+
+阈值从每个指标 --thresholds 个取值中抽取，模拟多个用户使用相同条件（如 pe < 15）的情况：
+
+    python script/bench_rule_engine.py --stocks 5000 --rules 2000 --thresholds 10
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="规则引擎基准测试")
+    parser.add_argument("--stocks", type=int, default=5000, help="股票数量")
+    parser.add_argument("--rules", type=int, default=50, help="规则数量")
+    parser.add_argument("--thresholds", type=int, default=10, help="每个指标可选的阈值个数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    return parser.parse_args()
+
+
+def build_universe(stocks: int, rules: int, thresholds: int, seed: int):
+    from app.services.rule_engine_service import RULE_INDICATORS, RULE_OPERATORS
+
+    rng = random.Random(seed)
+    records = [
+        {"id": i + 1, **{indicator: round(rng.uniform(0, 100), 2) for indicator in RULE_INDICATORS}}
+        for i in range(stocks)
+    ]
+    values = {indicator: [round(rng.uniform(0, 100), 1) for _ in range(thresholds)] for indicator in RULE_INDICATORS}
+    rule_objects = []
+    for i in range(rules):
+        conditions = []
+        for _ in range(rng.randint(1, 4)):
+            indicator = rng.choice(RULE_INDICATORS)
+            conditions.append({"indicator": indicator, "operator": rng.choice(list(RULE_OPERATORS)), "value": rng.choice(values[indicator])})
+        rule_objects.append(SimpleNamespace(id=i + 1, conditions={"conditions": conditions, "logic": rng.choice(["AND", "OR"])}))
+    return records, rule_objects
+
+
+
+def evaluate_scalar(rules: list, records: list) -> dict:
+    """旧实现：逐只股票逐条件比较"""
+    def compare(a, operator, b):
+        if operator == "gt":
+            return a > b
+        elif operator == "lt":
+            return a < b
+        elif operator == "gte":
+            return a >= b
+        elif operator == "lte":
+            return a <= b
+        elif operator == "eq":
+            return a == b
+        return a != b
+
+    matched = {}
+    for rule in rules:
+        logic = rule.conditions["logic"]
+        ids = []
+        for record in records:
+            results = [compare(record.get(c["indicator"], 0), c["operator"], c["value"]) for c in rule.conditions["conditions"]]
+            if (all(results) if logic == "AND" else any(results)):
+                ids.append(record["id"])
+        matched[rule.id] = ids
+    return matched
+
+
+def main():
+    args = parse_args()
+    import logging
+    logging.disable(logging.INFO)
+
+    from app.services.rule_engine_service import RULE_INDICATORS, RuleEngine, build_feature_matrix, compile_rule, compile_rule_set
+
+    records, rules = build_universe(args.stocks, args.rules, args.thresholds, args.seed)
+    print(f"股票数: {args.stocks}, 规则数: {args.rules}")
+
+    started = time.perf_counter()
+    expected = evaluate_scalar(rules, records)
+    scalar_seconds = time.perf_counter() - started
+    print(f"逐只比较   {scalar_seconds * 1000:10.1f} ms")
+
+    features = build_feature_matrix(records)
+    matrix = features.reindex(columns=list(RULE_INDICATORS)).to_numpy(dtype="float64")
+    stock_ids = features.index.to_numpy()
+
+    started = time.perf_counter()
+    per_rule = {rule.id: stock_ids[compile_rule(rule)(matrix)].tolist() for rule in rules}
+    print(f"逐规则向量化 {(time.perf_counter() - started) * 1000:8.1f} ms (含编译)")
+
+    started = time.perf_counter()
+    for rule in rules:
+        compile_rule(rule)(matrix)
+    print(f"  其中求值掩码 {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    plan = compile_rule_set(rules)
+    stats = plan.stats()
+    print(f"共享 DAG: {stats['rules']} 条规则 -> {stats['expressions']} 个表达式, {stats['predicates']} 个谓词, {stats['indicators']} 个指标")
+    engine = RuleEngine(None)
+    started = time.perf_counter()
+    shared = engine.evaluate_rules(rules, features)
+    print(f"共享 DAG   {(time.perf_counter() - started) * 1000:10.1f} ms")
+    started = time.perf_counter()
+    plan.evaluate(matrix)
+    print(f"  其中求值掩码 {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    if per_rule != expected or shared != expected:
+        print("✗ 结果不一致")
+        sys.exit(1)
+    print(f"✓ 结果一致，共命中 {sum(len(ids) for ids in shared.values())} 个 (规则, 股票)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+同步入库吞吐基准测试
+
+使用本地模拟数据源（DATA_SOURCE=fake）在临时 SQLite 库上端到端执行
+SyncTaskManager._execute_task，统计各接口的 行/秒，并可与基线结果比较以发现性能回退。
+
+    python script/bench_sync_ingestion.py --symbols 200 --days 250
+    python script/bench_sync_ingestion.py --save-baseline bench_baseline.json
+    python script/bench_sync_ingestion.py --baseline bench_baseline.json --tolerance 0.2
+"""
+import sys
+import os
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="同步入库吞吐基准测试（本地模拟数据源）")
+    parser.add_argument("--symbols", type=int, default=200, help="模拟股票数量")
+    parser.add_argument("--days", type=int, default=250, help="每只股票同步的交易日数量")
+    parser.add_argument("--interfaces", default="daily,daily_basic,moneyflow", help="逗号分隔的接口列表")
+    parser.add_argument("--repeat", type=int, default=2, help="每个接口执行次数（首次为插入，之后为更新）")
+    parser.add_argument("--latency-ms", type=float, default=0, help="模拟接口延迟(毫秒)")
+    parser.add_argument("--output", default=None, help="结果输出 JSON 文件")
+    parser.add_argument("--baseline", default=None, help="基线结果 JSON 文件，用于回退检测")
+    parser.add_argument("--save-baseline", default=None, help="将本次结果保存为基线")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许相对基线下降的比例")
+    return parser.parse_args()
+
+
+def configure_environment(args, db_path: str) -> None:
+    """必须在导入 app 之前设置，确保使用临时库和模拟数据源"""
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["DATA_SOURCE"] = "fake"
+    os.environ["DATA_CACHE_MODE"] = "off"
+    os.environ["FAKE_SOURCE_SYMBOLS"] = str(args.symbols)
+    os.environ["FAKE_SOURCE_LATENCY_MS"] = str(args.latency_ms)
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+async def run_benchmark(args) -> dict:
+    import logging
+    logging.disable(logging.INFO)
+
+    from app.database import Base, engine, SessionLocal
+    from app.models import SyncInterface, SyncTask, SyncExecutionLog
+    from app.services.sync_task_manager import SyncTaskManager
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    manager = SyncTaskManager(db, None)
+    adapter = manager.tushare_registry.adapter
+    trade_dates = adapter.trade_dates[-args.days:]
+    ts_codes = ",".join(adapter.ts_codes)
+
+    results = {
+        "symbols": args.symbols,
+        "days": len(trade_dates),
+        "interfaces": {},
+    }
+
+    try:
+        for interface_name in [name.strip() for name in args.interfaces.split(",") if name.strip()]:
+            interface = SyncInterface(interface_name=interface_name, interface_params={})
+            db.add(interface)
+            db.commit()
+            task = SyncTask(
+                task_name=f"bench_{interface_name}",
+                interface_id=interface.id,
+                schedule_type="date",
+                schedule_config={},
+                task_params={
+                    "ts_code": ts_codes,
+                    "start_date": trade_dates[0].strftime("%Y%m%d"),
+                    "end_date": trade_dates[-1].strftime("%Y%m%d"),
+                },
+                retry_policy={"max_retries": 0},
+                status="active",
+            )
+            db.add(task)
+            db.commit()
+
+            runs = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                await manager._execute_task(db, task.id, execution_type="manual")
+                elapsed = time.perf_counter() - started
+
+                log = db.query(SyncExecutionLog).filter(
+                    SyncExecutionLog.task_id == task.id
+                ).order_by(SyncExecutionLog.id.desc()).first()
+                if log.status != "success":
+                    raise RuntimeError(f"{interface_name} 执行失败: {log.error_message}")
+                runs.append({
+                    "seconds": round(elapsed, 4),
+                    "rows": log.records_processed,
+                    "rows_per_sec": round(log.records_processed / elapsed, 1),
+                })
+                task.status = "active"
+                db.commit()
+
+            results["interfaces"][interface_name] = {
+                "runs": runs,
+                "best_rows_per_sec": max(run["rows_per_sec"] for run in runs),
+            }
+            print(f"{interface_name:<14} " + "  ".join(
+                f"{run['rows']} 行 {run['seconds']:.3f}s ({run['rows_per_sec']:.0f} 行/秒)" for run in runs
+            ))
+    finally:
+        db.close()
+
+    return results
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> bool:
+    """任一接口的最佳吞吐低于基线 (1 - tolerance) 即视为回退"""
+    ok = True
+    for interface_name, current in results["interfaces"].items():
+        base = baseline.get("interfaces", {}).get(interface_name)
+        if not base:
+            continue
+        ratio = current["best_rows_per_sec"] / max(base["best_rows_per_sec"], 1e-9)
+        status = "OK" if ratio >= 1 - tolerance else "REGRESSION"
+        if status != "OK":
+            ok = False
+        print(f"{interface_name:<14} 基线 {base['best_rows_per_sec']:.0f} 行/秒 -> 当前 {current['best_rows_per_sec']:.0f} 行/秒 ({ratio:.2f}x) {status}")
+    return ok
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        configure_environment(args, os.path.join(tmp_dir, "bench.db"))
+        results = asyncio.run(run_benchmark(args))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"基线已保存到 {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare_with_baseline(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+列式转换 + 批量写入基准测试
+
+在临时 SQLite 库上比较两种入库路径处理同一批日线数据（默认 100k 行）的耗时：
+    row       逐行 strptime 解析日期、逐行查询并构造 ORM 对象（旧实现）
+    columnar  transform_records 整列转换 + bulk_upsert 批量写入
+
+    python script/bench_transform_write.py --rows 100000
+"""
+import sys
+import os
+import argparse
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="列式转换 + 批量写入基准测试")
+    parser.add_argument("--rows", type=int, default=100000, help="数据行数")
+    parser.add_argument("--symbols", type=int, default=400, help="股票数量")
+    parser.add_argument("--skip-row", action="store_true", help="跳过逐行实现（行数很大时较慢）")
+    return parser.parse_args()
+
+
+def configure_environment(db_path: str) -> None:
+    """必须在导入 app 之前设置，确保使用临时库"""
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["DATA_CACHE_MODE"] = "off"
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def build_records(rows: int, symbols: int) -> list:
+    """生成与 Tushare daily 接口相同结构的记录（trade_date 为 YYYYMMDD 字符串）"""
+    from datetime import date, timedelta
+
+    days = max(1, rows // symbols)
+    start = date(2015, 1, 1)
+    trade_dates = [(start + timedelta(days=i)).strftime("%Y%m%d") for i in range(days)]
+    records = []
+    for i in range(symbols):
+        ts_code = f"{i:06d}.SZ"
+        for j, trade_date in enumerate(trade_dates):
+            close = 10 + (i + j) % 50
+            records.append({
+                "ts_code": ts_code, "trade_date": trade_date,
+                "open": close - 0.1, "high": close + 0.2, "low": close - 0.3, "close": close,
+                "pre_close": close - 0.05, "change": 0.05, "pct_chg": 0.5,
+                "vol": 1000.0 + j, "amount": 10000.0 + j,
+            })
+    return records[:rows]
+
+
+def save_row_by_row(db, records: list) -> float:
+    """旧实现：逐行解析日期、逐行查询、逐个构造 ORM 对象"""
+    from datetime import datetime
+    from app.models.stock_daily import StockDaily
+
+    started = time.perf_counter()
+    for item in records:
+        item = dict(item)
+        trade_date = datetime.strptime(str(item["trade_date"]), "%Y%m%d").date()
+        item["trade_date"] = trade_date
+        existing = db.query(StockDaily).filter(
+            StockDaily.ts_code == item["ts_code"],
+            StockDaily.trade_date == trade_date
+        ).first()
+        if existing:
+            for key, value in item.items():
+                setattr(existing, key, value)
+        else:
+            db.add(StockDaily(**item))
+    db.commit()
+    return time.perf_counter() - started
+
+
+def save_columnar(db, records: list) -> dict:
+    """新实现：列式转换 + 批量写入，分阶段计时"""
+    from app.models.stock_daily import StockDaily
+    from app.services.data_transform import get_model_mapping, transform_records
+    from app.crud.bulk import bulk_upsert
+
+    mapping = get_model_mapping(StockDaily)
+    started = time.perf_counter()
+    frame, _ = transform_records(records, mapping)
+    transformed = time.perf_counter()
+    bulk_upsert(db, mapping, frame)
+    db.commit()
+    finished = time.perf_counter()
+    return {"transform": transformed - started, "write": finished - transformed, "total": finished - started}
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        configure_environment(os.path.join(tmp_dir, "bench.db"))
+        import logging
+        logging.disable(logging.INFO)
+
+        from app.database import Base, engine, SessionLocal
+        from app.models.stock_daily import StockDaily
+
+        records = build_records(args.rows, args.symbols)
+        print(f"数据行数: {len(records)}, 股票数: {args.symbols}")
+        Base.metadata.create_all(bind=engine)
+
+        for phase in ("插入", "更新"):
+            db = SessionLocal()
+            try:
+                if not args.skip_row:
+                    if phase == "插入":
+                        db.query(StockDaily).delete()
+                        db.commit()
+                    elapsed = save_row_by_row(db, records)
+                    print(f"[{phase}] 逐行实现   {elapsed:8.2f}s  {len(records) / elapsed:10.0f} 行/秒")
+
+                if phase == "插入":
+                    db.query(StockDaily).delete()
+                    db.commit()
+                timing = save_columnar(db, records)
+                print(
+                    f"[{phase}] 列式+批量   {timing['total']:8.2f}s  {len(records) / timing['total']:10.0f} 行/秒 "
+                    f"(转换 {timing['transform']:.2f}s, 写入 {timing['write']:.2f}s)"
+                )
+            finally:
+                db.close()
+
+
+if __name__ == "__main__":
+    main()
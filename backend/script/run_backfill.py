@@ -0,0 +1,63 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+from app.database import Base, engine, SessionLocal
+from app.models import BackfillJob
+from app.services.backfill_service import BackfillOrchestrator, BACKFILL_INTERFACES
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="历史数据回填：按 (接口 × 代码 × 日期窗口) 分片并发执行，可断点续跑")
+    parser.add_argument("--start", help="开始日期 YYYYMMDD")
+    parser.add_argument("--end", help="结束日期 YYYYMMDD")
+    parser.add_argument("--interfaces", default="daily", help=f"逗号分隔的接口列表，可选: {','.join(BACKFILL_INTERFACES)}")
+    parser.add_argument("--ts-codes", default="", help="逗号分隔的证券代码，为空时使用全部上市股票/综合指数")
+    parser.add_argument("--window-days", type=int, default=None, help="每个分片的日期窗口(天)")
+    parser.add_argument("--concurrency", type=int, default=None, help="并发分片数")
+    parser.add_argument("--resume", type=int, default=None, metavar="JOB_ID", help="继续执行未完成的回填任务")
+    parser.add_argument("--list", action="store_true", help="列出最近的回填任务")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        orchestrator = BackfillOrchestrator(db)
+
+        if args.list:
+            for job in db.query(BackfillJob).order_by(BackfillJob.id.desc()).limit(20).all():
+                print(f"#{job.id} {job.status:<10} {job.completed_shards}/{job.total_shards} 分片, "
+                      f"{job.rows_written} 行, {job.rows_per_sec} 行/秒  {job.job_name}")
+            return
+
+        if args.resume:
+            job_id = args.resume
+        else:
+            if not args.start or not args.end:
+                print("必须指定 --start 和 --end，或使用 --resume JOB_ID")
+                sys.exit(1)
+            job = orchestrator.create_job({
+                "interfaces": [name.strip() for name in args.interfaces.split(",") if name.strip()],
+                "ts_codes": [code.strip() for code in args.ts_codes.split(",") if code.strip()],
+                "start_date": args.start,
+                "end_date": args.end,
+                "window_days": args.window_days,
+                "concurrency": args.concurrency,
+            })
+            job_id = job.id
+            print(f"已创建回填任务 #{job_id}，共 {job.total_shards} 个分片（中断后可使用 --resume {job_id} 继续）")
+
+        job = await orchestrator.run_job(job_id)
+        print(f"回填任务 #{job.id} {job.status}: 完成 {job.completed_shards}/{job.total_shards}, 失败 {job.failed_shards}, "
+              f"累计写入 {job.rows_written} 行")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,29 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import signal
+from app.database import Base, engine
+from app.services.scheduler_runtime import start_scheduler_runtime, stop_scheduler_runtime
+
+
+async def main():
+    """独立调度进程：参与选主，成为 leader 后触发同步任务与系统作业（配合 SCHEDULER_MODE=standalone 使用）"""
+    Base.metadata.create_all(bind=engine)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    runtime = await start_scheduler_runtime(participate=True)
+    print(f"调度进程已启动，持有者标识 {runtime.elector.holder}，当前{'是' if runtime.is_leader else '不是'} leader")
+    try:
+        await stop.wait()
+    finally:
+        await stop_scheduler_runtime()
+        print("调度进程已退出")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
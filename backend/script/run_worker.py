@@ -0,0 +1,34 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import signal
+from app.database import Base, engine
+from app.services.job_queue import QueueWorker, JOB_HANDLERS
+
+
+def parse_args():
+    queues = sorted({queue for queue, _ in JOB_HANDLERS.values()})
+    parser = argparse.ArgumentParser(description="作业队列工作进程：认领并执行同步/分析作业，可在多台主机上同时运行")
+    parser.add_argument("--queues", default=",".join(queues), help=f"逗号分隔的队列，可选: {','.join(queues)}")
+    parser.add_argument("--concurrency", type=int, default=None, help="本进程同时执行的作业数")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    Base.metadata.create_all(bind=engine)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker = QueueWorker([queue.strip() for queue in args.queues.split(",") if queue.strip()], concurrency=args.concurrency)
+    # 收到退出信号后不再认领新作业，等待执行中的作业结束
+    await worker.run(stop)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -275,7 +275,8 @@ const StockDetail: React.FC = () => {
     setLoading(true);
     try {
       const response = await syncAPI.syncFinancialData({ stock_codes: [ts_code], sync_type: 'financial' });
-      if (response.data.success) {
+      const job = await syncAPI.waitForSyncJob(response.data.id);
+      if (job.status === 'completed' && !job.failed) {
         message.success('财务数据同步成功');
         await Promise.all([
           handleFetchIncome(),
@@ -283,7 +284,7 @@ const StockDetail: React.FC = () => {
           handleFetchCashflow(),
         ]);
       } else {
-        message.error(response.data.message || '财务数据同步失败');
+        message.error(job.result?.failures?.[0] || job.message || '财务数据同步失败');
       }
     } catch (error) {
       message.error('财务数据同步失败');
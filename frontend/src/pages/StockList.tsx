@@ -43,11 +43,12 @@ const StockList: React.FC = () => {
     setSyncLoading(true);
     try {
       const response = await syncAPI.syncAllStocks({ list_status: 'L' });
-      if (response.data.success) {
-        message.success(response.data.message);
+      const job = await syncAPI.waitForSyncJob(response.data.id);
+      if (job.status === 'completed') {
+        message.success(job.message || '同步完成');
         fetchStocks();
       } else {
-        message.error(response.data.message);
+        message.error(job.message || '同步股票数据失败');
       }
     } catch (error) {
       message.error('同步股票数据失败');
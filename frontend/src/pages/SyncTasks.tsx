@@ -419,6 +419,18 @@ const SyncTasks: React.FC = () => {
       return `每 ${schedule_config.seconds || schedule_config.minutes || schedule_config.hours} 秒/分/时`;
     } else if (schedule_type === 'date') {
       return schedule_config.run_date || '-';
+    } else if (schedule_type === 'trading_day') {
+      const dayText: Record<string, string> = {
+        every: '每个交易日',
+        first_of_month: '每月首个交易日',
+        last_of_month: '每月最后交易日',
+        first_of_week: '每周首个交易日',
+        last_of_week: '每周最后交易日',
+      };
+      const timeText = schedule_config.after_close_minutes !== undefined
+        ? `收盘后 ${schedule_config.after_close_minutes} 分钟`
+        : schedule_config.time || '15:30';
+      return `${dayText[schedule_config.day || 'every'] || schedule_config.day} ${timeText}`;
     }
     return '-';
   };
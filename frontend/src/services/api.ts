@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { User, Stock, UserStock, InvestmentNote, UploadedFile, AnalysisRule, SyncRequest, SyncResult, SyncStatus, LoginRequest, LoginResponse, AnalysisResult, AnalysisTask, AISettings, SchedulerSettings, SyncInterface, SyncTask, SyncExecutionLog, IndexDaily, StockDaily, StockIncomeStatement, StockBalanceSheet, StockCashFlow, QuantStrategy, QuantStrategyCreate, QuantStrategyUpdate, StrategyVersion, BacktestResult, StrategySignal, StrategyPerformance, StrategyPosition, Order, OrderCreate, OrderUpdate, Position, Portfolio, Transaction, BacktestRequest, ExecuteStrategyRequest, StrategyExecutionResult, PaginatedResponse } from '../types';
+import { User, Stock, UserStock, InvestmentNote, UploadedFile, AnalysisRule, SyncRequest, SyncJob, SyncStatus, LoginRequest, LoginResponse, AnalysisResult, AnalysisRuleRun, AnalysisTask, AISettings, SchedulerSettings, SyncInterface, SyncTask, SyncExecutionLog, IndexDaily, StockDaily, StockIncomeStatement, StockBalanceSheet, StockCashFlow, QuantStrategy, QuantStrategyCreate, QuantStrategyUpdate, StrategyVersion, BacktestResult, StrategySignal, StrategyPerformance, StrategyPosition, Order, OrderCreate, OrderUpdate, Position, Portfolio, Transaction, BacktestRequest, ExecuteStrategyRequest, StrategyExecutionResult, PaginatedResponse } from '../types';
 
 // API基础配置
 const API_BASE_URL = process.env.REACT_APP_API_BASE_URL || 'http://localhost:8000/api/v1';
@@ -154,18 +154,33 @@ export const analysisRuleAPI = {
 
 // 数据同步相关API
 export const syncAPI = {
-  syncStockData: (data: SyncRequest): Promise<{ data: SyncResult }> =>
+  syncStockData: (data: SyncRequest): Promise<{ data: SyncJob }> =>
     api.post('/sync/stocks', data),
 
-  syncFinancialData: (data: SyncRequest): Promise<{ data: SyncResult }> =>
+  syncFinancialData: (data: SyncRequest): Promise<{ data: SyncJob }> =>
     api.post('/sync/financials', data),
 
-  syncAllStocks: (params?: { list_status?: string; market?: string }): Promise<{ data: SyncResult }> =>
+  syncAllStocks: (params?: { list_status?: string; market?: string }): Promise<{ data: SyncJob }> =>
     api.post('/sync/all-stocks', {}, { params }),
 
   getSyncStatus: (): Promise<{ data: SyncStatus }> =>
     api.get('/sync/status'),
 
+  getSyncJob: (jobId: number): Promise<{ data: SyncJob }> =>
+    api.get(`/sync/jobs/${jobId}`),
+
+  // 轮询后台同步作业直到结束
+  waitForSyncJob: async (jobId: number, onProgress?: (job: SyncJob) => void, intervalMs: number = 2000): Promise<SyncJob> => {
+    for (;;) {
+      const { data: job } = await api.get<SyncJob>(`/sync/jobs/${jobId}`);
+      onProgress?.(job);
+      if (job.status === 'completed' || job.status === 'failed') {
+        return job;
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+  },
+
   syncIndexBasic: (): Promise<{ data: { success: boolean; message: string } }> =>
     api.post('/sync-management/sync-index-basic'),
 };
@@ -178,10 +193,16 @@ export const ruleEngineAPI = {
 
 // 分析结果相关API
 export const analysisResultAPI = {
-  getAnalysisResults: (params: { skip?: number; limit?: number } = {}): Promise<{ data: AnalysisResult[] }> =>
+  getAnalysisResults: (params: { skip?: number; limit?: number } = {}): Promise<{ data: AnalysisRuleRun[] }> =>
     api.get('/analysis-results', { params }),
 
-  getAnalysisResult: (id: number): Promise<{ data: AnalysisResult }> =>
+  getLatestRuleRuns: (params: { rule_id?: number; stock_id?: number } = {}): Promise<{ data: AnalysisRuleRun[] }> =>
+    api.get('/analysis-results/latest', { params }),
+
+  getRuleRuns: (params: { rule_id: number; skip?: number; limit?: number }): Promise<{ data: AnalysisRuleRun[] }> =>
+    api.get('/analysis-results/runs', { params }),
+
+  getAnalysisResult: (id: number): Promise<{ data: AnalysisRuleRun }> =>
     api.get(`/analysis-results/${id}`),
 
   deleteAnalysisResult: (id: number): Promise<void> =>
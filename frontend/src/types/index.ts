@@ -95,6 +95,17 @@ export interface AnalysisResult {
   matched: boolean;
 }
 
+// 规则运行结果类型（每条规则每次运行一条）
+export interface AnalysisRuleRun {
+  id: number;
+  rule_id: number;
+  task_id?: number;
+  source: string;
+  run_at: string;
+  matched_count: number;
+  stock_ids: number[];
+}
+
 // 数据同步请求类型
 export interface SyncRequest {
   stock_codes?: string[];
@@ -108,6 +119,37 @@ export interface SyncResult {
   synced_count: number;
   failed_count: number;
   failures?: string[];
+  diff?: StockMasterDiff;
+}
+
+// 股票主数据比对结果
+export interface StockMasterDiff {
+  fetched: number;
+  inserted: string[];
+  updated: { ts_code: string; fields: string[] }[];
+  delisted: string[];
+  unchanged: number;
+  invalid: number;
+  elapsed_seconds: number;
+}
+
+// 后台同步作业类型
+export interface SyncJob {
+  id: number;
+  job_type: 'stocks' | 'financials' | 'all_stocks';
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  params: Record<string, any>;
+  total: number;
+  done: number;
+  failed: number;
+  percent?: number;
+  rate?: number;
+  eta_seconds?: number;
+  message?: string;
+  result?: SyncResult;
+  created_at?: string;
+  started_at?: string;
+  finished_at?: string;
 }
 
 // 数据同步状态类型
@@ -116,6 +158,7 @@ export interface SyncStatus {
   next_sync_time?: string;
   syncing: boolean;
   status: string;
+  jobs: SyncJob[];
 }
 
 // 登录请求类型
@@ -227,7 +270,7 @@ export interface SyncTask {
   task_name: string;
   interface_id: number;
   interface?: SyncInterface;
-  schedule_type: 'cron' | 'interval' | 'date';
+  schedule_type: 'cron' | 'interval' | 'date' | 'trading_day';
   schedule_config: Record<string, any>;
   task_params: Record<string, any>;
   retry_policy: Record<string, any>;